@@ -0,0 +1,178 @@
+import re
+import numpy as np
+import pandas as pd
+
+REGISTRY_PATH = '/home/ubuntu/data/aircraft_registry.csv'
+
+# Free-text Model patterns -> (type code, default engine variant). First match wins, so
+# more specific patterns come first. Type codes match fuel_rates.FUEL_RATE_LOOKUP keys.
+TYPE_PATTERNS = [
+    (r'CRJ.?(9|1000)|CL-600-2[DE]', 'CRJ9', 'CF34-8C5'),
+    (r'CRJ.?7|CL-600-2C', 'CRJ7', 'CF34-8C1'),
+    (r'CRJ.?[124]|CL-600-2B|CRJ$', 'CRJ2', 'CF34-3B1'),
+    (r'ERJ.?170-?200|E175|170-200', 'E175', 'CF34-8E5'),
+    (r'ERJ.?170|E170|170-100', 'E170', 'CF34-8E5'),
+    (r'ERJ.?1[34]5|EMB-?145|E145', 'E145', 'AE3007'),
+    (r'737.?MAX|737-[789] ?MAX|737-[789]$', 'B737', 'LEAP-1B'),
+    (r'737', 'B737', 'CFM56-7B'),
+    (r'A3(19|20|21).*NEO|A32[01]-2[5-7]\d', 'A320', 'LEAP-1A'),
+    (r'A3(18|19|20|21)', 'A320', 'CFM56-5B'),
+    (r'757', 'B757', 'PW2037'),
+    (r'767', 'B767', 'CF6-80C2'),
+    (r'777', 'B777', 'GE90'),
+    (r'787', 'B787', 'GEnx-1B'),
+    (r'A33\d', 'A330', 'Trent 700'),
+    (r'A35\d', 'A350', 'Trent XWB')
+]
+_COMPILED_PATTERNS = [(re.compile(pattern), type_code, engine) for pattern, type_code, engine in TYPE_PATTERNS]
+
+# Relative fuel flow of newer-generation engines against the type's baseline rate
+ENGINE_FUEL_FACTORS = {
+    'LEAP-1A': 0.85,
+    'LEAP-1B': 0.86
+}
+
+# Fuel flow grows with airframe/engine deterioration; cap the adjustment for very old aircraft
+AGE_DEGRADATION_PER_YEAR = 0.005
+MAX_AGE_FACTOR = 1.15
+
+UNKNOWN = 'Unknown'
+
+def resolve_aircraft_type(manufacturer, model):
+    """
+    Resolve free-text manufacturer/model into a type code and engine variant
+
+    Returns:
+    tuple: (type code, engine variant), ('Unknown', 'Unknown') if no pattern matches
+    """
+    text = f"{model if isinstance(model, str) else ''}".upper().strip()
+    if not text and isinstance(manufacturer, str):
+        text = manufacturer.upper()
+    for pattern, type_code, engine in _COMPILED_PATTERNS:
+        if pattern.search(text):
+            return type_code, engine
+    return UNKNOWN, UNKNOWN
+
+def fuel_flow_factor(engine_variant, age_years):
+    """Age- and engine-adjusted multiplier on the type's baseline fuel flow"""
+    age = np.nan_to_num(np.asarray(age_years, dtype=np.float64), nan=0.0)
+    age_factor = np.minimum(1 + AGE_DEGRADATION_PER_YEAR * np.clip(age, 0, None), MAX_AGE_FACTOR)
+    engine_factor = np.array([ENGINE_FUEL_FACTORS.get(e, 1.0) for e in np.atleast_1d(engine_variant)])
+    return (age_factor * engine_factor).astype(np.float32)
+
+class AircraftRegistry:
+    """
+    Per-tail-number index of resolved type, engine variant and fuel-flow factor
+
+    Tail numbers live in a pandas hash index; the attributes are parallel compact arrays
+    (int16 codes into small type/engine tables, int16 age, float32 factor). A batch of
+    flights resolves with one get_indexer call plus array gathers.
+    """
+
+    def __init__(self, tails, type_codes, engine_variants, ages):
+        self.tails = pd.Index(tails, dtype=object)
+        type_index, self.types = pd.factorize(np.asarray(type_codes, dtype=object))
+        engine_index, self.engines = pd.factorize(np.asarray(engine_variants, dtype=object))
+        self.type_index = type_index.astype(np.int16)
+        self.engine_index = engine_index.astype(np.int16)
+        self.ages = np.nan_to_num(np.asarray(ages, dtype=np.float64), nan=-1).astype(np.int16)
+        self.fuel_factors = fuel_flow_factor(np.asarray(engine_variants, dtype=object), np.where(self.ages < 0, np.nan, self.ages))
+
+    @classmethod
+    def from_flights(cls, flights):
+        """
+        Build the registry once from flight history
+
+        Each tail takes its most frequent Manufacturer/Model and its latest Aicraft_age.
+        Text resolution runs once per distinct (manufacturer, model) pair, not per flight.
+        """
+        columns = ['Tail_Number', 'Manufacturer', 'Model', 'Aicraft_age']
+        history = flights[[c for c in columns if c in flights.columns]].dropna(subset=['Tail_Number'])
+        if 'Manufacturer' not in history.columns:
+            history = history.assign(Manufacturer='')
+
+        airframes = (history.groupby(['Tail_Number', 'Manufacturer', 'Model'], dropna=False, sort=False)
+                     .size().rename('flights').reset_index()
+                     .sort_values('flights', ascending=False)
+                     .drop_duplicates('Tail_Number'))
+        if 'Aicraft_age' in history.columns:
+            ages = history.groupby('Tail_Number')['Aicraft_age'].max()
+            airframes['Aicraft_age'] = airframes['Tail_Number'].map(ages)
+        else:
+            airframes['Aicraft_age'] = np.nan
+
+        distinct = airframes[['Manufacturer', 'Model']].drop_duplicates()
+        resolved = {(m, mo): resolve_aircraft_type(m, mo) for m, mo in distinct.itertuples(index=False)}
+        pairs = [resolved[key] for key in zip(airframes['Manufacturer'], airframes['Model'])]
+
+        return cls(airframes['Tail_Number'].to_numpy(),
+                   [p[0] for p in pairs], [p[1] for p in pairs],
+                   airframes['Aicraft_age'].to_numpy())
+
+    @classmethod
+    def load(cls, path=REGISTRY_PATH):
+        table = pd.read_csv(path)
+        return cls(table['Tail_Number'], table['Type_Code'], table['Engine_Variant'], table['Aircraft_Age'])
+
+    def save(self, path=REGISTRY_PATH):
+        self.to_frame().to_csv(path, index=False)
+
+    def to_frame(self):
+        return pd.DataFrame({
+            'Tail_Number': self.tails,
+            'Type_Code': np.asarray(self.types, dtype=object)[self.type_index],
+            'Engine_Variant': np.asarray(self.engines, dtype=object)[self.engine_index],
+            'Aircraft_Age': np.where(self.ages < 0, np.nan, self.ages),
+            'Fuel_Flow_Factor': self.fuel_factors
+        })
+
+    def lookup(self, tail_number):
+        """Attributes of one airframe, or None if the tail is not registered"""
+        position = self.tails.get_indexer([tail_number])[0]
+        if position < 0:
+            return None
+        return {
+            'type_code': self.types[self.type_index[position]],
+            'engine_variant': self.engines[self.engine_index[position]],
+            'age': None if self.ages[position] < 0 else int(self.ages[position]),
+            'fuel_flow_factor': float(self.fuel_factors[position])
+        }
+
+    def positions(self, tail_numbers):
+        """Registry row for every tail (-1 when unregistered), in one hash-index pass"""
+        return self.tails.get_indexer(pd.Series(tail_numbers, copy=False))
+
+    def resolve(self, tail_numbers):
+        """
+        Vectorized per-flight attributes
+
+        Returns:
+        pd.DataFrame: Type_Code, Engine_Variant and Fuel_Flow_Factor per flight
+                      (Unknown / 1.0 for unregistered tails)
+        """
+        return self.gather(self.positions(tail_numbers))
+
+    def gather(self, positions):
+        """Attributes for precomputed registry positions (see positions / tail_tables)"""
+        # Each table carries a trailing slot for unregistered tails, so position -1 gathers it
+        types = np.append(np.asarray(self.types, dtype=object)[self.type_index], UNKNOWN)
+        engines = np.append(np.asarray(self.engines, dtype=object)[self.engine_index], UNKNOWN)
+        factors = np.append(self.fuel_factors, np.float32(1.0))
+        return pd.DataFrame({
+            'Type_Code': types[positions],
+            'Engine_Variant': engines[positions],
+            'Fuel_Flow_Factor': factors[positions]
+        })
+
+    def tail_tables(self, tail_dictionary):
+        """
+        Registry positions aligned with a FlightStore tail dictionary
+
+        Returns:
+        np.ndarray: Registry row per tail code, with a trailing -1 slot for missing tails,
+                    so store.gather('Tail_Number', table) maps flights to registry rows
+        """
+        return np.append(self.tails.get_indexer(tail_dictionary.values), -1)
+
+    def __len__(self):
+        return len(self.tails)
@@ -0,0 +1,138 @@
+import os
+import sys
+import time
+import runpy
+import argparse
+import subprocess
+
+# Only the standard library is imported here. Each subcommand imports what it needs when it
+# runs, so `--help` and light commands never pay for pandas, sklearn, xgboost or matplotlib.
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def run_script(module, argv=()):
+    """
+    Run a backend/src script as if it were started directly
+
+    Parameters:
+    module (str): Script module name (e.g. 'estimate_fuel')
+    argv (list): Arguments passed through to the script's own parser
+    """
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    saved_argv = sys.argv
+    sys.argv = [os.path.join(SCRIPT_DIR, module + '.py'), *argv]
+    try:
+        runpy.run_module(module, run_name='__main__', alter_sys=True)
+    finally:
+        sys.argv = saved_argv
+
+def cmd_estimate(args):
+    run_script('estimate_fuel', args.script_args)
+
+def cmd_enrich(args):
+    run_script('simulate_weather_integration' if args.simulate else 'integrate_metar', args.script_args)
+
+def cmd_split(args):
+    run_script('split_dataset', args.script_args)
+
+def cmd_train(args):
+    run_script('train_models' if args.baseline else 'train_weather_enhanced_models', args.script_args)
+
+def cmd_eda(args):
+    run_script('eda_visualizations' if args.plots else 'eda_script', args.script_args)
+
+def cmd_report(args):
+    run_script('model_performance_visualizations', args.script_args)
+
+def cmd_pipeline(args):
+    run_script('pipeline', args.script_args)
+
+def cmd_cv(args):
+    run_script('cross_validation', args.script_args)
+
+def cmd_scenarios(args):
+    run_script('weather_scenarios', args.script_args)
+
+def cmd_score(args):
+    """Score a CSV of flights with the currently published model bundle"""
+    import pandas as pd
+    from model_registry import load_bundle, prepare_features, predict_with_bundle
+
+    bundle = load_bundle(version=args.version)
+    flights = pd.read_csv(args.input)
+    predictions = predict_with_bundle(bundle, prepare_features(bundle, flights), args.model)
+    flights['Predicted_Extra_Fuel_kg'] = predictions
+    flights.to_csv(args.output, index=False)
+    print(f"Scored {len(flights)} flights with {args.model or bundle['best_model']} "
+          f"(version {bundle['version']}); saved to {args.output}")
+
+def cmd_bench_startup(args):
+    """Wall-clock startup of CLI commands against importing the training script directly"""
+    cli = os.path.abspath(__file__)
+    commands = {
+        'cli --help': [sys.executable, cli, '--help'],
+        'cli score --help': [sys.executable, cli, 'score', '--help'],
+        'cli train --help': [sys.executable, cli, 'train', '--help'],
+        'eager sklearn/xgboost/lightgbm/pyplot/seaborn imports': [
+            sys.executable, '-c',
+            'import sklearn.ensemble, sklearn.linear_model, xgboost, lightgbm, matplotlib.pyplot, seaborn'],
+        'import train_weather_enhanced_models': [sys.executable, '-c', 'import train_weather_enhanced_models']
+    }
+    print(f"{'Command':<62} {'Best (s)':>9} {'Median (s)':>11}")
+    for label, command in commands.items():
+        timings = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=SCRIPT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"{label:<62} {timings[0]:>9.3f} {timings[len(timings) // 2]:>11.3f}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='cli.py', description="Aviation fuel prediction pipeline",
+        epilog="Unrecognized arguments of a script-backed command are passed to that script (e.g. cli.py eda --workers 4)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def script_command(name, handler, help_text):
+        command = commands.add_parser(name, help=help_text, epilog="Other arguments are passed to the script")
+        command.set_defaults(handler=handler, script_args=[])
+        return command
+
+    script_command('estimate', cmd_estimate, "Estimate per-flight distance and fuel (estimate_fuel.py)")
+    enrich = script_command('enrich', cmd_enrich, "Add METAR weather (integrate_metar.py, needs Internet)")
+    enrich.add_argument('--simulate', action='store_true', help="Use simulate_weather_integration.py instead")
+    script_command('split', cmd_split, "Split the dataset into train/val/test (split_dataset.py)")
+    train = script_command('train', cmd_train, "Train and publish the weather-enhanced models")
+    train.add_argument('--baseline', action='store_true', help="Train the baseline models (train_models.py) instead")
+    eda = script_command('eda', cmd_eda, "Profile the dataset (eda_script.py)")
+    eda.add_argument('--plots', action='store_true', help="Draw the EDA figures (eda_visualizations.py) instead")
+    script_command('cv', cmd_cv, "k-fold cross-validation of the four regressors in parallel (cross_validation.py)")
+    script_command('report', cmd_report, "Render model performance figures (model_performance_visualizations.py)")
+    script_command('scenarios', cmd_scenarios, "Monte Carlo extra-fuel bands per flight (weather_scenarios.py)")
+    script_command('pipeline', cmd_pipeline, "Run the stages whose inputs changed, in parallel (pipeline.py)")
+
+    score = commands.add_parser('score', help="Score a CSV of flights with the published models")
+    score.add_argument('--input', default='/home/ubuntu/data/enhanced_flight_data_with_weather.csv')
+    score.add_argument('--output', default='/home/ubuntu/data/scored_flights.csv')
+    score.add_argument('--model', help="Model name (default: the bundle's best model)")
+    score.add_argument('--version', help="Model version (default: CURRENT)")
+    score.set_defaults(handler=cmd_score)
+
+    bench = commands.add_parser('bench-startup', help="Measure command startup time")
+    bench.add_argument('--repeats', type=int, default=5)
+    bench.set_defaults(handler=cmd_bench_startup)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra:
+        if not hasattr(args, 'script_args'):
+            parser.error(f"unrecognized arguments: {' '.join(extra)}")
+        args.script_args = extra[1:] if extra[0] == '--' else extra
+    args.handler(args)
+
+if __name__ == '__main__':
+    main()
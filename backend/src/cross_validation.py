@@ -0,0 +1,199 @@
+import os
+import time
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from model_evaluation import compute_metrics
+from regressors import build_regressor, REGRESSOR_NAMES
+
+CV_RESULTS_PATH = '/home/ubuntu/weather_enhanced_cv_fold_results.csv'
+CV_SUMMARY_PATH = '/home/ubuntu/weather_enhanced_cv_summary.csv'
+BASELINE_CV_RESULTS_PATH = '/home/ubuntu/model_cv_fold_results.csv'
+BASELINE_CV_SUMMARY_PATH = '/home/ubuntu/model_cv_summary.csv'
+
+# Relative fit cost of each regressor; the slowest tasks are scheduled first so the
+# last task to finish is a short one
+FIT_COST = {'Random Forest': 50, 'XGBoost': 10, 'LightGBM': 5, 'Linear Regression': 1}
+
+def share_arrays(directory, X, y, folds):
+    """
+    Write the feature matrix, target and fold assignment once as .npy files
+
+    Workers open them with mmap_mode='r', so every process reads the same page-cache
+    copy instead of receiving a pickled matrix per task.
+    """
+    np.save(os.path.join(directory, 'X.npy'), np.ascontiguousarray(X))
+    np.save(os.path.join(directory, 'y.npy'), np.asarray(y, dtype=np.float64))
+    np.save(os.path.join(directory, 'folds.npy'), np.asarray(folds, dtype=np.int8))
+
+def open_shared(directory):
+    """Memory-map the arrays written by share_arrays"""
+    return tuple(np.load(os.path.join(directory, name + '.npy'), mmap_mode='r') for name in ['X', 'y', 'folds'])
+
+def fit_fold(directory, model_name, fold, n_jobs=1):
+    """
+    Fit one model on all folds but one and score it on the held-out fold
+
+    Parameters:
+    directory (str): Folder written by share_arrays
+    model_name (str): One of REGRESSOR_NAMES
+    fold (int): Held-out fold number
+    n_jobs (int): Threads for the model
+
+    Returns:
+    dict: Fold metrics and timings
+    """
+    start = time.perf_counter()
+    X, y, folds = open_shared(directory)
+    test = np.asarray(folds) == fold
+    # Only the rows this task needs are read out of the shared mapping
+    X_train, y_train = X[~test], y[~test]
+    X_test, y_test = X[test], y[test]
+
+    model = build_regressor(model_name, n_jobs)
+    if model_name == 'Linear Regression':
+        from sklearn.preprocessing import StandardScaler
+        scaler = StandardScaler()
+        X_train = scaler.fit_transform(X_train)
+        X_test = scaler.transform(X_test)
+
+    fit_start = time.perf_counter()
+    model.fit(X_train, y_train)
+    predict_start = time.perf_counter()
+    predictions = model.predict(X_test)
+    done = time.perf_counter()
+
+    metrics = compute_metrics(y_test, {model_name: predictions}).loc[model_name]
+    return {
+        'Model': model_name,
+        'Fold': fold,
+        'Train_Rows': len(y_train),
+        'Test_Rows': len(y_test),
+        'MAE': metrics['MAE'],
+        'RMSE': metrics['RMSE'],
+        'R2': metrics['R2'],
+        'Fit_s': predict_start - fit_start,
+        'Predict_s': done - predict_start,
+        'Wall_s': done - start,
+        'Worker': os.getpid()
+    }
+
+def cross_validate(X, y, folds, model_names=REGRESSOR_NAMES, max_workers=None, threads_per_task=None, shared_dir=None,
+                   n_folds=None):
+    """
+    k-fold cross-validation of several regressors, with (model, fold) fits spread over processes
+
+    Parameters:
+    X (pd.DataFrame or np.ndarray): Feature matrix
+    y (array-like): Target
+    folds (np.ndarray): Fold number per row (dataset_splits.make_folds)
+    model_names (list): Regressors to compare
+    max_workers (int): Worker processes (default: one per task, up to the CPU count;
+                       1 fits serially in this process)
+    threads_per_task (int): Threads per model fit (default: the cores left per worker)
+    shared_dir (str): Folder for the memory-mapped arrays (default: the system temp folder)
+    n_folds (int): Expected number of folds, numbered 0..n_folds-1 (default: the distinct
+                   fold numbers present)
+
+    Returns:
+    tuple: (per-fold results DataFrame, total wall-clock seconds)
+    """
+    # Check the fold layout before scheduling anything: an empty fold would otherwise
+    # surface as a failed fit deep inside a worker process
+    fold_ids = np.unique(np.asarray(folds))
+    if n_folds is not None:
+        empty = sorted(set(range(n_folds)) - set(fold_ids.tolist()))
+        if empty or len(fold_ids) != n_folds:
+            raise ValueError(f"Expected rows in each of folds 0..{n_folds - 1}; empty: {empty}, "
+                             f"present: {fold_ids.tolist()}")
+    if len(fold_ids) < 2:
+        raise ValueError(f"Cross-validation needs at least 2 non-empty folds, got {len(fold_ids)}")
+    tasks = sorted(((name, fold) for name in model_names for fold in fold_ids.tolist()),
+                   key=lambda task: -FIT_COST.get(task[0], 1))
+    cpus = os.cpu_count() or 1
+    max_workers = max_workers or min(cpus, len(tasks))
+    threads_per_task = threads_per_task or max(1, cpus // max_workers)
+
+    with tempfile.TemporaryDirectory(prefix='cv_', dir=shared_dir) as directory:
+        share_arrays(directory, X, y, folds)
+        start = time.perf_counter()
+        if max_workers == 1:
+            rows = [fit_fold(directory, name, fold, threads_per_task) for name, fold in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(fit_fold, directory, name, fold, threads_per_task) for name, fold in tasks]
+                rows = [future.result() for future in futures]
+        wall = time.perf_counter() - start
+
+    results = pd.DataFrame(rows).sort_values(['Model', 'Fold']).reset_index(drop=True)
+    return results, wall
+
+def summarize_cv(results):
+    """
+    Mean and standard deviation of each metric across folds, per model
+
+    Returns:
+    pd.DataFrame: One row per model (best mean R² first)
+    """
+    summary = results.groupby('Model').agg(
+        MAE_mean=('MAE', 'mean'), MAE_std=('MAE', 'std'),
+        RMSE_mean=('RMSE', 'mean'), RMSE_std=('RMSE', 'std'),
+        R2_mean=('R2', 'mean'), R2_std=('R2', 'std'),
+        Fold_Wall_s_mean=('Wall_s', 'mean'), Fold_Wall_s_max=('Wall_s', 'max')
+    )
+    return summary.sort_values('R2_mean', ascending=False)
+
+def load_baseline_features():
+    """Features and target of train_models.py (the split CSVs, concatenated)"""
+    X = pd.concat([pd.read_csv(f"/home/ubuntu/data/X_{name}.csv") for name in ['train', 'val', 'test']], ignore_index=True)
+    y = pd.concat([pd.read_csv(f"/home/ubuntu/data/y_{name}.csv").squeeze('columns') for name in ['train', 'val', 'test']],
+                  ignore_index=True)
+    return X, y
+
+if __name__ == "__main__":
+    from dataset_splits import make_folds
+
+    parser = argparse.ArgumentParser(description="Parallel k-fold cross-validation of the fuel regressors")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--strategy', choices=['random', 'group'], default='random')
+    parser.add_argument('--group-by', default='tail', help="Grouping key for --strategy group ('tail' or 'route')")
+    parser.add_argument('--models', nargs='+', default=REGRESSOR_NAMES, choices=REGRESSOR_NAMES)
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per fit, up to the CPU count)")
+    parser.add_argument('--threads', type=int, help="Threads per fit (default: cores left per worker)")
+    parser.add_argument('--baseline', action='store_true', help="Cross-validate the train_models.py features instead")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    if args.strategy == 'group' and args.baseline:
+        parser.error("--strategy group needs the flight columns of the weather-enhanced data")
+
+    if args.baseline:
+        X, y = load_baseline_features()
+        rows = X
+    else:
+        from train_weather_enhanced_models import prepare_enhanced_data_for_modeling, create_weather_enhanced_features
+        enhanced_data = prepare_enhanced_data_for_modeling()
+        X, y, _ = create_weather_enhanced_features(enhanced_data)
+        rows = enhanced_data.loc[X.index]
+    folds = make_folds(rows, args.strategy, args.group_by, args.folds, args.seed)
+
+    print(f"Cross-validating {len(args.models)} models over {args.folds} {args.strategy} folds "
+          f"of {len(X)} rows x {X.shape[1]} features")
+    results, wall = cross_validate(X, y, folds, args.models, args.workers, args.threads, n_folds=args.folds)
+    summary = summarize_cv(results)
+
+    pd.set_option('display.width', 160)
+    pd.set_option('display.max_columns', None)
+    print("\nPer-fold results:")
+    print(results.drop(columns='Worker').round(3).to_string(index=False))
+    print("\nSummary (mean ± std across folds):")
+    print(summary.round(4))
+    print(f"\n{len(results)} fits in {wall:.1f}s wall-clock on {results['Worker'].nunique()} worker(s) "
+          f"(per-fit wall-clock sums to {results['Wall_s'].sum():.1f}s)")
+
+    results_path, summary_path = ((BASELINE_CV_RESULTS_PATH, BASELINE_CV_SUMMARY_PATH) if args.baseline
+                                  else (CV_RESULTS_PATH, CV_SUMMARY_PATH))
+    results.to_csv(results_path, index=False)
+    summary.to_csv(summary_path)
+    print(f"Saved {results_path} and {summary_path}")
@@ -0,0 +1,198 @@
+import json
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from streaming_stats import RunningMoments, QuantileSketch, HyperLogLog
+
+DESCRIBE_QUANTILES = [0.25, 0.5, 0.75]
+PROFILE_QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+
+class ColumnProfile:
+    """
+    Mergeable per-column profile: counts, nulls, moments, quantiles and distinct values
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.null_count = 0
+        self.numeric = True
+        self.integer = True
+        self.moments = RunningMoments()
+        self.quantiles = QuantileSketch()
+        self.distinct = HyperLogLog()
+
+    def update(self, series):
+        """Add one chunk of a column"""
+        self.count += len(series)
+        values = series.dropna()
+        self.null_count += len(series) - len(values)
+        if len(values) == 0:
+            return self
+
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            if series.dtype.kind not in 'iu':
+                self.integer = False
+            array = values.to_numpy(dtype=np.float64)
+            self.moments.update(array)
+            self.quantiles.update(array)
+        else:
+            # One non-numeric chunk makes the whole column non-numeric, like read_csv would
+            self.numeric = False
+            array = values.to_numpy()
+        self.distinct.update(array)
+        return self
+
+    def merge(self, other):
+        """Fold the profile of another partition of the same column into this one"""
+        self.count += other.count
+        self.null_count += other.null_count
+        self.numeric = self.numeric and other.numeric
+        self.integer = self.integer and other.integer
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        return self
+
+    @property
+    def non_null_count(self):
+        return self.count - self.null_count
+
+    @property
+    def dtype(self):
+        if not self.numeric:
+            return 'object'
+        return 'int64' if self.integer and self.null_count == 0 else 'float64'
+
+    def to_dict(self):
+        """Machine-readable summary of the column"""
+        summary = {
+            'count': self.count,
+            'non_null': self.non_null_count,
+            'nulls': self.null_count,
+            'dtype': self.dtype,
+            'approx_distinct': int(round(self.distinct.estimate()))
+        }
+        if self.numeric and self.moments.count:
+            summary.update({
+                'mean': self.moments.mean,
+                'std': self.moments.std,
+                'min': self.moments.min,
+                'max': self.moments.max,
+                'approx_quantiles': {
+                    f'{q:g}': float(v) for q, v in zip(PROFILE_QUANTILES, self.quantiles.quantiles(PROFILE_QUANTILES))
+                }
+            })
+        return summary
+
+def profile_chunk(chunk):
+    """
+    Profile one DataFrame chunk
+
+    Returns:
+    dict: Column name -> ColumnProfile
+    """
+    return {column: ColumnProfile(column).update(chunk[column]) for column in chunk.columns}
+
+def merge_profiles(profile, other):
+    """Merge two {column: ColumnProfile} dicts (columns missing on one side are kept)"""
+    for column, column_profile in other.items():
+        if column in profile:
+            profile[column].merge(column_profile)
+        else:
+            profile[column] = column_profile
+    return profile
+
+def profile_csv(path, chunksize=500000, max_workers=1, max_pending=None):
+    """
+    Profile a CSV chunk by chunk in bounded memory, optionally across worker processes
+
+    Parameters:
+    path (str): CSV to profile
+    chunksize (int): Rows per chunk
+    max_workers (int): Worker processes; 1 profiles in this process
+    max_pending (int): Chunks in flight at once (defaults to 2 x max_workers)
+
+    Returns:
+    dict: Column name -> ColumnProfile, in file column order
+    """
+    reader = pd.read_csv(path, chunksize=chunksize)
+    profile = {}
+
+    if max_workers == 1:
+        for chunk in reader:
+            merge_profiles(profile, profile_chunk(chunk))
+        return profile
+
+    # Keep only a few chunks in flight so memory stays bounded regardless of file size
+    max_pending = max_pending or 2 * max_workers
+    pending = set()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for chunk in reader:
+            pending.add(executor.submit(profile_chunk, chunk))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for finished in done:
+                    merge_profiles(profile, finished.result())
+        for finished in pending:
+            merge_profiles(profile, finished.result())
+
+    # Merge order varies with worker timing; restore the file's column order
+    columns = pd.read_csv(path, nrows=0).columns
+    return {column: profile[column] for column in columns if column in profile}
+
+def format_info(profile):
+    """Text in the spirit of DataFrame.info() built from a profile"""
+    rows = next(iter(profile.values())).count if profile else 0
+    table = pd.DataFrame({
+        'Column': list(profile.keys()),
+        'Non-Null Count': [f'{p.non_null_count} non-null' for p in profile.values()],
+        'Dtype': [p.dtype for p in profile.values()]
+    })
+    return (f"RangeIndex: {rows} entries, 0 to {max(rows - 1, 0)}\n"
+            f"Data columns (total {len(profile)} columns):\n"
+            f"{table.to_string()}\n")
+
+def format_describe(profile):
+    """DataFrame.describe()-style table for the numeric columns (approximate quantiles)"""
+    stats = {}
+    for column, p in profile.items():
+        if not p.numeric or p.moments.count == 0:
+            continue
+        q1, median, q3 = p.quantiles.quantiles(DESCRIBE_QUANTILES)
+        stats[column] = {
+            'count': float(p.moments.count),
+            'mean': p.moments.mean,
+            'std': p.moments.std,
+            'min': p.moments.min,
+            '25%': q1,
+            '50%': median,
+            '75%': q3,
+            'max': p.moments.max
+        }
+    return pd.DataFrame(stats)
+
+def format_missing(profile):
+    """isnull().sum()-style series built from a profile"""
+    return pd.Series({column: p.null_count for column, p in profile.items()})
+
+def write_summary(profile, summary_path, profile_path=None):
+    """
+    Write the human-readable eda_summary.txt and, optionally, a JSON profile
+
+    Parameters:
+    profile (dict): Column name -> ColumnProfile
+    summary_path (str): Path of the text summary
+    profile_path (str): Path of the JSON profile (skipped if None)
+    """
+    with open(summary_path, "w") as f:
+        f.write("Dataset Info:\n")
+        f.write(format_info(profile))
+        f.write("\nDescriptive Statistics:\n")
+        f.write(format_describe(profile).to_string())
+        f.write("\nMissing Values:\n")
+        f.write(format_missing(profile).to_string())
+
+    if profile_path:
+        with open(profile_path, "w") as f:
+            json.dump({column: p.to_dict() for column, p in profile.items()}, f, indent=2)
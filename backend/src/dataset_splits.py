@@ -0,0 +1,282 @@
+import pandas as pd
+import numpy as np
+
+# Split labels stored in the per-row assignment array
+TRAIN, VAL, TEST, UNUSED = 0, 1, 2, -1
+SPLIT_NAMES = {TRAIN: 'train', VAL: 'val', TEST: 'test'}
+
+# Number of hash buckets used for group assignment (resolution of the split fractions)
+GROUP_BUCKETS = 10000
+
+def _day_codes(dates):
+    """
+    Convert a FlightDate column into integer day numbers (days since epoch)
+
+    Parameters:
+    dates (array-like): FlightDate values (strings or datetimes)
+
+    Returns:
+    np.ndarray: int64 day numbers, with -1 for missing or unparseable dates
+    """
+    parsed = pd.to_datetime(pd.Series(dates, copy=False), errors='coerce')
+    days = parsed.to_numpy(dtype='datetime64[ns]', na_value=np.datetime64('NaT')).astype('datetime64[D]')
+    codes = days.astype(np.int64)
+    codes[np.isnat(days)] = -1
+    return codes
+
+def _group_hashes(data, group_by):
+    """
+    Hash the grouping key of every row into a uint64 without building key strings
+
+    Parameters:
+    data (pd.DataFrame): Flight data
+    group_by (str): 'tail' (Tail_Number), 'route' (Dep_Airport + Arr_Airport) or a column name
+
+    Returns:
+    np.ndarray: uint64 hash per row
+    """
+    if group_by == 'tail':
+        columns = ['Tail_Number']
+    elif group_by == 'route':
+        columns = ['Dep_Airport', 'Arr_Airport']
+    else:
+        columns = [group_by]
+
+    return pd.util.hash_pandas_object(data[columns], index=False).to_numpy()
+
+def _labels_to_indices(labels):
+    """Turn a per-row split label array into positional index arrays"""
+    return {name: np.flatnonzero(labels == code) for code, name in SPLIT_NAMES.items()}
+
+def time_window_split(dates, val_start=None, test_start=None, val_size=0.15, test_size=0.15):
+    """
+    Split rows by FlightDate windows: train < val_start <= val < test_start <= test
+
+    When the window boundaries are not given they are placed at the date quantiles that
+    leave roughly val_size / test_size of the rows in each window. Whole days always stay
+    on one side, so the same tail number on the same day can never leak across splits.
+
+    Parameters:
+    dates (array-like): FlightDate value per row
+    val_start (str or datetime): First day of the validation window
+    test_start (str or datetime): First day of the test window
+    val_size (float): Fraction of rows for validation when val_start is None
+    test_size (float): Fraction of rows for test when test_start is None
+
+    Returns:
+    dict: Positional index arrays keyed by 'train', 'val' and 'test'
+
+    Raises:
+    ValueError: When any of the three windows holds no rows
+    """
+    days = _day_codes(dates)
+    valid = days >= 0
+
+    if val_start is None or test_start is None:
+        valid_days = days[valid]
+        if len(valid_days) == 0:
+            raise ValueError("No valid FlightDate values to split on")
+        q_val, q_test = np.quantile(valid_days, [1 - val_size - test_size, 1 - test_size],
+                                    method='higher')
+    if val_start is not None:
+        q_val = _day_codes([val_start])[0]
+    if test_start is not None:
+        q_test = _day_codes([test_start])[0]
+
+    # One searchsorted pass assigns every row: 0 = train, 1 = val, 2 = test
+    labels = np.searchsorted(np.array([q_val, q_test]), days, side='right').astype(np.int8)
+    labels[~valid] = UNUSED
+
+    # Few distinct days (or one day holding most rows) can put both boundaries on the same day
+    split = _labels_to_indices(labels)
+    empty = [name for name, rows in split.items() if len(rows) == 0]
+    if empty:
+        raise ValueError(f"Time windows leave no rows for {', '.join(empty)} "
+                         f"(val starts {np.datetime64(int(q_val), 'D')}, test starts {np.datetime64(int(q_test), 'D')})")
+    return split
+
+def group_split(data, group_by='tail', val_size=0.15, test_size=0.15, seed=42):
+    """
+    Split rows so every group (tail number, route, ...) lands entirely in one split
+
+    Groups are assigned by hashing their key into GROUP_BUCKETS buckets, so assignment
+    is a single vectorized pass, is stable across runs and does not need the groups sorted.
+
+    Parameters:
+    data (pd.DataFrame): Flight data containing the grouping columns
+    group_by (str): 'tail', 'route' or any column name
+    val_size (float): Approximate fraction of groups for validation
+    test_size (float): Approximate fraction of groups for test
+    seed (int): Salt mixed into the hash to draw a different assignment
+
+    Returns:
+    dict: Positional index arrays keyed by 'train', 'val' and 'test'
+    """
+    hashes = _group_hashes(data, group_by)
+    if seed:
+        hashes = hashes ^ np.uint64(seed * 0x9E3779B97F4A7C15 % 2**64)
+        hashes = hashes * np.uint64(0xBF58476D1CE4E5B9)
+    buckets = (hashes % np.uint64(GROUP_BUCKETS)).astype(np.int64)
+
+    cut_val = int(round((1 - val_size - test_size) * GROUP_BUCKETS))
+    cut_test = int(round((1 - test_size) * GROUP_BUCKETS))
+    labels = np.searchsorted(np.array([cut_val, cut_test]), buckets, side='right').astype(np.int8)
+
+    return _labels_to_indices(labels)
+
+def random_split(n_rows, val_size=0.15, test_size=0.15, seed=42):
+    """
+    Index-only replacement for two chained random train_test_split calls
+
+    Parameters:
+    n_rows (int): Number of rows
+    val_size (float): Fraction of rows for validation
+    test_size (float): Fraction of rows for test
+    seed (int): Random seed
+
+    Returns:
+    dict: Positional index arrays keyed by 'train', 'val' and 'test'
+    """
+    order = np.random.default_rng(seed).permutation(n_rows)
+    n_test = int(round(n_rows * test_size))
+    n_val = int(round(n_rows * val_size))
+
+    return {
+        'train': np.sort(order[n_val + n_test:]),
+        'val': np.sort(order[n_test:n_test + n_val]),
+        'test': np.sort(order[:n_test])
+    }
+
+def rolling_origin_folds(dates, n_folds=5, horizon_days=7, min_train_days=7):
+    """
+    Generate rolling-origin (expanding window) folds over FlightDate
+
+    Fold k trains on every day before its origin and tests on the following horizon_days.
+    Origins are spaced so the last fold ends on the last day in the data.
+
+    Parameters:
+    dates (array-like): FlightDate value per row
+    n_folds (int): Number of folds
+    horizon_days (int): Length of each test window in days
+    min_train_days (int): Minimum number of days before the first origin
+
+    Yields:
+    tuple: (train_idx, test_idx) positional index arrays
+    """
+    days = _day_codes(dates)
+    valid = days >= 0
+    if not valid.any():
+        raise ValueError("No valid FlightDate values to split on")
+
+    first_day, last_day = days[valid].min(), days[valid].max()
+    last_origin = last_day + 1 - horizon_days
+    first_origin = max(first_day + min_train_days, last_origin - (n_folds - 1) * horizon_days)
+    if first_origin > last_origin:
+        raise ValueError(f"Date range too short for {n_folds} folds of {horizon_days} days")
+
+    # Sorting once lets every fold be two searchsorted lookups instead of a full mask
+    order = np.argsort(np.where(valid, days, np.iinfo(np.int64).max), kind='stable')
+    sorted_days = days[order]
+    n_valid = int(valid.sum())
+
+    for origin in range(first_origin, last_origin + 1, horizon_days):
+        train_end = np.searchsorted(sorted_days[:n_valid], origin, side='left')
+        test_end = np.searchsorted(sorted_days[:n_valid], origin + horizon_days, side='left')
+        yield np.sort(order[:train_end]), np.sort(order[train_end:test_end])
+
+def random_folds(n_rows, n_folds=5, seed=42):
+    """
+    Assign rows to k cross-validation folds of (almost) equal size at random
+
+    Parameters:
+    n_rows (int): Number of rows
+    n_folds (int): Number of folds
+    seed (int): Random seed
+
+    Returns:
+    np.ndarray: int8 fold number per row
+    """
+    folds = np.empty(n_rows, dtype=np.int8)
+    folds[np.random.default_rng(seed).permutation(n_rows)] = np.arange(n_rows) % n_folds
+    return folds
+
+def group_folds(data, group_by='tail', n_folds=5, seed=42):
+    """
+    Assign rows to k cross-validation folds so every group stays within one fold
+
+    Distinct groups are visited in a seeded random order and each goes to the fold with
+    the fewest rows so far, so fold sizes stay balanced and no fold is left empty.
+
+    Parameters:
+    data (pd.DataFrame): Flight data containing the grouping columns
+    group_by (str): 'tail', 'route' or any column name
+    n_folds (int): Number of folds
+    seed (int): Random seed for the group order
+
+    Returns:
+    np.ndarray: int8 fold number per row
+    """
+    codes, groups = pd.factorize(_group_hashes(data, group_by))
+    if len(groups) < n_folds:
+        raise ValueError(f"Only {len(groups)} distinct {group_by} groups for {n_folds} folds")
+
+    group_rows = np.bincount(codes, minlength=len(groups))
+    group_fold = np.empty(len(groups), dtype=np.int8)
+    fold_rows = np.zeros(n_folds, dtype=np.int64)
+    for group in np.random.default_rng(seed).permutation(len(groups)):
+        fold = np.argmin(fold_rows)
+        group_fold[group] = fold
+        fold_rows[fold] += group_rows[group]
+    return group_fold[codes]
+
+def make_folds(data, strategy='random', group_by=None, n_folds=5, seed=42):
+    """
+    Build per-row k-fold assignments for cross-validation
+
+    Parameters:
+    data (pd.DataFrame): Flight data (needs the group columns for 'group')
+    strategy (str): 'random' or 'group'
+    group_by (str): Grouping key for 'group' ('tail' or 'route')
+    n_folds (int): Number of folds
+    seed (int): Random seed (row order for 'random', group order for 'group')
+
+    Returns:
+    np.ndarray: int8 fold number per row
+    """
+    if strategy == 'random':
+        return random_folds(len(data), n_folds, seed)
+    if strategy == 'group':
+        return group_folds(data, group_by or 'tail', n_folds, seed)
+    raise ValueError(f"Unknown fold strategy: {strategy}")
+
+def make_split(data, strategy='time', group_by=None, val_size=0.15, test_size=0.15, seed=42):
+    """
+    Build train/validation/test indices for the flight data
+
+    Parameters:
+    data (pd.DataFrame): Flight data (needs FlightDate for 'time', the group columns for 'group')
+    strategy (str): 'time', 'group' or 'random'
+    group_by (str): Grouping key for 'group' ('tail' or 'route')
+    val_size (float): Fraction for validation
+    test_size (float): Fraction for test
+    seed (int): Random seed for 'random' and salt for 'group'
+
+    Returns:
+    dict: Positional index arrays keyed by 'train', 'val' and 'test'
+    """
+    if strategy == 'time':
+        return time_window_split(data['FlightDate'], val_size=val_size, test_size=test_size)
+    if strategy == 'group':
+        return group_split(data, group_by or 'tail', val_size=val_size, test_size=test_size, seed=seed)
+    if strategy == 'random':
+        return random_split(len(data), val_size=val_size, test_size=test_size, seed=seed)
+    raise ValueError(f"Unknown split strategy: {strategy}")
+
+def save_split(split, path):
+    """Save split indices to a compressed .npz file"""
+    np.savez_compressed(path, **split)
+
+def load_split(path):
+    """Load split indices saved by save_split"""
+    with np.load(path) as stored:
+        return {name: stored[name] for name in SPLIT_NAMES.values()}
@@ -0,0 +1,154 @@
+import time
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from streaming_stats import FixedBinHistograms
+
+PSI_ALERT = 0.2
+KS_ALERT = 0.1
+
+def build_drift_reference(X_train, n_bins=20):
+    """
+    Reference histograms of the training features, stored with the published models
+
+    Parameters:
+    X_train (pd.DataFrame): Training features in model column order
+    n_bins (int): Quantile bins per feature
+
+    Returns:
+    FixedBinHistograms: Edges at the training quantiles, filled with the training rows
+    """
+    X = np.asarray(X_train, dtype=np.float64)
+    return FixedBinHistograms.from_quantiles(X, n_bins).update(X)
+
+def population_stability_index(reference_counts, live_counts, epsilon=1e-4):
+    """
+    PSI per feature from two (features x bins) count arrays
+
+    Returns:
+    np.ndarray: sum((p - q) * ln(p / q)) per feature, with empty bins floored at epsilon
+    """
+    p = np.maximum(reference_counts / np.maximum(reference_counts.sum(axis=1, keepdims=True), 1), epsilon)
+    q = np.maximum(live_counts / np.maximum(live_counts.sum(axis=1, keepdims=True), 1), epsilon)
+    return ((q - p) * np.log(q / p)).sum(axis=1)
+
+def ks_statistic(reference_counts, live_counts):
+    """Largest gap between the binned cumulative distributions, per feature"""
+    p = np.cumsum(reference_counts, axis=1) / np.maximum(reference_counts.sum(axis=1, keepdims=True), 1)
+    q = np.cumsum(live_counts, axis=1) / np.maximum(live_counts.sum(axis=1, keepdims=True), 1)
+    return np.abs(p - q).max(axis=1)
+
+class DriftMonitor:
+    """
+    Streaming comparison of scored features against the training distribution
+
+    Every scored batch is added to live histograms over the reference bin edges (one
+    broadcast comparison and one bincount per batch). Memory is constant: features x bins
+    counts for the reference, the current window and the last completed window. Once the
+    current window holds window_rows rows it becomes the last window and a new one starts,
+    so scores track recent traffic (e.g. seasonal shifts) rather than all history.
+    """
+
+    def __init__(self, window_rows=50000, min_rows=500, psi_alert=PSI_ALERT, ks_alert=KS_ALERT):
+        self.window_rows = window_rows
+        self.min_rows = min_rows
+        self.psi_alert = psi_alert
+        self.ks_alert = ks_alert
+        self.version = None
+        self.feature_names = []
+        self.reference = None
+        self.live = None
+        self.last_window = None
+        self.rows_observed = 0
+        self._lock = threading.Lock()
+
+    def observe(self, bundle, X):
+        """
+        Add a batch of scored features (called from ModelRegistry for every prediction)
+
+        Parameters:
+        bundle (dict): Model bundle that scored the batch (its drift_reference is used)
+        X (pd.DataFrame or np.ndarray): Features in the bundle's column order
+        """
+        reference = bundle.get('drift_reference')
+        if reference is None:
+            return
+        with self._lock:
+            if bundle['version'] != self.version:
+                # A new model version brings its own training reference
+                self.version = bundle['version']
+                self.feature_names = list(bundle['feature_names'])
+                self.reference = reference
+                self.live = reference.empty_like()
+                self.last_window = None
+            self.live.update(X)
+            self.rows_observed += len(X)
+            if self.live.total >= self.window_rows:
+                self.last_window, self.live = self.live, self.live.empty_like()
+
+    def scores(self):
+        """
+        Drift scores per feature for the current window (or the last full one while the
+        current window is still small)
+
+        Returns:
+        pd.DataFrame: PSI, KS and alert flag per feature (empty before any reference is seen)
+        """
+        with self._lock:
+            if self.reference is None:
+                return pd.DataFrame(columns=['feature', 'PSI', 'KS', 'alert', 'rows'])
+            window = self.live
+            if window.total < self.min_rows and self.last_window is not None:
+                window = self.last_window
+            live_counts = window.counts.copy()
+            rows = window.total
+            reference_counts = self.reference.counts
+        psi = population_stability_index(reference_counts, live_counts)
+        ks = ks_statistic(reference_counts, live_counts)
+        return pd.DataFrame({
+            'feature': self.feature_names,
+            'PSI': psi,
+            'KS': ks,
+            'alert': (rows >= self.min_rows) & ((psi > self.psi_alert) | (ks > self.ks_alert)),
+            'rows': rows
+        }).sort_values('PSI', ascending=False).reset_index(drop=True)
+
+    def report(self):
+        """JSON-ready summary for the serving layer"""
+        scores = self.scores()
+        return {
+            'model_version': self.version,
+            'rows_observed': self.rows_observed,
+            'window_rows': int(scores['rows'].iloc[0]) if len(scores) else 0,
+            'alerts': scores.loc[scores['alert'], 'feature'].tolist(),
+            'features': scores.to_dict(orient='records')
+        }
+
+if __name__ == "__main__":
+    from model_registry import load_bundle, prepare_features
+    from train_weather_enhanced_models import prepare_enhanced_data_for_modeling
+
+    parser = argparse.ArgumentParser(description="Replay flights in date order through the drift monitor of the current model")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Rows per simulated scoring request")
+    parser.add_argument('--window', type=int, default=5000, help="Rows per monitoring window")
+    args = parser.parse_args()
+
+    bundle = load_bundle()
+    if bundle.get('drift_reference') is None:
+        raise SystemExit(f"Model version {bundle['version']} has no drift reference; retrain to add one")
+
+    # Same derived features as training, replayed in time order so windows follow the season
+    enhanced_data = prepare_enhanced_data_for_modeling().sort_values('FlightDate', kind='stable')
+    X = prepare_features(bundle, enhanced_data)
+
+    monitor = DriftMonitor(window_rows=args.window)
+    elapsed = 0.0
+    for start in range(0, len(X), args.batch_size):
+        batch = X.iloc[start:start + args.batch_size]
+        started = time.perf_counter()
+        monitor.observe(bundle, batch)
+        elapsed += time.perf_counter() - started
+
+    print(f"Observed {len(X)} rows at {elapsed / max(len(X), 1) * 1e6:.2f} µs per row (batches of {args.batch_size})")
+    print(monitor.scores().head(10))
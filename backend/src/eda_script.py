@@ -1,36 +1,36 @@
-
+import argparse
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from data_profiler import profile_csv, format_info, format_describe, format_missing, write_summary
 
-# Load the augmented dataset
-df_augmented = pd.read_csv("/home/ubuntu/data/estimated_fuel_consumption_sample_100k_new_lookup.csv")
+ESTIMATE_PATH = "/home/ubuntu/data/estimated_fuel_consumption_sample_100k_new_lookup.csv"
 
-# Display the first few rows
-print("First 5 rows of the augmented dataset:")
-print(df_augmented.head())
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming summary statistics for the fuel estimates")
+    parser.add_argument("--input", default=ESTIMATE_PATH)
+    parser.add_argument("--chunksize", type=int, default=500000)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes profiling chunks in parallel")
+    args = parser.parse_args()
 
-# Display basic information about the dataset
-print("\nDataset Info:")
-print(df_augmented.info())
+    # Display the first few rows (only these rows are read up front)
+    print("First 5 rows of the augmented dataset:")
+    print(pd.read_csv(args.input, nrows=5))
 
-# Display descriptive statistics
-print("\nDescriptive Statistics:")
-print(df_augmented.describe())
+    # Profile the dataset chunk by chunk with mergeable sketches (bounded memory)
+    profile = profile_csv(args.input, chunksize=args.chunksize, max_workers=args.workers)
 
-# Check for missing values
-print("\nMissing Values:")
-print(df_augmented.isnull().sum())
+    # Display basic information about the dataset
+    print("\nDataset Info:")
+    print(format_info(profile))
 
-# Save basic info and describe to a file for later reference
-with open("eda_summary.txt", "w") as f:
-    f.write("Dataset Info:\n")
-    df_augmented.info(buf=f)
-    f.write("\nDescriptive Statistics:\n")
-    f.write(df_augmented.describe().to_string())
-    f.write("\nMissing Values:\n")
-    f.write(df_augmented.isnull().sum().to_string())
+    # Display descriptive statistics (quantiles are approximate, within 1%)
+    print("\nDescriptive Statistics:")
+    print(format_describe(profile))
 
-print("Basic EDA summary saved to eda_summary.txt")
+    # Check for missing values
+    print("\nMissing Values:")
+    print(format_missing(profile))
 
+    # Save basic info and describe to a file for later reference, plus a machine-readable profile
+    write_summary(profile, "eda_summary.txt", "eda_profile.json")
 
+    print("Basic EDA summary saved to eda_summary.txt (full profile in eda_profile.json)")
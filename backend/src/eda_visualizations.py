@@ -1,53 +1,154 @@
-
+import argparse
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Load the augmented dataset
-df_augmented = pd.read_csv("/home/ubuntu/data/estimated_fuel_consumption_sample_100k_new_lookup.csv")
-
-# --- Visualizations ---
-
-# 1. Distribution of Estimated_Total_Fuel_kg
-plt.figure(figsize=(10, 6))
-sns.histplot(df_augmented["Estimated_Total_Fuel_kg"].dropna(), kde=True)
-plt.title("Distribution of Estimated Total Fuel (kg)")
-plt.xlabel("Estimated Total Fuel (kg)")
-plt.ylabel("Frequency")
-plt.savefig("fuel_distribution.png")
-plt.close()
-print("Saved fuel_distribution.png")
-
-# 2. Relationship between Estimated_Distance_km and Estimated_Total_Fuel_kg
-plt.figure(figsize=(12, 7))
-sns.scatterplot(x="Estimated_Distance_km", y="Estimated_Total_Fuel_kg", data=df_augmented.dropna(subset=["Estimated_Total_Fuel_kg"]))
-plt.title("Estimated Total Fuel vs. Estimated Distance")
-plt.xlabel("Estimated Distance (km)")
-plt.ylabel("Estimated Total Fuel (kg)")
-plt.savefig("fuel_vs_distance.png")
-plt.close()
-print("Saved fuel_vs_distance.png")
-
-# 3. Fuel consumption by Aircraft_Type_Info (top N types)
-# First, count the occurrences of each aircraft type and select the top ones
-top_aircraft_types = df_augmented["Aircraft_Type_Info"].value_counts().nlargest(10).index
-df_top_aircraft = df_augmented[df_augmented["Aircraft_Type_Info"].isin(top_aircraft_types)]
-
-plt.figure(figsize=(14, 8))
-sns.boxplot(x="Aircraft_Type_Info", y="Estimated_Total_Fuel_kg", data=df_top_aircraft.dropna(subset=["Estimated_Total_Fuel_kg"]))
-plt.title("Estimated Total Fuel by Top Aircraft Types")
-plt.xlabel("Aircraft Type")
-plt.ylabel("Estimated Total Fuel (kg)")
-plt.xticks(rotation=45, ha="right")
-plt.tight_layout()
-plt.savefig("fuel_by_aircraft_type.png")
-plt.close()
-print("Saved fuel_by_aircraft_type.png")
-
-# 4. Correlation matrix for numerical features (if more numerical features are available)
-# For now, only distance and fuel are numerical, so a direct scatter plot is more informative.
-# Once weather data is integrated, a correlation matrix will be more useful.
-
-print("EDA visualizations complete.")
+from collections import Counter, defaultdict
+from streaming_stats import StreamingHistogram, StreamingGrid2D, QuantileSketch
+
+ESTIMATE_PATH = "/home/ubuntu/data/estimated_fuel_consumption_sample_100k_new_lookup.csv"
+EDA_COLUMNS = ["Aircraft_Type_Info", "Estimated_Distance_km", "Estimated_Total_Fuel_kg"]
+
+def plot_full_dataset(df_augmented):
+    """
+    Original EDA plots drawn from every row (fine for samples, slow at full-year scale)
+    """
+    # seaborn is only needed for the full-data plots
+    import seaborn as sns
+    
+    # 1. Distribution of Estimated_Total_Fuel_kg
+    plt.figure(figsize=(10, 6))
+    sns.histplot(df_augmented["Estimated_Total_Fuel_kg"].dropna(), kde=True)
+    plt.title("Distribution of Estimated Total Fuel (kg)")
+    plt.xlabel("Estimated Total Fuel (kg)")
+    plt.ylabel("Frequency")
+    plt.savefig("fuel_distribution.png")
+    plt.close()
+    print("Saved fuel_distribution.png")
+
+    # 2. Relationship between Estimated_Distance_km and Estimated_Total_Fuel_kg
+    plt.figure(figsize=(12, 7))
+    sns.scatterplot(x="Estimated_Distance_km", y="Estimated_Total_Fuel_kg", data=df_augmented.dropna(subset=["Estimated_Total_Fuel_kg"]))
+    plt.title("Estimated Total Fuel vs. Estimated Distance")
+    plt.xlabel("Estimated Distance (km)")
+    plt.ylabel("Estimated Total Fuel (kg)")
+    plt.savefig("fuel_vs_distance.png")
+    plt.close()
+    print("Saved fuel_vs_distance.png")
+
+    # 3. Fuel consumption by Aircraft_Type_Info (top N types)
+    # First, count the occurrences of each aircraft type and select the top ones
+    top_aircraft_types = df_augmented["Aircraft_Type_Info"].value_counts().nlargest(10).index
+    df_top_aircraft = df_augmented[df_augmented["Aircraft_Type_Info"].isin(top_aircraft_types)]
+
+    plt.figure(figsize=(14, 8))
+    sns.boxplot(x="Aircraft_Type_Info", y="Estimated_Total_Fuel_kg", data=df_top_aircraft.dropna(subset=["Estimated_Total_Fuel_kg"]))
+    plt.title("Estimated Total Fuel by Top Aircraft Types")
+    plt.xlabel("Aircraft Type")
+    plt.ylabel("Estimated Total Fuel (kg)")
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+    plt.savefig("fuel_by_aircraft_type.png")
+    plt.close()
+    print("Saved fuel_by_aircraft_type.png")
+
+def collect_eda_summaries(path, chunksize=500000, fuel_bin_kg=50, distance_bin_km=25):
+    """
+    Build every summary the EDA plots need in a single streaming pass over the CSV
+
+    Parameters:
+    path (str): Path to the fuel estimate CSV
+    chunksize (int): Rows read per chunk (bounds memory use)
+    fuel_bin_kg (float): Histogram / grid bin width for fuel
+    distance_bin_km (float): Grid bin width for distance
+
+    Returns:
+    dict: 'fuel_hist', 'fuel_vs_distance', 'type_sketches', 'type_counts' and 'rows'
+    """
+    summaries = {
+        'fuel_hist': StreamingHistogram(fuel_bin_kg),
+        'fuel_vs_distance': StreamingGrid2D(distance_bin_km, fuel_bin_kg),
+        'type_sketches': defaultdict(QuantileSketch),
+        'type_counts': Counter(),
+        'rows': 0
+    }
+
+    for chunk in pd.read_csv(path, usecols=EDA_COLUMNS, chunksize=chunksize):
+        fuel = chunk["Estimated_Total_Fuel_kg"].to_numpy(dtype=float)
+        summaries['fuel_hist'].update(fuel)
+        summaries['fuel_vs_distance'].update(chunk["Estimated_Distance_km"].to_numpy(dtype=float), fuel)
+        summaries['type_counts'].update(chunk["Aircraft_Type_Info"].value_counts().to_dict())
+
+        with_fuel = chunk.dropna(subset=["Estimated_Total_Fuel_kg", "Aircraft_Type_Info"])
+        for aircraft_type, fuel_values in with_fuel.groupby("Aircraft_Type_Info")["Estimated_Total_Fuel_kg"]:
+            summaries['type_sketches'][aircraft_type].update(fuel_values.to_numpy())
+
+        summaries['rows'] += len(chunk)
+        print(f"Summarized {summaries['rows']} rows...")
+
+    return summaries
+
+def plot_from_summaries(summaries, top_n=10):
+    """
+    Draw the EDA plots from precomputed summaries; cost depends on bins, not rows
+    """
+    # 1. Distribution of Estimated_Total_Fuel_kg (streaming histogram)
+    edges, counts = summaries['fuel_hist'].to_arrays()
+    plt.figure(figsize=(10, 6))
+    plt.stairs(counts, edges, fill=True, alpha=0.7)
+    plt.title("Distribution of Estimated Total Fuel (kg)")
+    plt.xlabel("Estimated Total Fuel (kg)")
+    plt.ylabel("Frequency")
+    plt.savefig("fuel_distribution.png")
+    plt.close()
+    print("Saved fuel_distribution.png")
+
+    # 2. Estimated_Total_Fuel_kg vs Estimated_Distance_km (hexbin over grid cell counts)
+    x, y, cell_counts = summaries['fuel_vs_distance'].cell_centers()
+    plt.figure(figsize=(12, 7))
+    if len(cell_counts):
+        plt.hexbin(x, y, C=cell_counts, reduce_C_function=np.sum, gridsize=60, bins='log', mincnt=1)
+        plt.colorbar(label="Flights")
+    plt.title("Estimated Total Fuel vs. Estimated Distance")
+    plt.xlabel("Estimated Distance (km)")
+    plt.ylabel("Estimated Total Fuel (kg)")
+    plt.savefig("fuel_vs_distance.png")
+    plt.close()
+    print("Saved fuel_vs_distance.png")
+
+    # 3. Fuel consumption by Aircraft_Type_Info (top N types, boxes from quantile sketches)
+    top_aircraft_types = [t for t, _ in summaries['type_counts'].most_common(top_n)
+                          if summaries['type_sketches'][t].count > 0]
+    box_stats = [summaries['type_sketches'][t].box_stats(label=t) for t in top_aircraft_types]
+
+    fig, ax = plt.subplots(figsize=(14, 8))
+    if box_stats:
+        ax.bxp(box_stats, showfliers=False)
+    ax.set_title("Estimated Total Fuel by Top Aircraft Types")
+    ax.set_xlabel("Aircraft Type")
+    ax.set_ylabel("Estimated Total Fuel (kg)")
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+    plt.savefig("fuel_by_aircraft_type.png")
+    plt.close()
+    print("Saved fuel_by_aircraft_type.png")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EDA visualizations for the fuel estimates")
+    parser.add_argument("--mode", choices=["aggregated", "full"], default="aggregated",
+                        help="aggregated: single streaming pass into summaries (default); full: plot every row")
+    parser.add_argument("--input", default=ESTIMATE_PATH)
+    parser.add_argument("--chunksize", type=int, default=500000)
+    args = parser.parse_args()
+
+    # --- Visualizations ---
+    if args.mode == "full":
+        # Load the augmented dataset
+        plot_full_dataset(pd.read_csv(args.input))
+    else:
+        plot_from_summaries(collect_eda_summaries(args.input, chunksize=args.chunksize))
 
+    # 4. Correlation matrix for numerical features (if more numerical features are available)
+    # For now, only distance and fuel are numerical, so a direct scatter plot is more informative.
+    # Once weather data is integrated, a correlation matrix will be more useful.
 
+    print("EDA visualizations complete.")
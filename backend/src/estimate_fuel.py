@@ -1,7 +1,10 @@
 
 import pandas as pd
-from math import radians, sin, cos, sqrt, atan2
+import numpy as np
 import os
+from flight_store import FlightStore, route_distances_km
+from aircraft_registry import AircraftRegistry, REGISTRY_PATH
+from flight_phases import PhaseFuelModel
 
 # Fuel consumption data provided by the user (converted to kg/hr)
 # Assuming jet fuel density of 0.8 kg/L for L/hr to kg/hr conversion
@@ -17,96 +20,79 @@ fuel_consumption_lookup = {
     "A220-300": 2600 * 0.8  # Convert L/hr to kg/hr
 }
 
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371  # Radius of Earth in kilometers
-
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-
-    a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-
-    distance = R * c
-    return distance # Distance in kilometers
-
-def estimate_fuel_consumption_from_lookup(aircraft_model, distance_km):
+def resolve_aircraft_key(aircraft_model):
+    """Key of fuel_consumption_lookup matching a free-text aircraft model, or None if unknown"""
     # Clean and standardize the aircraft model name for lookup
     cleaned_model = str(aircraft_model).upper().replace(" ", "-").replace("CANADAI-", "").replace("BOMBARDIER-", "")
 
-    fuel_flow_kghr = None
-    for key, value in fuel_consumption_lookup.items():
+    for key in fuel_consumption_lookup:
         if key in cleaned_model or cleaned_model in key:
-            fuel_flow_kghr = value
-            break
-
-    if fuel_flow_kghr is not None:
-        # Estimate flight time based on distance and assumed cruise speed
-        cruise_speed_kmh = 850  # km/h, a general assumption for jet aircraft
-        if distance_km == 0: # Avoid division by zero for zero distance flights
-            flight_time_hours = 0
-        else:
-            flight_time_hours = distance_km / cruise_speed_kmh
-        
-        total_fuel_kg = fuel_flow_kghr * flight_time_hours
-        
-        return fuel_flow_kghr, total_fuel_kg, aircraft_model # Return the original model for tracking
-    else:
-        return None, None, "no info"
-
-# Load data - processing a sample of the dataset
-# Using nrows to limit the number of rows read for processing
-df_flights_sample = pd.read_csv("/home/ubuntu/data/US_flights_2023.csv", nrows=100000)
-df_airports = pd.read_csv("/home/ubuntu/data/airports_geolocation.csv")
-
-# Merge flight data with airport geolocation for departure and arrival airports
-df_flights_sample = pd.merge(df_flights_sample, df_airports[["IATA_CODE", "LATITUDE", "LONGITUDE"]], 
-                             left_on="Dep_Airport", right_on="IATA_CODE", how="left", 
-                             suffixes=("_dep", ""))
-df_flights_sample = pd.merge(df_flights_sample, df_airports[["IATA_CODE", "LATITUDE", "LONGITUDE"]], 
-                             left_on="Arr_Airport", right_on="IATA_CODE", how="left", 
-                             suffixes=("_arr", ""))
-
-# Rename columns for clarity after merge
-df_flights_sample.rename(columns={
-    "LATITUDE": "Dep_Latitude", 
-    "LONGITUDE": "Dep_Longitude", 
-    "LATITUDE_arr": "Arr_Latitude", 
-    "LONGITUDE_arr": "Arr_Longitude"
-}, inplace=True)
-
-# Calculate distance and estimate fuel consumption
-results = []
-for index, row in df_flights_sample.iterrows():
-    distance_km = None
-    if pd.notna(row["Dep_Latitude"]) and pd.notna(row["Dep_Longitude"]) and \
-       pd.notna(row["Arr_Latitude"]) and pd.notna(row["Arr_Longitude"]):
-        distance_km = haversine(row["Dep_Latitude"], row["Dep_Longitude"], 
-                                row["Arr_Latitude"], row["Arr_Longitude"])
-    
-    fuel_flow_kghr, total_fuel_kg, aircraft_type_info = None, None, None
-    if distance_km is not None:
-        fuel_flow_kghr, total_fuel_kg, aircraft_type_info = estimate_fuel_consumption_from_lookup(
-            row["Model"], distance_km
-        )
-    
-    results.append({
-        "FlightDate": row["FlightDate"],
-        "Tail_Number": row["Tail_Number"],
-        "Manufacturer": row["Manufacturer"],
-        "Model": row["Model"],
+            return key
+    return None
+
+def resolve_fuel_flow(aircraft_model):
+    """Cruise fuel flow (kg/hr) for a free-text aircraft model, or None if unknown"""
+    key = resolve_aircraft_key(aircraft_model)
+    return None if key is None else fuel_consumption_lookup[key]
+
+if __name__ == "__main__":
+    # Load data - processing a sample of the dataset
+    # Using nrows to limit the number of rows read for processing. Flights are held in a
+    # dictionary-encoded FlightStore, so airports and models are integer codes.
+    flight_store = FlightStore.from_csv("/home/ubuntu/data/US_flights_2023.csv", nrows=100000,
+                                        usecols=["FlightDate", "Tail_Number", "Dep_Airport", "Arr_Airport", "Manufacturer", "Model"])
+    df_airports = pd.read_csv("/home/ubuntu/data/airports_geolocation.csv")
+
+    # Calculate distance by gathering airport coordinates through the shared airport codes
+    distance_km = route_distances_km(flight_store, df_airports)
+
+    # Resolve the fuel flow once per distinct aircraft model, then gather it for every flight
+    fuel_flow_table = flight_store.dictionary("model").map_array(resolve_fuel_flow)
+    fuel_flow_kghr = flight_store.gather("Model", fuel_flow_table)
+
+    # Scale by each airframe's age/engine fuel-flow factor from the tail-number registry
+    # (built from flight history by train_weather_enhanced_models.py); tails are aligned to
+    # registry rows once per distinct tail code, then gathered per flight
+    fuel_flow_factor = np.ones(len(flight_store))
+    if os.path.exists(REGISTRY_PATH):
+        registry = AircraftRegistry.load(REGISTRY_PATH)
+        registry_rows = flight_store.gather("Tail_Number", registry.tail_tables(flight_store.dictionary("tail")))
+        fuel_flow_factor = registry.gather(registry_rows)["Fuel_Flow_Factor"].to_numpy(dtype=np.float64)
+        fuel_flow_kghr = fuel_flow_kghr * fuel_flow_factor
+        print(f"Applied fuel-flow factors for {(registry_rows >= 0).sum()} flights from {len(registry)} registered airframes")
+
+    # Split each flight into taxi, climb, cruise and descent (airborne time at the assumed
+    # 850 km/h cruise speed) and evaluate the per-type performance grids in one array pass.
+    # The grid row of each distinct model is resolved once and gathered per flight.
+    phase_model = PhaseFuelModel(fuel_consumption_lookup)
+    type_table = flight_store.dictionary("model").map_array(
+        lambda m: phase_model.type_codes([resolve_aircraft_key(m)])[0], default=-1, dtype=np.int64)
+    phases = phase_model.estimate(flight_store.gather("Model", type_table), distance_km)
+
+    has_distance = ~np.isnan(distance_km)
+    has_fuel_flow = has_distance & ~np.isnan(fuel_flow_kghr)
+    phase_fuel = {column: np.where(has_fuel_flow, phases[column].to_numpy() * fuel_flow_factor, np.nan)
+                  for column in ["Taxi_Fuel_kg", "Climb_Fuel_kg", "Cruise_Fuel_kg", "Descent_Fuel_kg", "Phase_Fuel_kg"]}
+    total_fuel_kg = phase_fuel["Phase_Fuel_kg"]
+    model = flight_store.decode("Model")
+    aircraft_type_info = np.where(has_fuel_flow, model, np.where(has_distance, "no info", None))
+
+    df_fuel_estimates = pd.DataFrame({
+        "FlightDate": pd.to_datetime(flight_store.decode("FlightDate")).strftime("%Y-%m-%d"),
+        "Tail_Number": flight_store.decode("Tail_Number"),
+        "Manufacturer": flight_store.decode("Manufacturer"),
+        "Model": model,
         "Aircraft_Type_Info": aircraft_type_info,
         "Estimated_Distance_km": distance_km,
-        "Estimated_Cruise_Fuel_Flow_kghr": fuel_flow_kghr,
+        "Estimated_Cruise_Fuel_Flow_kghr": np.where(has_distance, fuel_flow_kghr, np.nan),
+        "Estimated_Taxi_Fuel_kg": phase_fuel["Taxi_Fuel_kg"],
+        "Estimated_Climb_Fuel_kg": phase_fuel["Climb_Fuel_kg"],
+        "Estimated_Cruise_Fuel_kg": phase_fuel["Cruise_Fuel_kg"],
+        "Estimated_Descent_Fuel_kg": phase_fuel["Descent_Fuel_kg"],
         "Estimated_Total_Fuel_kg": total_fuel_kg
     })
 
-df_fuel_estimates = pd.DataFrame(results)
-
-# Save the results
-df_fuel_estimates.to_csv("/home/ubuntu/data/estimated_fuel_consumption_sample_100k_new_lookup.csv", index=False)
-
-print("Fuel estimation complete. Results saved to /home/ubuntu/data/estimated_fuel_consumption_sample_100k_new_lookup.csv")
-
+    # Save the results
+    df_fuel_estimates.to_csv("/home/ubuntu/data/estimated_fuel_consumption_sample_100k_new_lookup.csv", index=False)
 
+    print("Fuel estimation complete. Results saved to /home/ubuntu/data/estimated_fuel_consumption_sample_100k_new_lookup.csv")
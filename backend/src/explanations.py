@@ -0,0 +1,229 @@
+import time
+import argparse
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+EXPLANATIONS_PATH = '/home/ubuntu/data/explanations.csv'
+GLOBAL_IMPORTANCE_PATH = '/home/ubuntu/weather_enhanced_shap_importance.csv'
+
+def row_fingerprints(X):
+    """64-bit hash of every row's feature values (independent of the index)"""
+    frame = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+def _forest_path_weights(model):
+    """
+    Sparse (all nodes x features) matrix of the prediction change at each node
+
+    Entry [node, feature of its parent] holds value(node) - value(parent), so the
+    decision-path indicator times this matrix sums every split's contribution along the
+    path taken (the tree-path decomposition of a forest prediction).
+    """
+    from scipy import sparse
+
+    rows, cols, deltas, biases = [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, 0]
+        internal = np.flatnonzero(tree.children_left >= 0)
+        for children in (tree.children_left[internal], tree.children_right[internal]):
+            rows.append(children + offset)
+            cols.append(tree.feature[internal])
+            deltas.append(value[children] - value[internal])
+        biases.append(value[0])
+        offset += tree.node_count
+
+    weights = sparse.csr_matrix((np.concatenate(deltas), (np.concatenate(rows), np.concatenate(cols))),
+                                shape=(offset, model.n_features_in_))
+    return weights, float(np.mean(biases))
+
+def tree_contributions(model, X, scaler=None, cache=None):
+    """
+    Per-feature attributions of each prediction
+
+    XGBoost and LightGBM use their built-in TreeSHAP (pred_contribs / pred_contrib);
+    sklearn forests use the tree-path decomposition; Linear Regression uses
+    coefficient x standardized value (exact SHAP against the training mean).
+
+    Parameters:
+    model: Fitted model
+    X (pd.DataFrame): Features in training column order
+    scaler (StandardScaler): Required for Linear Regression
+    cache (dict): Optional per-model storage for the forest path matrix
+
+    Returns:
+    tuple: (contributions of shape (n_rows, n_features), bias per row);
+           contributions.sum(axis=1) + bias equals the prediction
+
+    Raises:
+    ValueError: For models without a tree-path or linear explanation
+    """
+    if hasattr(model, 'binner'):
+        # feature_pipeline.BinnedRegressor: explain the booster on the binned codes
+        return tree_contributions(model.model, model.binner.transform(X), scaler, cache)
+    module = type(model).__module__
+    if module.startswith('xgboost'):
+        import xgboost as xgb
+        raw = model.get_booster().predict(xgb.DMatrix(X), pred_contribs=True)
+        return raw[:, :-1], raw[:, -1]
+    if module.startswith('lightgbm'):
+        raw = model.predict(X, pred_contrib=True)
+        return raw[:, :-1], raw[:, -1]
+    if module.startswith('sklearn.ensemble') and hasattr(model, 'estimators_'):
+        cache = cache if cache is not None else {}
+        if 'path_weights' not in cache:
+            cache['path_weights'] = _forest_path_weights(model)
+        weights, bias = cache['path_weights']
+        indicator, _ = model.decision_path(X)
+        contributions = (indicator @ weights).toarray() / len(model.estimators_)
+        return contributions, np.full(len(contributions), bias)
+    if module.startswith('sklearn.linear_model') and scaler is not None:
+        contributions = scaler.transform(X) * model.coef_
+        return contributions, np.full(len(contributions), float(model.intercept_))
+    raise ValueError(f"No tree-path explanation for {type(model).__name__}")
+
+class ExplanationEngine:
+    """
+    Cached, batched attribution service over published model bundles
+
+    Attributions are stored in an LRU keyed by (model version, model name, row
+    fingerprint), so repeated rows and re-scored flights are explained once per version.
+    Uncached rows are computed in batches; with a latency budget, batches stop once the
+    budget is spent and the remaining rows come back unexplained.
+    """
+
+    def __init__(self, cache_size=50000, batch_size=256):
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_state = {}
+        self.stats = {'rows': 0, 'cache_hits': 0, 'computed': 0, 'skipped': 0}
+
+    def _model_cache(self, version, model_name):
+        with self._lock:
+            # Only the current version's forest path matrices are worth keeping
+            for key in [k for k in self._model_state if k[0] != version]:
+                del self._model_state[key]
+            return self._model_state.setdefault((version, model_name), {})
+
+    def explain(self, bundle, X, model_name=None, budget_ms=None):
+        """
+        Attributions for a feature batch
+
+        Parameters:
+        bundle (dict): Loaded model bundle (see model_registry)
+        X (pd.DataFrame): Features in the bundle's feature order
+        model_name (str): Model to explain (the bundle's best model by default)
+        budget_ms (float): Stop computing new batches after this many milliseconds
+
+        Returns:
+        tuple: (contributions array with NaN rows where the budget ran out, bias array)
+        """
+        model_name = model_name or bundle['best_model']
+        model = bundle['models'][model_name]
+        version = bundle['version']
+        start = time.perf_counter()
+
+        n_rows, n_features = X.shape
+        contributions = np.full((n_rows, n_features), np.nan)
+        bias = np.full(n_rows, np.nan)
+        fingerprints = row_fingerprints(X)
+
+        missing = []
+        with self._lock:
+            for i, fingerprint in enumerate(fingerprints):
+                entry = self._cache.get((version, model_name, fingerprint))
+                if entry is None:
+                    missing.append(i)
+                else:
+                    self._cache.move_to_end((version, model_name, fingerprint))
+                    contributions[i], bias[i] = entry[:-1], entry[-1]
+            self.stats['rows'] += n_rows
+            self.stats['cache_hits'] += n_rows - len(missing)
+
+        scaler = bundle['scaler'] if model_name == 'Linear Regression' else None
+        model_cache = self._model_cache(version, model_name)
+        missing = np.asarray(missing, dtype=np.int64)
+        # Explain each distinct uncached row once
+        unique_fingerprints, first, inverse = np.unique(fingerprints[missing], return_index=True, return_inverse=True)
+        computed = 0
+        for batch_start in range(0, len(first), self.batch_size):
+            if budget_ms is not None and (time.perf_counter() - start) * 1000 >= budget_ms:
+                break
+            batch = missing[first[batch_start:batch_start + self.batch_size]]
+            batch_contributions, batch_bias = tree_contributions(model, X.iloc[batch], scaler, model_cache)
+            contributions[batch], bias[batch] = batch_contributions, batch_bias
+            computed = batch_start + len(batch)
+
+            if self.cache_size == 0:
+                continue
+            with self._lock:
+                for i, row, row_bias in zip(batch, batch_contributions, batch_bias):
+                    self._cache[(version, model_name, fingerprints[i])] = np.append(row, row_bias)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        # Duplicate uncached rows copy the attribution of their first occurrence
+        done = inverse < computed
+        contributions[missing[done]] = contributions[missing[first[inverse[done]]]]
+        bias[missing[done]] = bias[missing[first[inverse[done]]]]
+        with self._lock:
+            self.stats['computed'] += computed
+            self.stats['skipped'] += int((~done).sum())
+        return contributions, bias
+
+def sample_rows(X, sample_size, seed=42):
+    """Background sample of at most sample_size rows"""
+    if len(X) <= sample_size:
+        return X
+    return X.iloc[np.sort(np.random.default_rng(seed).choice(len(X), sample_size, replace=False))]
+
+def global_importance(contributions, feature_names):
+    """Mean absolute attribution per feature, most important first"""
+    return pd.DataFrame({
+        'feature': feature_names,
+        'mean_abs_contribution': np.nanmean(np.abs(contributions), axis=0)
+    }).sort_values('mean_abs_contribution', ascending=False).reset_index(drop=True)
+
+def explain_batch(bundle, X, model_name=None, sample_size=None, batch_size=4096, seed=42):
+    """
+    Batch job: attributions for (a background sample of) the given rows
+
+    Returns:
+    tuple: (per-row attributions DataFrame with bias and prediction, global importance DataFrame)
+    """
+    X = sample_rows(X, sample_size, seed) if sample_size else X
+    engine = ExplanationEngine(cache_size=0, batch_size=batch_size)
+    contributions, bias = engine.explain(bundle, X, model_name)
+    attributions = pd.DataFrame(contributions, columns=bundle['feature_names'], index=X.index)
+    attributions['bias'] = bias
+    attributions['prediction'] = bias + contributions.sum(axis=1)
+    return attributions, global_importance(contributions, bundle['feature_names'])
+
+if __name__ == "__main__":
+    from model_registry import load_bundle, prepare_features
+
+    parser = argparse.ArgumentParser(description="Explain model predictions with tree-path attributions")
+    parser.add_argument('--input', default='/home/ubuntu/data/enhanced_flight_data_with_weather.csv')
+    parser.add_argument('--model', help="Model name (default: the bundle's best model)")
+    parser.add_argument('--sample', type=int, default=5000, help="Rows to explain (0 = all)")
+    parser.add_argument('--output', default=EXPLANATIONS_PATH)
+    args = parser.parse_args()
+
+    bundle = load_bundle()
+    X = prepare_features(bundle, pd.read_csv(args.input))
+    model_name = args.model or bundle['best_model']
+
+    start = time.perf_counter()
+    attributions, importance = explain_batch(bundle, X, model_name, args.sample or None)
+    elapsed = time.perf_counter() - start
+
+    attributions.to_csv(args.output)
+    importance.to_csv(GLOBAL_IMPORTANCE_PATH, index=False)
+    print(f"Explained {len(attributions)} rows with {model_name} (version {bundle['version']}) in {elapsed:.2f}s")
+    print("Top 10 features by mean |contribution|:")
+    print(importance.head(10))
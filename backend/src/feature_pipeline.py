@@ -0,0 +1,168 @@
+import time
+import numpy as np
+import pandas as pd
+from model_evaluation import compute_metrics
+
+PRECISION_REPORT_PATH = '/home/ubuntu/weather_enhanced_precision_report.csv'
+
+def compact_features(data, columns, dtype=np.float32):
+    """
+    Feature matrix in a reduced float precision with missing values filled by the median
+
+    The columns are cast straight to dtype (one copy) and filled in place, so no
+    intermediate float64 matrix is allocated.
+
+    Parameters:
+    data (pd.DataFrame): Source frame
+    columns (list): Feature columns
+    dtype: Target float dtype (np.float32 or np.float64)
+
+    Returns:
+    pd.DataFrame: Features in dtype
+    """
+    X = data[columns].astype(dtype)
+    X.fillna(X.median(), inplace=True)
+    return X
+
+def matrix_nbytes(X):
+    """Bytes held by a feature matrix (DataFrame or array)"""
+    if isinstance(X, pd.DataFrame):
+        return int(X.memory_usage(index=False).sum())
+    return int(np.asarray(X).nbytes)
+
+class HistogramBinner:
+    """
+    Quantile-binned uint8 features
+
+    Each column gets up to max_bins - 1 quantile edges from the training rows; values are
+    replaced by their bin number, with the last code reserved for missing values. Tree
+    learners split on bin codes exactly as they would on the edges, so LightGBM and
+    XGBoost can train on the uint8 matrix directly at an eighth of the float64 memory.
+    """
+
+    def __init__(self, max_bins=255):
+        if not 2 <= max_bins <= 255:
+            raise ValueError("max_bins must be between 2 and 255")
+        self.max_bins = max_bins
+        self.edges = []
+
+    @property
+    def missing_code(self):
+        return self.max_bins
+
+    def fit(self, X):
+        """Learn per-column quantile edges"""
+        values = np.asarray(X, dtype=np.float64)
+        quantiles = np.linspace(0, 1, self.max_bins + 1)[1:-1]
+        self.edges = [np.unique(np.nanquantile(values[:, j], quantiles)) for j in range(values.shape[1])]
+        return self
+
+    def transform(self, X):
+        """
+        Bin a feature matrix
+
+        Returns:
+        np.ndarray: uint8 codes of shape (n_rows, n_features)
+        """
+        binned = np.empty(X.shape, dtype=np.uint8)
+        for j, edges in enumerate(self.edges):
+            column = np.asarray(X.iloc[:, j] if isinstance(X, pd.DataFrame) else X[:, j], dtype=np.float64)
+            codes = np.searchsorted(edges, column, side='right')
+            binned[:, j] = np.where(np.isnan(column), self.missing_code, codes)
+        return binned
+
+    def fit_transform(self, X):
+        return self.fit(X).transform(X)
+
+class BinnedRegressor:
+    """
+    Regressor trained and scored on HistogramBinner codes
+
+    The binner is fitted on the rows passed to fit and predict bins its input the same
+    way, so a booster trained on the uint8 matrix is published and served like any other
+    model (float features in, prediction out).
+    """
+
+    def __init__(self, model, max_bins=255):
+        self.model = model
+        self.binner = HistogramBinner(max_bins)
+
+    def fit(self, X, y):
+        self.model.fit(self.binner.fit_transform(X), y)
+        return self
+
+    def predict(self, X):
+        return self.model.predict(self.binner.transform(X))
+
+    @property
+    def feature_importances_(self):
+        return self.model.feature_importances_
+
+def _default_models():
+    import xgboost as xgb
+    import lightgbm as lgb
+    return {
+        'XGBoost': lambda: xgb.XGBRegressor(n_estimators=100, random_state=42),
+        'LightGBM': lambda: lgb.LGBMRegressor(n_estimators=100, random_state=42, verbose=-1)
+    }
+
+def compare_feature_precisions(X, y, split, models=None, max_bins=255):
+    """
+    Train the boosted models on float64, float32 and uint8-binned features
+
+    Parameters:
+    X (pd.DataFrame): Features (any float dtype; NaN allowed)
+    y (pd.Series): Target
+    split (dict): Positional 'train'/'test' index arrays from dataset_splits
+    models (dict): Name -> factory of an unfitted regressor (XGBoost and LightGBM by default)
+
+    Returns:
+    pd.DataFrame: Memory, fit time and test metrics per representation and model, with the
+                  R² difference against float64
+    """
+    models = models or _default_models()
+    y_train, y_test = y.iloc[split['train']], y.iloc[split['test']]
+
+    representations = {}
+    for dtype in (np.float64, np.float32):
+        train = X.iloc[split['train']].to_numpy(dtype=dtype)
+        test = X.iloc[split['test']].to_numpy(dtype=dtype)
+        representations[np.dtype(dtype).name] = (train, test)
+    binner = HistogramBinner(max_bins)
+    representations['uint8'] = (binner.fit_transform(X.iloc[split['train']]), binner.transform(X.iloc[split['test']]))
+
+    rows = []
+    for representation, (train, test) in representations.items():
+        for name, factory in models.items():
+            start = time.perf_counter()
+            model = factory().fit(train, y_train)
+            fit_seconds = time.perf_counter() - start
+            metrics = compute_metrics(y_test, {name: model.predict(test)}).iloc[0]
+            rows.append({
+                'Representation': representation,
+                'Model': name,
+                'Train_Features_MB': matrix_nbytes(train) / 1e6,
+                'Fit_Seconds': fit_seconds,
+                'MAE': metrics['MAE'],
+                'RMSE': metrics['RMSE'],
+                'R2': metrics['R2']
+            })
+            print(f"{representation:>8} {name:<10} {rows[-1]['Train_Features_MB']:8.1f} MB  "
+                  f"fit {fit_seconds:6.2f}s  R² {metrics['R2']:.4f}")
+
+    report = pd.DataFrame(rows)
+    baseline = report[report['Representation'] == 'float64'].set_index('Model')['R2']
+    report['R2_Delta_vs_float64'] = report['R2'] - report['Model'].map(baseline)
+    return report
+
+if __name__ == "__main__":
+    from dataset_splits import make_split
+    from train_weather_enhanced_models import prepare_enhanced_data_for_modeling, create_weather_enhanced_features
+
+    enhanced_data = prepare_enhanced_data_for_modeling()
+    X, y, feature_names = create_weather_enhanced_features(enhanced_data, dtype=np.float64)
+    split = make_split(enhanced_data.loc[X.index, ['FlightDate']], strategy='time', val_size=0.15, test_size=0.15)
+
+    report = compare_feature_precisions(X, y, split)
+    report.to_csv(PRECISION_REPORT_PATH, index=False)
+    print(f"Precision comparison saved to {PRECISION_REPORT_PATH}")
@@ -0,0 +1,322 @@
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Grid axes (uniform, so a value's cell is found with arithmetic instead of a search)
+ALTITUDE_FT = np.linspace(0, 41000, 42)
+MASS_FRACTION = np.linspace(0.6, 1.0, 9)  # actual mass / maximum takeoff mass
+ISA_DEVIATION_C = np.linspace(-30, 30, 13)  # temperature above the standard atmosphere
+
+PHASES = ['climb', 'cruise', 'descent']
+PHASE_FUEL_COLUMNS = ['Taxi_Fuel_kg', 'Climb_Fuel_kg', 'Cruise_Fuel_kg', 'Descent_Fuel_kg', 'Phase_Fuel_kg',
+                      'Cruise_Altitude_ft']
+
+# Reference point of the cruise rates in the lookup tables
+REFERENCE_ALTITUDE_FT = 35000
+REFERENCE_MASS_FRACTION = 0.85
+
+# Profile assumptions
+TAXI_OUT_MIN = 16  # US average taxi-out and taxi-in times
+TAXI_IN_MIN = 8
+TAXI_FLOW_FACTOR = 0.25  # ground idle flow as a share of cruise flow
+CLIMB_RATE_FPM = 2000
+DESCENT_RATE_FPM = 1800
+REGIONAL_RATE_LIMIT = 2000  # types burning less than this (kg/h) cruise lower
+CRUISE_CEILING_FT = {'regional': 33000, 'mainline': 37000}
+CRUISE_SPEED_KMH = 850  # km/h, the same general jet cruise assumption as estimate_fuel.py
+STANDARD_SURFACE_TEMP_C = 15
+
+def reference_flow_grids(cruise_rate):
+    """
+    Fuel flow (kg/h) for every (altitude, mass, ISA deviation) grid point and phase
+
+    A generic jet shape scaled by the type's cruise rate: climb thrust burns most at low
+    altitude, cruise flow rises below the reference altitude (denser air) and with mass,
+    descent runs close to idle, and warmer air costs fuel in every phase. The grids are the
+    place to drop in manufacturer or BADA tables (see PhaseFuelModel.load).
+
+    Parameters:
+    cruise_rate (float): Cruise flow at REFERENCE_ALTITUDE_FT, REFERENCE_MASS_FRACTION and ISA
+
+    Returns:
+    dict: Phase -> array of shape (altitudes, masses, ISA deviations)
+    """
+    altitude = (ALTITUDE_FT / REFERENCE_ALTITUDE_FT)[:, None, None]
+    mass = (MASS_FRACTION / REFERENCE_MASS_FRACTION)[None, :, None]
+    isa = ISA_DEVIATION_C[None, None, :]
+    flows = {
+        'climb': cruise_rate * (2.4 - 0.9 * altitude) * mass * (1 + 0.005 * isa),
+        'cruise': cruise_rate * (1 + 0.35 * np.maximum(1 - altitude, 0) ** 2) * mass ** 1.3 * (1 + 0.0035 * isa),
+        'descent': cruise_rate * (0.35 + 0.15 * np.maximum(1 - altitude, 0)) * (1 + 0.002 * isa)
+    }
+    shape = (len(ALTITUDE_FT), len(MASS_FRACTION), len(ISA_DEVIATION_C))
+    return {phase: np.broadcast_to(flow, shape).copy() for phase, flow in flows.items()}
+
+def _cell(axis, values):
+    """Lower knot index (as float32) and interpolation weight of each value on a uniform axis (clamped)"""
+    position = np.clip((values - np.float32(axis[0])) * np.float32(1 / (axis[1] - axis[0])), 0, len(axis) - 1)
+    lower = np.floor(position)
+    return lower, position - lower
+
+def _as_float32(values):
+    """Float32 copy of an array with NaN replaced by 0"""
+    values = np.array(values, dtype=np.float32)
+    np.copyto(values, 0, where=np.isnan(values))
+    return values
+
+def pack_cells(grid):
+    """
+    Re-layout a (types, altitudes, masses, ISA deviations) grid for one-gather interpolation
+
+    Every axis is padded with a copy of its last knot, so a value on the upper edge lands
+    in a cell of its own with weight 0. Each cell then stores its eight trilinear
+    coefficients side by side as one 32-byte float32 record:
+    - c00, c01 - c00, c10 - c00 and c11 - c10 - c01 + c00 of the (mass, ISA) cell at the
+      lower altitude level;
+    - the same four for the step to the upper level.
+    A flight's whole cell therefore comes back from a single gather of one cache line.
+
+    Returns:
+    np.ndarray: float32 array of shape (types * altitudes * masses * ISA deviations, 8)
+    """
+    grid = np.pad(np.asarray(grid, dtype=np.float64), [(0, 0), (0, 1), (0, 1), (0, 1)], mode='edge')
+
+    def bilinear(level):
+        c00, c01 = level[:, :, :-1, :-1], level[:, :, :-1, 1:]
+        c10, c11 = level[:, :, 1:, :-1], level[:, :, 1:, 1:]
+        return [c00, c01 - c00, c10 - c00, c11 - c10 - c01 + c00]
+
+    lower, upper = bilinear(grid[:, :-1]), bilinear(grid[:, 1:])
+    coefficients = lower + [u - l for u, l in zip(upper, lower)]
+    return np.ascontiguousarray(np.stack([c.ravel() for c in coefficients], axis=1), dtype=np.float32)
+
+class PhaseFuelModel:
+    """
+    Taxi / climb / cruise / descent fuel from precomputed per-type performance grids
+
+    Each aircraft type owns one (altitude x mass x ISA deviation) fuel-flow grid per
+    airborne phase, stacked into a single array per phase with a trailing default type for
+    unknown aircraft (the same trailing-slot convention as the dictionary gather tables).
+    A batch of flights is evaluated with one trilinear interpolation per phase: one
+    gather of a packed cell record (see pack_cells) and a weighted sum, with no per-row
+    Python.
+    """
+
+    def __init__(self, cruise_rates, default_rate=1000):
+        """
+        Parameters:
+        cruise_rates (dict): Type -> cruise fuel flow (kg/h) at the reference conditions
+        default_rate (float): Cruise flow for types that are not in cruise_rates
+        """
+        self.type_names = list(cruise_rates)
+        self.cruise_rates = np.append(np.asarray(list(cruise_rates.values()), dtype=np.float64), default_rate)
+        self._type_index = pd.Index(self.type_names)
+        self.ceiling_ft = np.where(self.cruise_rates < REGIONAL_RATE_LIMIT,
+                                   CRUISE_CEILING_FT['regional'], CRUISE_CEILING_FT['mainline']).astype(np.float32)
+        self._taxi_fuel = (self.cruise_rates * TAXI_FLOW_FACTOR * (TAXI_OUT_MIN + TAXI_IN_MIN) / 60).astype(np.float32)
+        per_type = [reference_flow_grids(rate) for rate in self.cruise_rates]
+        self.grids = {phase: np.stack([grids[phase] for grids in per_type]) for phase in PHASES}
+
+    @property
+    def grids(self):
+        return self._grids
+
+    @grids.setter
+    def grids(self, grids):
+        self._grids = grids
+        self._packed = {phase: pack_cells(grid) for phase, grid in grids.items()}
+        # Records per type and per altitude level in the packed tables
+        _, n_alt, n_mass, n_isa = grids['cruise'].shape
+        self._level_stride = np.float32(n_mass * n_isa)
+        self._mass_stride = np.float32(n_isa)
+        self._type_stride = n_alt * n_mass * n_isa
+
+    def type_codes(self, types):
+        """Grid index per aircraft type (unknown types map to the trailing default)"""
+        return self._type_index.get_indexer(pd.Series(types, copy=False)).astype(np.int64)
+
+    def interpolate(self, phase, type_codes, altitude_ft, mass_fraction, isa_deviation_c):
+        """
+        Fuel flow (kg/h) of a phase at each flight's conditions
+
+        Parameters:
+        phase (str): 'climb', 'cruise' or 'descent'
+        type_codes (np.ndarray): From type_codes (-1 = default type)
+        altitude_ft, mass_fraction, isa_deviation_c (np.ndarray): Conditions per flight
+
+        Returns:
+        np.ndarray: Interpolated flow per flight (float32)
+        """
+        type_rows = np.where(np.asarray(type_codes) < 0, len(self.cruise_rates) - 1, type_codes)
+        level, weight = _cell(ALTITUDE_FT, np.asarray(altitude_ft, dtype=np.float32))
+        level_offset = (type_rows * self._type_stride).astype(np.float32) + level * self._level_stride
+        return self._interpolate_cells(phase, level_offset, weight,
+                                       _cell(MASS_FRACTION, np.asarray(mass_fraction, dtype=np.float32)),
+                                       _cell(ISA_DEVIATION_C, np.asarray(isa_deviation_c, dtype=np.float32)))
+
+    def _interpolate_cells(self, phase, level_offset, altitude_weight, mass_cell, isa_cell):
+        """
+        Trilinear interpolation from precomputed cells
+
+        level_offset is the first record of each flight's type and altitude level. Record
+        indices stay far below 2**24, so they are exact in float32 and only converted once.
+        """
+        (m, wm), (t, wt) = mass_cell, isa_cell
+        index = (level_offset + m * self._mass_stride + t).astype(np.intp)
+        c = np.take(self._packed[phase], index, axis=0)
+        lower = c[:, 0] + wt * c[:, 1] + wm * (c[:, 2] + wt * c[:, 3])
+        step = c[:, 4] + wt * c[:, 5] + wm * (c[:, 6] + wt * c[:, 7])
+        return lower + altitude_weight * step
+
+    def _profile_fuel(self, type_rows, distance, airborne, origin_isa, dest_isa, out):
+        """Phase fuel columns for one chunk of flights, written into out (see estimate)"""
+        type_offset = (type_rows * self._type_stride).astype(np.float32)
+
+        # Cruise altitude: ~12,000 ft plus 40 ft per km, no higher than the type's ceiling
+        # or than a climb and descent that fit in the airborne time
+        minutes_per_ft = 1 / CLIMB_RATE_FPM + 1 / DESCENT_RATE_FPM
+        altitude = np.minimum(np.minimum(12000 + 40 * distance, self.ceiling_ft[type_rows]),
+                              airborne * np.float32(60 / minutes_per_ft))
+        climb_hours = altitude * np.float32(1 / CLIMB_RATE_FPM / 60)
+        descent_hours = altitude * np.float32(1 / DESCENT_RATE_FPM / 60)
+        cruise_hours = np.maximum(airborne - climb_hours - descent_hours, 0)
+
+        takeoff_mass = 0.80 + 0.15 * np.minimum(distance * np.float32(1 / 6000), 1)
+        landing_mass = takeoff_mass - distance * np.float32(0.035 / 1000 * 0.85)
+        cruise_mass = (takeoff_mass + landing_mass) * np.float32(0.5)
+
+        # Climb and descent are flown at the same mean altitude, so they share its grid cell
+        mid_level, mid_weight = _cell(ALTITUDE_FT, altitude * np.float32(0.5))
+        mid_offset = type_offset + mid_level * self._level_stride
+        cruise_level, cruise_weight = _cell(ALTITUDE_FT, altitude)
+        climb = self._interpolate_cells('climb', mid_offset, mid_weight, _cell(MASS_FRACTION, takeoff_mass),
+                                        _cell(ISA_DEVIATION_C, origin_isa))
+        cruise = self._interpolate_cells('cruise', type_offset + cruise_level * self._level_stride, cruise_weight,
+                                         _cell(MASS_FRACTION, cruise_mass),
+                                         _cell(ISA_DEVIATION_C, (origin_isa + dest_isa) * np.float32(0.5)))
+        descent = self._interpolate_cells('descent', mid_offset, mid_weight, _cell(MASS_FRACTION, landing_mass),
+                                          _cell(ISA_DEVIATION_C, dest_isa))
+
+        taxi_fuel, climb_fuel, cruise_fuel, descent_fuel, total_fuel, cruise_altitude = out
+        taxi_fuel[:] = self._taxi_fuel[type_rows]
+        np.multiply(climb, climb_hours, out=climb_fuel)
+        np.multiply(cruise, cruise_hours, out=cruise_fuel)
+        np.multiply(descent, descent_hours, out=descent_fuel)
+        np.add(taxi_fuel, climb_fuel, out=total_fuel)
+        total_fuel += cruise_fuel
+        total_fuel += descent_fuel
+        cruise_altitude[:] = altitude
+
+    def estimate(self, type_codes, distance_km, airborne_hours=None, origin_temp_c=None, dest_temp_c=None,
+                 chunk_size=16384, workers=None):
+        """
+        Phase-by-phase fuel for a batch of flights
+
+        The profile climbs to a cruise altitude that grows with route length (capped by the
+        type's ceiling and by the time available to climb and descend), cruises for the
+        remaining airborne time and descends; takeoff mass grows with distance (fuel load),
+        and surface temperatures give the ISA deviation of each phase. Flights are processed
+        in cache-sized chunks so the interpolation temporaries stay in cache; NumPy releases
+        the GIL, so chunks run concurrently on a thread pool.
+
+        Parameters:
+        type_codes (np.ndarray): From type_codes
+        distance_km (np.ndarray): Route distance
+        airborne_hours (np.ndarray): Airborne time (distance at CRUISE_SPEED_KMH when None)
+        origin_temp_c, dest_temp_c (np.ndarray): Surface temperatures (standard when None/NaN)
+        chunk_size (int): Flights per chunk
+        workers (int): Chunks evaluated concurrently (default: CPU count)
+
+        Returns:
+        pd.DataFrame: Taxi_Fuel_kg, Climb_Fuel_kg, Cruise_Fuel_kg, Descent_Fuel_kg, Phase_Fuel_kg
+                      and Cruise_Altitude_ft per flight
+        """
+        # The profile is computed in float32 (fuel to ~7 significant digits) to halve memory
+        # traffic; inputs are converted chunk by chunk so every temporary stays in cache
+        type_codes = np.asarray(type_codes)
+        type_rows = np.where(type_codes < 0, len(self.cruise_rates) - 1, type_codes)
+        n_rows = len(type_rows)
+        distance_km, airborne_hours, origin_temp_c, dest_temp_c = (
+            None if values is None else np.asarray(values)
+            for values in (distance_km, airborne_hours, origin_temp_c, dest_temp_c))
+
+        def isa_deviation(temp_c, chunk, size):
+            if temp_c is None:
+                return np.zeros(size, dtype=np.float32)
+            deviation = np.asarray(temp_c[chunk], dtype=np.float32) - np.float32(STANDARD_SURFACE_TEMP_C)
+            np.copyto(deviation, 0, where=np.isnan(deviation))
+            return deviation
+
+        columns = np.empty((len(PHASE_FUEL_COLUMNS), n_rows))
+
+        def evaluate(start):
+            chunk = slice(start, start + chunk_size)
+            distance = _as_float32(distance_km[chunk])
+            if airborne_hours is None:
+                airborne = distance * np.float32(1 / CRUISE_SPEED_KMH)
+            else:
+                airborne = np.maximum(_as_float32(airborne_hours[chunk]), 0)
+            self._profile_fuel(type_rows[chunk], distance, airborne, isa_deviation(origin_temp_c, chunk, len(distance)),
+                               isa_deviation(dest_temp_c, chunk, len(distance)), columns[:, chunk])
+
+        starts = range(0, n_rows, chunk_size)
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(evaluate, starts))
+        else:
+            for start in starts:
+                evaluate(start)
+        # Wrap the column-major result without another copy
+        return pd.DataFrame(columns.T, columns=PHASE_FUEL_COLUMNS, copy=False)
+
+    def save(self, path):
+        np.savez(path, type_names=np.array(self.type_names), cruise_rates=self.cruise_rates,
+                 **{f'grid_{phase}': grid for phase, grid in self.grids.items()})
+
+    @classmethod
+    def load(cls, path):
+        """Load a model saved with save (grids may have been replaced with measured tables)"""
+        data = np.load(path)
+        rates = data['cruise_rates']
+        model = cls(dict(zip(data['type_names'].tolist(), rates[:-1])), float(rates[-1]))
+        model.grids = {phase: data[f'grid_{phase}'] for phase in PHASES}
+        return model
+
+if __name__ == "__main__":
+    from fuel_rates import FUEL_RATE_LOOKUP, DEFAULT_FUEL_RATE
+
+    parser = argparse.ArgumentParser(description="Compare phase-of-flight fuel with the flat-rate baseline")
+    parser.add_argument('--rows', type=int, default=2000000, help="Flights to evaluate (the data is tiled to this size)")
+    parser.add_argument('--workers', type=int, help="Chunks evaluated concurrently (default: CPU count)")
+    args = parser.parse_args()
+
+    flights = pd.read_csv('/home/ubuntu/data/enhanced_flight_data_with_weather.csv')
+    flights = flights.iloc[np.resize(np.arange(len(flights)), args.rows)].reset_index(drop=True)
+    airborne_hours = flights['Flight_Duration'].to_numpy(dtype=np.float64) / 60
+    distance_km = airborne_hours * CRUISE_SPEED_KMH
+
+    # Today's flat baseline: per-model rate lookup times duration
+    start = time.perf_counter()
+    codes, models = pd.factorize(flights['Model'])
+    rate_table = np.append(models.map(lambda m: FUEL_RATE_LOOKUP.get(m, DEFAULT_FUEL_RATE)).to_numpy(dtype=np.float64),
+                           DEFAULT_FUEL_RATE)
+    flat_fuel = rate_table[codes] * airborne_hours
+    flat_seconds = time.perf_counter() - start
+
+    model = PhaseFuelModel(FUEL_RATE_LOOKUP, DEFAULT_FUEL_RATE)
+    start = time.perf_counter()
+    codes, models = pd.factorize(flights['Model'])
+    type_codes = np.append(model.type_codes(models), -1)[codes]
+    phases = model.estimate(type_codes, distance_km, airborne_hours,
+                            flights['origin_temperature_c'].to_numpy(), flights['dest_temperature_c'].to_numpy(),
+                            workers=args.workers)
+    phase_seconds = time.perf_counter() - start
+
+    print(f"Flat rate lookup: {flat_seconds / len(flights) * 1e9:.0f} ns per flight")
+    print(f"Phase model:      {phase_seconds / len(flights) * 1e9:.0f} ns per flight")
+    print(f"Mean fuel: flat {flat_fuel.mean():.0f} kg, phase {phases['Phase_Fuel_kg'].mean():.0f} kg")
+    print(phases.describe().T[['mean', 'min', 'max']])
@@ -0,0 +1,321 @@
+import numpy as np
+import pandas as pd
+
+# Which shared dictionary each string column is encoded with
+DICTIONARY_COLUMNS = {
+    'Dep_Airport': 'airport',
+    'Arr_Airport': 'airport',
+    'Airline': 'carrier',
+    'Tail_Number': 'tail',
+    'Manufacturer': 'manufacturer',
+    'Model': 'model',
+    'Dep_CityName': 'city',
+    'Arr_CityName': 'city'
+}
+
+EARTH_RADIUS_KM = 6371
+
+class Dictionary:
+    """
+    Append-only mapping between string values and dense integer codes (-1 = missing)
+    """
+
+    def __init__(self, values=()):
+        self.values = []
+        self._index = pd.Index([], dtype=object)
+        if len(values):
+            self.encode(values)
+
+    def encode(self, values):
+        """
+        Encode values to codes, adding unseen values to the dictionary
+
+        The string hashing happens here, once per value; everything downstream works
+        on the integer codes.
+        """
+        values = pd.Series(values, copy=False)
+        codes = self._index.get_indexer(values)
+        unseen = (codes < 0) & values.notna().to_numpy()
+        if unseen.any():
+            new_values = pd.unique(values[unseen])
+            self.values.extend(new_values.tolist())
+            self._index = pd.Index(self.values, dtype=object)
+            codes = self._index.get_indexer(values)
+        return codes.astype(np.int32)
+
+    def decode(self, codes):
+        """Turn codes back into values (missing codes become None)"""
+        lookup = np.array(self.values + [None], dtype=object)
+        return lookup[np.asarray(codes)]
+
+    def map_array(self, mapping, default=np.nan, dtype=np.float64):
+        """
+        Dense array indexed by code holding mapping(value) for every dictionary entry
+
+        Parameters:
+        mapping (dict or callable): Value -> attribute
+        default: Attribute for values missing from mapping (also stored at index -1)
+
+        Returns:
+        np.ndarray: len(dictionary) + 1 entries; the last one serves code -1
+        """
+        get = mapping if callable(mapping) else (lambda v: mapping.get(v, default))
+        result = np.full(len(self.values) + 1, default, dtype=dtype)
+        for code, value in enumerate(self.values):
+            attribute = get(value)
+            result[code] = default if attribute is None else attribute
+        return result
+
+    def __len__(self):
+        return len(self.values)
+
+def _compact_numeric(values):
+    """Downcast a numeric column to the smallest lossless dtype"""
+    series = pd.Series(values, copy=False)
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer').to_numpy()
+    if pd.api.types.is_float_dtype(series):
+        as_float32 = series.astype(np.float32)
+        if np.allclose(as_float32.to_numpy(), series.to_numpy(), equal_nan=True, rtol=0, atol=0):
+            return as_float32.to_numpy()
+        return series.to_numpy(dtype=np.float64)
+    return series.to_numpy()
+
+class FlightStore:
+    """
+    Columnar, dictionary-encoded flight records
+
+    String columns listed in DICTIONARY_COLUMNS are stored as int32 codes into shared
+    dictionaries (Dep_Airport and Arr_Airport share one airport dictionary), FlightDate
+    as int32 days since epoch, and numeric columns as compact NumPy arrays. Joins to
+    per-airport or per-model tables become integer gathers: table[codes].
+    """
+
+    def __init__(self, dictionaries=None):
+        self.dictionaries = dictionaries if dictionaries is not None else {}
+        self.column_dictionaries = dict(DICTIONARY_COLUMNS)
+        self._chunks = {}
+        self._columns = {}
+        self.n_rows = 0
+
+    @property
+    def columns(self):
+        """Column arrays; appended chunks are concatenated once, on first access"""
+        for column, chunks in self._chunks.items():
+            if chunks:
+                if column in self._columns:
+                    chunks.insert(0, self._columns[column])
+                dtype = np.result_type(*(chunk.dtype for chunk in chunks))
+                self._columns[column] = np.concatenate([chunk.astype(dtype, copy=False) for chunk in chunks])
+                chunks.clear()
+        return self._columns
+
+    def dictionary(self, name):
+        if name not in self.dictionaries:
+            self.dictionaries[name] = Dictionary()
+        return self.dictionaries[name]
+
+    def _encode_frame(self, frame):
+        encoded = {}
+        for column in frame.columns:
+            values = frame[column]
+            if column in self.column_dictionaries:
+                encoded[column] = self.dictionary(self.column_dictionaries[column]).encode(values)
+            elif column == 'FlightDate':
+                days = pd.to_datetime(values, errors='coerce').to_numpy(dtype='datetime64[D]')
+                encoded[column] = np.where(np.isnat(days), -1, days.astype(np.int64)).astype(np.int32)
+            elif pd.api.types.is_numeric_dtype(values):
+                encoded[column] = _compact_numeric(values)
+            else:
+                # Any other string column gets its own dictionary
+                self.column_dictionaries[column] = column
+                encoded[column] = self.dictionary(column).encode(values)
+        return encoded
+
+    def append(self, frame):
+        """Encode and append a DataFrame chunk (dictionaries grow as needed)"""
+        for column, values in self._encode_frame(frame).items():
+            self._chunks.setdefault(column, []).append(values)
+        self.n_rows += len(frame)
+        return self
+
+    @classmethod
+    def from_frame(cls, frame, dictionaries=None):
+        return cls(dictionaries).append(frame)
+
+    @classmethod
+    def from_csv(cls, path, usecols=None, chunksize=500000, nrows=None, dictionaries=None):
+        """Build a store from a CSV chunk by chunk, never holding the string frame whole"""
+        store = cls(dictionaries)
+        for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize, nrows=nrows):
+            store.append(chunk)
+        return store
+
+    def codes(self, column):
+        return self.columns[column]
+
+    def gather(self, column, table):
+        """
+        Join a per-dictionary-entry table onto every row: table[codes]
+
+        Parameters:
+        column (str): Dictionary-encoded column
+        table (np.ndarray): Array built with Dictionary.map_array (last slot serves missing codes)
+        """
+        return table[self.columns[column]]
+
+    def decode(self, column):
+        """String values of a dictionary-encoded column, or dates for FlightDate"""
+        values = self.columns[column]
+        if column == 'FlightDate':
+            days = values.astype('datetime64[D]')
+            return np.where(values < 0, np.datetime64('NaT'), days)
+        if column in self.column_dictionaries:
+            return self.dictionary(self.column_dictionaries[column]).decode(values)
+        return values
+
+    def to_frame(self, columns=None):
+        """Decode columns back into a pandas DataFrame"""
+        columns = columns or list(self.columns)
+        return pd.DataFrame({column: self.decode(column) for column in columns})
+
+    def memory_usage(self):
+        """Bytes used by the column arrays plus the dictionaries' Python strings"""
+        column_bytes = sum(values.nbytes for values in self.columns.values())
+        dictionary_bytes = sum(sum(len(str(v)) + 49 for v in d.values) for d in self.dictionaries.values())
+        return column_bytes + dictionary_bytes
+
+    def __len__(self):
+        return self.n_rows
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Vectorized great-circle distance in kilometers (inputs in degrees)"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def airport_coordinate_tables(airport_dictionary, airports_df):
+    """
+    Latitude and longitude arrays indexed by airport code
+
+    Parameters:
+    airport_dictionary (Dictionary): Shared airport dictionary
+    airports_df (pd.DataFrame): Airport geolocation table with IATA_CODE, LATITUDE, LONGITUDE
+
+    Returns:
+    tuple: (latitude table, longitude table), NaN for airports without coordinates
+    """
+    # The first row with coordinates wins when an IATA code is listed more than once
+    airports_df = airports_df.dropna(subset=['IATA_CODE', 'LATITUDE', 'LONGITUDE']).drop_duplicates('IATA_CODE')
+    positions = pd.Index(airports_df['IATA_CODE']).get_indexer(airport_dictionary.values)
+    lat = np.full(len(airport_dictionary) + 1, np.nan)
+    lon = np.full(len(airport_dictionary) + 1, np.nan)
+    found = positions >= 0
+    lat[:-1][found] = airports_df['LATITUDE'].to_numpy(dtype=np.float64)[positions[found]]
+    lon[:-1][found] = airports_df['LONGITUDE'].to_numpy(dtype=np.float64)[positions[found]]
+    return lat, lon
+
+def initial_bearing_deg(lat1, lon1, lat2, lon2):
+    """Vectorized great-circle initial course in degrees clockwise from true north (inputs in degrees)"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    dlon = lon2 - lon1
+    x = np.sin(dlon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return np.degrees(np.arctan2(x, y)) % 360
+
+class RouteGeometry:
+    """
+    Per-route distance and great-circle courses, computed once per distinct airport pair
+
+    Routes are keyed by their (departure, arrival) airport codes packed into one int64, kept
+    sorted next to the computed distance, initial course (at departure) and final course (at
+    arrival). A lookup finds known routes with one searchsorted, computes only the new pairs
+    in a single array pass, and gathers the results for every flight. Airport codes come from
+    the append-only airport dictionary, so cached routes stay valid as it grows.
+    """
+
+    def __init__(self, airport_dictionary, airports_df):
+        self.airport_dictionary = airport_dictionary
+        self.airports_df = airports_df
+        self.keys = np.empty(0, dtype=np.int64)
+        self.distance_km = np.empty(0)
+        self.initial_bearing_deg = np.empty(0)
+        self.final_bearing_deg = np.empty(0)
+        self._coordinates = None
+
+    def _coordinate_tables(self):
+        if self._coordinates is None or len(self._coordinates[0]) != len(self.airport_dictionary) + 1:
+            self._coordinates = airport_coordinate_tables(self.airport_dictionary, self.airports_df)
+        return self._coordinates
+
+    def _add_routes(self, keys):
+        lat, lon = self._coordinate_tables()
+        dep, arr = keys >> 32, keys & 0xFFFFFFFF
+        distance = haversine_km(lat[dep], lon[dep], lat[arr], lon[arr])
+        initial = initial_bearing_deg(lat[dep], lon[dep], lat[arr], lon[arr])
+        # Course on arrival: the reverse route's initial course, turned around
+        final = (initial_bearing_deg(lat[arr], lon[arr], lat[dep], lon[dep]) + 180) % 360
+
+        keys = np.concatenate([self.keys, keys])
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.distance_km = np.concatenate([self.distance_km, distance])[order]
+        self.initial_bearing_deg = np.concatenate([self.initial_bearing_deg, initial])[order]
+        self.final_bearing_deg = np.concatenate([self.final_bearing_deg, final])[order]
+
+    def lookup(self, dep_codes, arr_codes):
+        """
+        Geometry of every flight from its airport codes
+
+        Parameters:
+        dep_codes (np.ndarray): Departure airport codes (-1 = missing)
+        arr_codes (np.ndarray): Arrival airport codes (-1 = missing)
+
+        Returns:
+        tuple: (distance km, initial course deg, final course deg) per flight; NaN when
+               either airport is missing or has no coordinates
+        """
+        dep_codes = np.asarray(dep_codes, dtype=np.int64)
+        arr_codes = np.asarray(arr_codes, dtype=np.int64)
+        known_airports = (dep_codes >= 0) & (arr_codes >= 0)
+        keys = np.where(known_airports, (dep_codes << 32) | np.maximum(arr_codes, 0), -1)
+
+        route_keys, inverse = np.unique(keys, return_inverse=True)
+        route_keys = route_keys[route_keys >= 0]
+        positions = np.searchsorted(self.keys, route_keys)
+        cached = positions < len(self.keys)
+        cached[cached] = self.keys[positions[cached]] == route_keys[cached]
+        if not cached.all():
+            self._add_routes(route_keys[~cached])
+
+        # One gather table per distinct key, with a trailing NaN slot for missing airports
+        positions = np.searchsorted(self.keys, route_keys)
+        has_missing = keys.size > 0 and keys.min() < 0
+        results = []
+        for values in (self.distance_km, self.initial_bearing_deg, self.final_bearing_deg):
+            table = values[positions]
+            if has_missing:
+                table = np.concatenate([[np.nan], table])
+            results.append(table[inverse.ravel()])
+        return tuple(results)
+
+    def for_store(self, store):
+        """Geometry of every flight in a FlightStore (see lookup)"""
+        return self.lookup(store.codes('Dep_Airport'), store.codes('Arr_Airport'))
+
+    def __len__(self):
+        return len(self.keys)
+
+def route_distances_km(store, airports_df, geometry=None):
+    """
+    Great-circle distance for every flight, computed once per distinct route
+
+    Parameters:
+    geometry (RouteGeometry): Optional route cache to reuse (built on the store's airports by default)
+
+    Returns:
+    np.ndarray: Distance per flight (NaN when either airport has no coordinates)
+    """
+    if geometry is None:
+        geometry = RouteGeometry(store.dictionary('airport'), airports_df)
+    return geometry.for_store(store)[0]
@@ -0,0 +1,90 @@
+import pandas as pd
+import numpy as np
+from flight_phases import PhaseFuelModel, PHASE_FUEL_COLUMNS
+
+# Fuel consumption lookup table (kg/hour) keyed by aircraft model
+FUEL_RATE_LOOKUP = {
+    'CRJ2': 850,
+    'CRJ7': 950,
+    'CRJ9': 1050,
+    'E145': 900,
+    'E170': 1100,
+    'E175': 1150,
+    'B737': 2500,
+    'A320': 2400,
+    'B757': 3200,
+    'B767': 4200,
+    'A330': 5500,
+    'B777': 7500,
+    'B787': 5400,
+    'A350': 5800
+}
+
+# For unmapped aircraft, use a default rate based on aircraft type
+DEFAULT_FUEL_RATE = 1000  # kg/hour for regional jets
+
+def baseline_phase_model():
+    """Phase-of-flight model behind Baseline_Fuel_kg (shared by training and the route fuel table)"""
+    return PhaseFuelModel(FUEL_RATE_LOOKUP, DEFAULT_FUEL_RATE)
+
+def add_baseline_fuel(flights, registry=None, phase_model=None):
+    """
+    Add Fuel_Rate_kg_per_hour and Baseline_Fuel_kg (without weather impact) columns
+    
+    Parameters:
+    flights (pd.DataFrame): Flight data with Model and Flight_Duration (minutes)
+    registry (AircraftRegistry): Optional per-tail registry; when given, flights of registered
+                                 tails use the resolved type's rate scaled by the airframe's
+                                 fuel-flow factor, and Fuel_Flow_Factor is added as a column
+    phase_model (PhaseFuelModel): Optional taxi/climb/cruise/descent model (see flight_phases);
+                                  when given, Baseline_Fuel_kg is the sum of the phases, with
+                                  Flight_Duration as airborne time, Estimated_Distance_km and the
+                                  origin/destination temperatures when present, and the phase
+                                  columns are added
+    
+    Returns:
+    pd.DataFrame: The same DataFrame with the columns added
+    """
+    # Map aircraft models to fuel consumption rates: look up each distinct model once,
+    # then gather by integer code instead of hashing every row's model string
+    codes, models = pd.factorize(flights['Model'])
+    rate_table = np.append(models.map(lambda m: FUEL_RATE_LOOKUP.get(m, DEFAULT_FUEL_RATE)).to_numpy(dtype=np.float64),
+                           DEFAULT_FUEL_RATE)
+    flights['Fuel_Rate_kg_per_hour'] = rate_table[codes]
+    
+    fuel_flow_factor = 1.0
+    if registry is not None and 'Tail_Number' in flights.columns:
+        airframes = registry.resolve(flights['Tail_Number'])
+        type_rates = airframes['Type_Code'].map(FUEL_RATE_LOOKUP).to_numpy(dtype=np.float64)
+        resolved = ~np.isnan(type_rates)
+        rates = np.where(resolved, type_rates, flights['Fuel_Rate_kg_per_hour'].to_numpy())
+        if phase_model is not None:
+            # Registered tails take their resolved type's grids
+            codes, models = pd.factorize(pd.Series(np.where(resolved, airframes['Type_Code'].to_numpy(),
+                                                            flights['Model'].to_numpy()), copy=False))
+        flights['Fuel_Flow_Factor'] = airframes['Fuel_Flow_Factor'].to_numpy(dtype=np.float64)
+        fuel_flow_factor = flights['Fuel_Flow_Factor'].to_numpy()
+        flights['Fuel_Rate_kg_per_hour'] = rates * fuel_flow_factor
+    
+    # Calculate baseline fuel consumption (without weather impact)
+    if phase_model is None:
+        flights['Baseline_Fuel_kg'] = flights['Fuel_Rate_kg_per_hour'] * flights['Flight_Duration'] / 60
+        return flights
+    
+    # Phase-of-flight baseline: type grids are looked up once per distinct type, then gathered
+    # (reusing the model codes factorized for the rate lookup)
+    type_codes = np.append(phase_model.type_codes(models), -1)[codes]
+    airborne_hours = flights['Flight_Duration'].to_numpy(dtype=np.float64) / 60
+    # Route distance, or the airborne time at 850 km/h where it is unknown
+    distance_km = airborne_hours * 850
+    if 'Estimated_Distance_km' in flights.columns:
+        route_distance = flights['Estimated_Distance_km'].to_numpy(dtype=np.float64)
+        distance_km = np.where(np.isnan(route_distance), distance_km, route_distance)
+    phases = phase_model.estimate(type_codes, distance_km, airborne_hours,
+                                  flights.get('origin_temperature_c'), flights.get('dest_temperature_c'))
+    for column in PHASE_FUEL_COLUMNS:
+        values = phases[column].to_numpy()
+        flights[column] = values if column == 'Cruise_Altitude_ft' else values * fuel_flow_factor
+    flights['Baseline_Fuel_kg'] = flights['Phase_Fuel_kg']
+    
+    return flights
@@ -4,6 +4,7 @@ import json
 from datetime import datetime, timedelta
 import time
 import numpy as np
+from station_index import StationIndex, AIRPORTS_PATH, FALLBACK_RADIUS_KM
 
 def get_metar_data(airport_codes, hours_back=3):
     """
@@ -77,13 +78,36 @@ def parse_metar_data(metar_data):
     
     return pd.DataFrame(parsed_data)
 
-def enhance_flight_data_with_metar(flight_data_path, output_path):
+def fetch_metar_batches(stations, batch_size=20, hours_back=6):
+    """
+    Fetch METAR observations for many ICAO stations in rate-limited batches
+    
+    Returns:
+    list: Raw observations of every batch that succeeded
+    """
+    all_metar_data = []
+    for i in range(0, len(stations), batch_size):  # Smaller batch size to avoid API rate limits
+        batch_stations = stations[i:i+batch_size]
+        print(f"Fetching METAR data for stations {i+1}-{min(i+batch_size, len(stations))}...")
+        
+        metar_data = get_metar_data(batch_stations, hours_back=hours_back)
+        
+        if metar_data:
+            all_metar_data.extend(metar_data)
+            print(f"Retrieved {len(metar_data)} observations for this batch")
+        
+        # Add delay to respect API rate limits
+        time.sleep(2)
+    return all_metar_data
+
+def enhance_flight_data_with_metar(flight_data_path, output_path, airports_path=AIRPORTS_PATH):
     """
     Enhance flight data with METAR weather information
     
     Parameters:
     flight_data_path (str): Path to the flight data CSV
     output_path (str): Path to save enhanced data
+    airports_path (str): Airport geolocation table used to resolve IATA codes to stations
     """
     print("Loading flight data...")
     # Load a sample of flight data
@@ -100,22 +124,23 @@ def enhance_flight_data_with_metar(flight_data_path, output_path):
     print(f"Found {len(all_airports)} unique airports")
     print("Sample airports:", all_airports[:10])
     
-    # Fetch METAR data for all airports (in batches to avoid API limits)
-    batch_size = 20  # Smaller batch size to avoid API rate limits
-    all_metar_data = []
+    # The flight file uses IATA codes (BDL) while METAR reports key on ICAO stations (KBDL);
+    # map them through the persisted station index built from the airport table
+    station_index = StationIndex.load_or_build(airports_path)
+    all_airports = all_airports[:100]  # Limit to first 100 airports for testing
+    stations = sorted(set(station_index.icao_codes(all_airports)) - {None})
     
-    for i in range(0, min(len(all_airports), 100), batch_size):  # Limit to first 100 airports for testing
-        batch_airports = all_airports[i:i+batch_size]
-        print(f"Fetching METAR data for airports {i+1}-{min(i+batch_size, len(all_airports))}...")
-        
-        metar_data = get_metar_data(batch_airports, hours_back=6)
-        
-        if metar_data:
-            all_metar_data.extend(metar_data)
-            print(f"Retrieved {len(metar_data)} observations for this batch")
-        
-        # Add delay to respect API rate limits
-        time.sleep(2)
+    all_metar_data = fetch_metar_batches(stations)
+    
+    # Airports without a report of their own fall back to the nearest reporting station;
+    # fetch the stations around them that were not requested yet
+    reported = {observation.get('icaoId') for observation in all_metar_data}
+    unreported = [airport for airport, station in zip(all_airports, station_index.icao_codes(all_airports))
+                  if station not in reported]
+    candidates = [station for station in station_index.fallback_candidates(unreported) if station not in stations]
+    if candidates:
+        print(f"Fetching {len(candidates)} nearby stations for {len(unreported)} airports without reports...")
+        all_metar_data.extend(fetch_metar_batches(candidates))
     
     print(f"Retrieved {len(all_metar_data)} total METAR observations")
     
@@ -131,13 +156,24 @@ def enhance_flight_data_with_metar(flight_data_path, output_path):
     print("METAR data sample:")
     print(metar_df.head())
     
+    # Latest observation per station, so each flight joins exactly one report per airport
+    metar_df = metar_df.sort_values('observation_time').drop_duplicates('icao_id', keep='last')
+    
+    # Weather per airport from its own or the nearest reporting station
+    resolution = station_index.resolve(all_airports, metar_df['icao_id'])
+    n_own = int((resolution['station_distance_km'] == 0).sum())
+    n_fallback = int(resolution['station'].notna().sum()) - n_own
+    print(f"Weather stations: {n_own} airports with their own report, {n_fallback} from a station "
+          f"within {FALLBACK_RADIUS_KM} km, {len(resolution) - n_own - n_fallback} without weather")
+    airport_weather = resolution.merge(metar_df, left_on='station', right_on='icao_id', how='inner').drop(columns='station')
+    
     # Create weather features for origin airports
-    origin_weather = metar_df.copy()
-    origin_weather.columns = ['origin_' + col if col != 'icao_id' else 'Dep_Airport' for col in origin_weather.columns]
+    origin_weather = airport_weather.copy()
+    origin_weather.columns = ['origin_' + col if col != 'airport' else 'Dep_Airport' for col in origin_weather.columns]
     
     # Create weather features for destination airports  
-    dest_weather = metar_df.copy()
-    dest_weather.columns = ['dest_' + col if col != 'icao_id' else 'Arr_Airport' for col in dest_weather.columns]
+    dest_weather = airport_weather.copy()
+    dest_weather.columns = ['dest_' + col if col != 'airport' else 'Arr_Airport' for col in dest_weather.columns]
     
     # Merge weather data with flight data
     print("Merging weather data with flight data...")
@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+import json
+import socket
+import argparse
+import subprocess
+import http.client
+from multiprocessing import Pool
+
+def _client(args):
+    """Keep-alive client loop: issue requests until the deadline, return the count"""
+    host, port, method, path, body, deadline = args
+    headers = {'Content-Type': 'application/json'} if body else {}
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    completed = errors = 0
+    while time.time() < deadline:
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status < 400:
+                completed += 1
+            else:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.close()
+    return completed, errors
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _wait_ready(host, port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        conn = http.client.HTTPConnection(host, port, timeout=2)
+        try:
+            conn.request('GET', '/readyz')
+            if conn.getresponse().status == 200:
+                return True
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            conn.close()
+        # Not up yet, or up but still loading (503): poll again shortly
+        time.sleep(0.2)
+    return False
+
+def run_load(host, port, clients, duration, method='GET', path='/healthz', body=None):
+    """
+    Drive a running server with client processes for a fixed duration
+
+    Returns:
+    dict: requests, errors and requests per second
+    """
+    deadline = time.time() + duration
+    with Pool(clients) as pool:
+        counts = pool.map(_client, [(host, port, method, path, body, deadline)] * clients)
+    completed = sum(c for c, _ in counts)
+    return {'requests': completed, 'errors': sum(e for _, e in counts), 'rps': completed / duration}
+
+def benchmark_workers(worker_counts, clients, duration, threads, server, method, path, body):
+    """
+    Start serve.py once per worker count and measure throughput against it
+
+    Returns:
+    list: One result dict per worker count
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'serve.py')
+    results = []
+    for workers in worker_counts:
+        port = _free_port()
+        process = subprocess.Popen(
+            [sys.executable, script, '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+             '--threads', str(threads), '--server', server],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not _wait_ready('127.0.0.1', port):
+                print(f"Server with {workers} workers did not become ready")
+                continue
+            result = run_load('127.0.0.1', port, clients, duration, method, path, body)
+            result['workers'] = workers
+            results.append(result)
+            print(f"{workers:>3} workers: {result['rps']:>9.1f} req/s ({result['errors']} errors)")
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local throughput test of serve.py at several worker counts")
+    parser.add_argument('--workers', default='1,2,4', help="Comma-separated worker counts")
+    parser.add_argument('--clients', type=int, default=16, help="Concurrent client processes")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per worker count")
+    parser.add_argument('--threads', type=int, default=1, help="Threads per worker")
+    parser.add_argument('--server', default='auto')
+    parser.add_argument('--path', default='/', help="Endpoint to hit (e.g. /, /healthz, /api/predict)")
+    parser.add_argument('--records', help="JSON file with records to POST to /api/predict")
+    args = parser.parse_args()
+
+    method, body = 'GET', None
+    if args.records:
+        with open(args.records) as f:
+            method, body = 'POST', json.dumps(json.load(f))
+
+    worker_counts = [int(w) for w in args.workers.split(',')]
+    results = benchmark_workers(worker_counts, args.clients, args.duration, args.threads,
+                                args.server, method, args.path, body)
+
+    if results:
+        base = results[0]['rps']
+        print("\nWorkers  Req/s      Speedup")
+        for result in results:
+            print(f"{result['workers']:<8} {result['rps']:<10.1f} {result['rps'] / base if base else 0:.2f}x")
@@ -1,21 +1,166 @@
-from flask import Flask, render_template
+from flask import Flask, render_template, request, jsonify, abort
+from werkzeug.utils import safe_join
 import os
+import math
+from response_cache import ResponseCache, cached_response
+from model_registry import ModelRegistry, current_version
+from explanations import ExplanationEngine
+from drift_monitor import DriftMonitor
+from report_data import REPORT_DATA_DIR
 
 # Get the absolute path to the directory containing this script
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
 # Set the template folder to be relative to the script's directory
 app = Flask(__name__, template_folder=os.path.join(script_dir, 'templates'))
+app.config['TEMPLATES_AUTO_RELOAD'] = True
+
+# Rendered pages and report figures are cached in memory with ETags and gzip/brotli variants
+figures_dir = os.path.join(script_dir, '..', 'reports', 'figures')
+response_cache = ResponseCache(app.template_folder)
+
+# Report aggregates written by report_data.py after each training run. They are served with
+# max-age=0, so browsers revalidate by ETag on every fetch and see a new run immediately
+report_cache = ResponseCache(app.template_folder, file_max_age=0)
+
+# Published Extra_Fuel_kg models (see model_registry.publish_models)
+model_registry = ModelRegistry()
+
+# Per-prediction feature attributions, cached per model version and row
+explanation_engine = ExplanationEngine()
+
+# Scored features are compared against the training distribution (per worker process)
+drift_monitor = DriftMonitor()
+model_registry.feature_observers.append(drift_monitor.observe)
+
+# Set once templates, figures and models have been preloaded
+caches_warm = False
+
+# Route baseline fuel table as (file mtime, table), loaded on first use and reloaded
+# whenever route_fuel_table.py rewrites the file
+route_fuel_state = (None, None)
 
 @app.route('/')
 def index():
-    return render_template('introduction.html')
+    return serve_page('introduction')
 
 @app.route('/<page_name>.html')
 def serve_page(page_name):
-    return render_template(f'{page_name}.html')
+    template_name = f'{page_name}.html'
+    page = response_cache.page(template_name, lambda: render_template(template_name))
+    return cached_response(page)
+
+@app.route('/figures/<path:filename>')
+def serve_figure(filename):
+    path = safe_join(figures_dir, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    return cached_response(response_cache.file(path))
+
+@app.route('/api/report/<name>')
+def report_data(name):
+    """Precomputed report aggregate: manifest, summary, metrics, feature_importance, prediction_vs_actual or aircraft"""
+    path = safe_join(REPORT_DATA_DIR, name + '.json')
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    return cached_response(report_cache.file(path))
+
+@app.route('/api/route_fuel/<dep_airport>/<arr_airport>/<aircraft_type>')
+def route_fuel(dep_airport, arr_airport, aircraft_type):
+    """What would route X on type Y burn? Optional ?month=1..12"""
+    global route_fuel_state
+    from route_fuel_table import RouteFuelTable, ROUTE_TABLE_PATH
+    loaded_mtime, table = route_fuel_state
+    try:
+        # One stat per request, as ResponseCache.file does, so a refreshed table is picked up
+        mtime = os.path.getmtime(ROUTE_TABLE_PATH)
+        if mtime != loaded_mtime:
+            table = RouteFuelTable.load()
+            route_fuel_state = (mtime, table)
+    except FileNotFoundError:
+        # Not built yet (route_fuel_table.py) or being replaced: keep serving the loaded
+        # table if there is one, otherwise retry on the next request
+        pass
+    if table is None:
+        abort(503)
+
+    stats = table.lookup(dep_airport, arr_airport, aircraft_type,
+                                    request.args.get('month', type=int))
+    if stats is None:
+        abort(404)
+    return jsonify({k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in stats.items()})
+
+@app.route('/api/predict', methods=['POST'])
+def predict():
+    """
+    Score a JSON list of flight feature records (or {"records": [...], "model": name})
+
+    With {"explain": true} the response also carries per-feature attributions;
+    "explain_budget_ms" caps the time spent on uncached ones (null where it ran out).
+    """
+    payload = request.get_json(silent=True)
+    options = payload if isinstance(payload, dict) else {}
+    records = options.get('records') if isinstance(payload, dict) else payload
+    model_name = options.get('model')
+    if not isinstance(records, list):
+        abort(400)
+
+    try:
+        if options.get('explain'):
+            predictions, contributions, bias, feature_names, version = model_registry.predict_and_explain(
+                records, explanation_engine, model_name, options.get('explain_budget_ms'))
+        else:
+            predictions, version = model_registry.predict(records, model_name)
+    except RuntimeError:
+        abort(503)
+    except (KeyError, ValueError):
+        abort(400)
+
+    body = {'model_version': version, 'Extra_Fuel_kg': predictions.tolist()}
+    if options.get('explain'):
+        body['explanations'] = [
+            None if math.isnan(row_bias) else {'bias': float(row_bias), 'contributions': dict(zip(feature_names, row.tolist()))}
+            for row, row_bias in zip(contributions, bias)
+        ]
+    return jsonify(body)
+
+@app.route('/api/drift')
+def drift():
+    """PSI/KS drift of recently scored features against the training data (this worker)"""
+    return jsonify({**drift_monitor.report(), 'pid': os.getpid()})
+
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up and answering requests"""
+    return jsonify({'status': 'ok', 'pid': os.getpid()})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: pages, figures and (if any were published) models are loaded"""
+    models_expected = current_version(model_registry.model_dir) is not None
+    ready = caches_warm and (model_registry.ready or not models_expected)
+    body = {'ready': ready, 'model_version': model_registry.version, 'pid': os.getpid()}
+    return jsonify(body), (200 if ready else 503)
+
+def warm_caches():
+    """
+    Render every template, load every figure and the current models into memory
+
+    Called once before the server starts (and before forking workers under a
+    preloading server), so all workers share the warmed caches copy-on-write.
+    """
+    global caches_warm
+    with app.test_request_context():
+        for template_name in app.jinja_env.list_templates(extensions=['html']):
+            response_cache.page(template_name, lambda: render_template(template_name))
+    response_cache.warm_files(figures_dir)
+    report_cache.warm_files(REPORT_DATA_DIR)
+    model_registry.load()
+    caches_warm = True
 
 if __name__ == '__main__':
+    warm_caches()
     app.run(host='0.0.0.0', port=5000)
 
 
+
@@ -0,0 +1,164 @@
+import time
+import pickle
+import numpy as np
+import pandas as pd
+from model_evaluation import compute_metrics
+
+DISTILLATION_REPORT_PATH = '/home/ubuntu/weather_enhanced_distillation_report.csv'
+
+class LookupSurrogate:
+    """
+    Pure-NumPy student model distilled from a tree ensemble
+
+    The top features are quantile-binned and the teacher's mean prediction is stored for
+    every cell of their joint grid; a ridge-regularized linear term over all features then
+    fits what the table leaves over. Scoring is a few searchsorted calls, one table gather
+    and one dot product, so the whole model is a few kilobytes of float32 arrays.
+    """
+
+    def __init__(self, feature_names, top_features, n_bins=12, ridge=1.0):
+        self.feature_names = list(feature_names)
+        self.top_features = list(top_features)
+        self.n_bins = n_bins
+        self.ridge = ridge
+        self.top_index = [self.feature_names.index(name) for name in self.top_features]
+        self.edges = []
+        self.table = None
+        self.coef = None
+        self.intercept = 0.0
+
+    def _matrix(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X.reindex(columns=self.feature_names)
+        return np.asarray(X, dtype=np.float64)
+
+    def _cells(self, X):
+        bins = [np.searchsorted(edges, X[:, column], side='right') for edges, column in zip(self.edges, self.top_index)]
+        return np.ravel_multi_index(bins, self.shape)
+
+    @property
+    def shape(self):
+        return tuple(len(edges) + 1 for edges in self.edges)
+
+    def fit(self, X, teacher_pred):
+        """
+        Fit the lookup table and linear correction to the teacher's predictions
+
+        Parameters:
+        X (pd.DataFrame or np.ndarray): Training features
+        teacher_pred (np.ndarray): Teacher predictions on the same rows
+
+        Returns:
+        LookupSurrogate: self
+        """
+        X = self._matrix(X)
+        target = np.asarray(teacher_pred, dtype=np.float64)
+
+        quantiles = np.linspace(0, 1, self.n_bins + 1)[1:-1]
+        self.edges = [np.unique(np.nanquantile(X[:, column], quantiles)) for column in self.top_index]
+        cells = self._cells(X)
+        n_cells = int(np.prod(self.shape))
+
+        counts = np.bincount(cells, minlength=n_cells)
+        sums = np.bincount(cells, weights=target, minlength=n_cells)
+
+        # Cells without training rows fall back to the mean over the first feature's bin,
+        # then to the global mean
+        first_bin = np.unravel_index(np.arange(n_cells), self.shape)[0]
+        bin_counts = np.bincount(first_bin, weights=counts, minlength=self.shape[0])
+        bin_sums = np.bincount(first_bin, weights=sums, minlength=self.shape[0])
+        fallback = np.where(bin_counts > 0, bin_sums / np.maximum(bin_counts, 1), target.mean())
+        table = np.where(counts > 0, sums / np.maximum(counts, 1), fallback[first_bin])
+
+        # Ridge fit of the residual on standardized features, folded back to raw units
+        residual = target - table[cells]
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        Z = (X - mean) / scale
+        gram = Z.T @ Z + self.ridge * np.eye(Z.shape[1])
+        weights = np.linalg.solve(gram, Z.T @ (residual - residual.mean()))
+
+        self.coef = (weights / scale).astype(np.float32)
+        self.intercept = float(residual.mean() - (mean / scale) @ weights)
+        self.table = table.astype(np.float32)
+        return self
+
+    def predict(self, X):
+        """Predict from a feature matrix in feature_names order (or a DataFrame)"""
+        X = self._matrix(X)
+        return self.table[self._cells(X)] + X @ self.coef + self.intercept
+
+    @property
+    def nbytes(self):
+        """Bytes held by the table, bin edges and coefficients"""
+        return self.table.nbytes + self.coef.nbytes + sum(edges.nbytes for edges in self.edges)
+
+    def save(self, path):
+        np.savez(path, table=self.table, coef=self.coef, intercept=self.intercept,
+                 feature_names=np.array(self.feature_names), top_features=np.array(self.top_features),
+                 n_bins=self.n_bins, ridge=self.ridge,
+                 **{f'edges_{i}': edges for i, edges in enumerate(self.edges)})
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        surrogate = cls(data['feature_names'].tolist(), data['top_features'].tolist(), int(data['n_bins']), float(data['ridge']))
+        surrogate.edges = [data[f'edges_{i}'] for i in range(len(surrogate.top_features))]
+        surrogate.table = data['table']
+        surrogate.coef = data['coef']
+        surrogate.intercept = float(data['intercept'])
+        return surrogate
+
+def _time_per_row(predict, X, repeats=3):
+    """Best-of-repeats wall-clock microseconds per row for a batch predict"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(X)
+        best = min(best, time.perf_counter() - start)
+    return best / len(X) * 1e6
+
+def _time_single_row(predict, X, n_rows=200):
+    """Mean wall-clock microseconds for scoring one row at a time"""
+    rows = [X[i:i + 1] for i in range(min(n_rows, len(X)))]
+    start = time.perf_counter()
+    for row in rows:
+        predict(row)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+def distill_ensemble(teacher, X_train, X_test, y_test, feature_importance, top_k=3, n_bins=12, ridge=1.0):
+    """
+    Distill a trained tree ensemble into a LookupSurrogate and report what it costs
+
+    Parameters:
+    teacher: Fitted model with predict (e.g. the Random Forest)
+    X_train (pd.DataFrame): Rows the teacher labels for the student
+    X_test (pd.DataFrame): Held-out features
+    y_test (pd.Series): Held-out target
+    feature_importance (pd.DataFrame): Output of analyze_feature_importance ('feature', 'importance')
+    top_k (int): Number of features in the lookup grid
+    n_bins (int): Quantile bins per grid feature
+
+    Returns:
+    tuple: (surrogate, report DataFrame indexed by Teacher/Surrogate)
+    """
+    top_features = feature_importance.sort_values('importance', ascending=False)['feature'].head(top_k).tolist()
+    surrogate = LookupSurrogate(list(X_train.columns), top_features, n_bins, ridge)
+    surrogate.fit(X_train, teacher.predict(X_train))
+
+    X_test_array = X_test.to_numpy(dtype=np.float64)
+    teacher_pred = teacher.predict(X_test)
+    surrogate_pred = surrogate.predict(X_test_array)
+
+    report = compute_metrics(y_test, {'Teacher': teacher_pred, 'Surrogate': surrogate_pred})
+    report['Fidelity_R2'] = compute_metrics(teacher_pred, {'Teacher': teacher_pred, 'Surrogate': surrogate_pred})['R2']
+    report['Batch_us_per_row'] = [_time_per_row(teacher.predict, X_test), _time_per_row(surrogate.predict, X_test_array)]
+    report['Single_row_us'] = [_time_single_row(teacher.predict, X_test), _time_single_row(surrogate.predict, X_test_array)]
+    report['Memory_bytes'] = [len(pickle.dumps(teacher)), surrogate.nbytes]
+
+    print(f"Distilled into a lookup over {top_features} ({surrogate.table.size} cells, {surrogate.nbytes / 1024:.1f} KB)")
+    print(f"R² {report.at['Teacher', 'R2']:.3f} -> {report.at['Surrogate', 'R2']:.3f} "
+          f"(loss {report.at['Teacher', 'R2'] - report.at['Surrogate', 'R2']:.3f}), "
+          f"single-row latency {report.at['Teacher', 'Single_row_us']:.0f} -> {report.at['Surrogate', 'Single_row_us']:.0f} µs")
+    return surrogate, report
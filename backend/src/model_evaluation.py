@@ -0,0 +1,262 @@
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Test sets larger than this are drawn as 2-D density bins instead of a point scatter
+DENSITY_PLOT_THRESHOLD = 20000
+
+# Default resolution for report figures (300 dpi made every PNG several MB)
+DEFAULT_DPI = 150
+
+# Route distance bands (km) used for per-segment breakdowns
+DISTANCE_BANDS = [0, 500, 1000, 2000, 4000, np.inf]
+DISTANCE_BAND_LABELS = ['<500 km', '500-1000 km', '1000-2000 km', '2000-4000 km', '4000+ km']
+
+def _stack_predictions(y_true, predictions):
+    """
+    Stack model predictions into one (n_models, n_rows) matrix aligned with y_true
+
+    Parameters:
+    y_true (array-like): Actual target values
+    predictions (dict): Model name -> predicted values
+
+    Returns:
+    tuple: (model names, y as float64 vector, prediction matrix)
+    """
+    names = list(predictions.keys())
+    y = np.asarray(y_true, dtype=np.float64).ravel()
+    preds = np.empty((len(names), len(y)), dtype=np.float64)
+    for i, name in enumerate(names):
+        preds[i] = np.asarray(predictions[name], dtype=np.float64).ravel()
+    return names, y, preds
+
+def compute_metrics(y_true, predictions):
+    """
+    Compute MAE, RMSE and R² for every model in a single vectorized pass
+
+    Parameters:
+    y_true (array-like): Actual target values
+    predictions (dict): Model name -> predicted values
+
+    Returns:
+    pd.DataFrame: One row per model with MAE, RMSE and R2 columns
+    """
+    names, y, preds = _stack_predictions(y_true, predictions)
+
+    errors = preds - y
+    mae = np.abs(errors).mean(axis=1)
+    sse = np.einsum('ij,ij->i', errors, errors)
+    ss_tot = np.sum((y - y.mean()) ** 2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = 1 - sse / ss_tot
+
+    return pd.DataFrame({
+        'MAE': mae,
+        'RMSE': np.sqrt(sse / len(y)),
+        'R2': r2
+    }, index=pd.Index(names, name='Model'))
+
+def distance_band(distance_km):
+    """Bucket route distances (km) into the DISTANCE_BANDS labels"""
+    return pd.cut(pd.Series(distance_km, copy=False), bins=DISTANCE_BANDS,
+                  labels=DISTANCE_BAND_LABELS, right=False)
+
+def build_segments(data):
+    """
+    Collect the standard segment columns available in a flight DataFrame
+
+    Parameters:
+    data (pd.DataFrame): Flight rows aligned with the evaluated predictions
+
+    Returns:
+    dict: Segment name -> label array (aircraft type, distance band, weather category)
+    """
+    segments = {}
+    if 'Model' in data.columns:
+        segments['Aircraft_Type'] = data['Model'].to_numpy()
+    if 'Estimated_Distance_km' in data.columns:
+        segments['Distance_Band'] = distance_band(data['Estimated_Distance_km']).to_numpy()
+    if 'origin_flight_category' in data.columns:
+        segments['Weather_Category'] = data['origin_flight_category'].to_numpy()
+    return segments
+
+def segment_metrics(y_true, predictions, segments):
+    """
+    Compute per-segment MAE, RMSE and R² for every model with grouped reductions
+
+    Each segment is factorized once and all models are reduced together with a single
+    np.bincount over (model, group) codes, so cost stays linear in rows x models.
+
+    Parameters:
+    y_true (array-like): Actual target values
+    predictions (dict): Model name -> predicted values
+    segments (dict): Segment name -> label array aligned with y_true
+
+    Returns:
+    pd.DataFrame: Segment, Value, Model, Count, MAE, RMSE, R2 columns
+    """
+    names, y, preds = _stack_predictions(y_true, predictions)
+    n_models = len(names)
+    errors = preds - y
+    abs_errors = np.abs(errors).ravel()
+    sq_errors = (errors * errors).ravel()
+
+    frames = []
+    for segment_name, labels in segments.items():
+        codes, uniques = pd.factorize(np.asarray(labels), sort=True)
+        n_groups = len(uniques)
+        if n_groups == 0:
+            continue
+        valid = codes >= 0
+
+        count = np.bincount(codes[valid], minlength=n_groups)
+        y_sum = np.bincount(codes[valid], weights=y[valid], minlength=n_groups)
+        y_sq = np.bincount(codes[valid], weights=y[valid] ** 2, minlength=n_groups)
+
+        # Offset group codes per model so one bincount reduces every model at once
+        model_codes = (codes[None, :] + n_groups * np.arange(n_models)[:, None]).ravel()
+        model_valid = np.tile(valid, n_models)
+        size = n_groups * n_models
+        abs_sum = np.bincount(model_codes[model_valid], weights=abs_errors[model_valid], minlength=size)
+        sq_sum = np.bincount(model_codes[model_valid], weights=sq_errors[model_valid], minlength=size)
+        abs_sum = abs_sum.reshape(n_models, n_groups)
+        sq_sum = sq_sum.reshape(n_models, n_groups)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ss_tot = y_sq - y_sum ** 2 / count
+            mae = abs_sum / count
+            rmse = np.sqrt(sq_sum / count)
+            r2 = np.where(ss_tot > 0, 1 - sq_sum / ss_tot, np.nan)
+
+        frames.append(pd.DataFrame({
+            'Segment': segment_name,
+            'Value': np.tile(np.asarray(uniques, dtype=object), n_models),
+            'Model': np.repeat(names, n_groups),
+            'Count': np.tile(count, n_models),
+            'MAE': mae.ravel(),
+            'RMSE': rmse.ravel(),
+            'R2': r2.ravel()
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=['Segment', 'Value', 'Model', 'Count', 'MAE', 'RMSE', 'R2'])
+    result = pd.concat(frames, ignore_index=True)
+    return result[result['Count'] > 0].reset_index(drop=True)
+
+def plot_metric_grid(output_path, model_names, panels, dpi=DEFAULT_DPI):
+    """
+    Draw a grid of bar charts comparing models
+
+    Parameters:
+    output_path (str): Where to save the PNG
+    model_names (list): Bar labels
+    panels (list): Rows of (title, ylabel, values, color) tuples
+    dpi (int): Output resolution
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    n_rows, n_cols = len(panels), max(len(row) for row in panels)
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(6 * n_cols, 6 * n_rows), squeeze=False)
+
+    for r, row in enumerate(panels):
+        for c, (title, ylabel, values, color) in enumerate(row):
+            axes[r, c].bar(model_names, values, color=color)
+            axes[r, c].set_title(title)
+            axes[r, c].set_ylabel(ylabel)
+            axes[r, c].tick_params(axis='x', rotation=45)
+
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return output_path
+
+def plot_metric_table(output_path, results_df, title, dpi=DEFAULT_DPI):
+    """
+    Draw a grouped bar chart of a model x metric results table
+
+    Parameters:
+    output_path (str): Where to save the PNG
+    results_df (pd.DataFrame): Models as rows, metrics as columns
+    title (str): Chart title
+    dpi (int): Output resolution
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    ax = results_df.plot(kind='bar', figsize=(10, 6))
+    ax.set_title(title)
+    ax.set_ylabel('Metric Value')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=dpi)
+    plt.close('all')
+    return output_path
+
+def plot_prediction_vs_actual(output_path, y_true, y_pred, title, r2=None, dpi=DEFAULT_DPI,
+                              density_threshold=DENSITY_PLOT_THRESHOLD, bins=200):
+    """
+    Plot predicted vs actual values, switching to 2-D density bins for large test sets
+
+    Parameters:
+    output_path (str): Where to save the PNG
+    y_true (array-like): Actual values
+    y_pred (array-like): Predicted values
+    title (str): Chart title
+    r2 (float): R² to annotate, if given
+    dpi (int): Output resolution
+    density_threshold (int): Point count above which a binned density is drawn
+    bins (int): Bins per axis for the density plot
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    y_true = np.asarray(y_true, dtype=np.float64).ravel()
+    y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+    lo, hi = float(np.nanmin(y_true)), float(np.nanmax(y_true))
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    if len(y_true) > density_threshold:
+        counts, x_edges, y_edges = np.histogram2d(y_true, y_pred, bins=bins)
+        mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0),
+                             cmap='viridis', norm=LogNorm())
+        fig.colorbar(mesh, ax=ax, label='Flights per bin')
+    else:
+        ax.scatter(y_true, y_pred, alpha=0.6, color='blue')
+    ax.plot([lo, hi], [lo, hi], 'r--', lw=2)
+    ax.set_xlabel('Actual Extra Fuel (kg)')
+    ax.set_ylabel('Predicted Extra Fuel (kg)')
+    ax.set_title(title)
+    ax.grid(True, alpha=0.3)
+
+    if r2 is not None:
+        ax.text(0.05, 0.95, f'R² = {r2:.3f}', transform=ax.transAxes,
+                bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return output_path
+
+def render_figures(jobs, max_workers=None):
+    """
+    Render independent figures in parallel worker processes
+
+    Parameters:
+    jobs (list): (plot function, kwargs) pairs; functions must be module-level
+    max_workers (int): Worker processes (1 renders serially in this process)
+
+    Returns:
+    list: Saved figure paths in job order
+    """
+    if max_workers == 1 or len(jobs) <= 1:
+        return [func(**kwargs) for func, kwargs in jobs]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(func, **kwargs) for func, kwargs in jobs]
+        return [future.result() for future in futures]
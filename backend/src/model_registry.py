@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import threading
+import joblib
+import numpy as np
+import pandas as pd
+
+MODEL_DIR = '/home/ubuntu/models'
+CURRENT_FILE = 'CURRENT'
+BUNDLE_FILE = 'bundle.joblib'
+
+def publish_models(results, scaler, feature_names, feature_medians, model_dir=MODEL_DIR, version=None, extra_models=None,
+                   drift_reference=None, feature_dtype='float64'):
+    """
+    Save trained models as a new version and point CURRENT at it
+
+    Parameters:
+    results (dict): Output of train_weather_enhanced_models (name -> {'model', metrics...})
+    scaler (StandardScaler): Scaler fitted for Linear Regression
+    feature_names (list): Feature column order
+    feature_medians (pd.Series): Training medians used to fill missing features
+    model_dir (str): Registry folder
+    version (str): Version name (defaults to a UTC timestamp)
+    extra_models (dict): Additional servable models (e.g. distilled surrogates), not
+                         considered for best_model
+    drift_reference (FixedBinHistograms): Training feature histograms for drift monitoring
+    feature_dtype (str): Precision the models were trained on; requests are cast to it
+
+    Returns:
+    str: Published version
+    """
+    version = version or time.strftime('%Y%m%d%H%M%S', time.gmtime())
+    version_dir = os.path.join(model_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    best_model = max(results.keys(), key=lambda name: results[name]['test_r2'])
+    bundle = {
+        'version': version,
+        'models': {**{name: result['model'] for name, result in results.items()}, **(extra_models or {})},
+        'scaler': scaler,
+        'feature_names': list(feature_names),
+        'feature_medians': {name: float(value) for name, value in feature_medians.items()},
+        'best_model': best_model,
+        'drift_reference': drift_reference,
+        'feature_dtype': feature_dtype
+    }
+    joblib.dump(bundle, os.path.join(version_dir, BUNDLE_FILE))
+
+    metrics = {name: {k: float(v) for k, v in result.items() if k.startswith(('val_', 'test_')) and np.isscalar(v)}
+               for name, result in results.items()}
+    with open(os.path.join(version_dir, 'metadata.json'), 'w') as f:
+        json.dump({'version': version, 'best_model': best_model, 'metrics': metrics}, f, indent=2)
+
+    # Atomic pointer swap so readers never see a half-written CURRENT
+    tmp_path = os.path.join(model_dir, CURRENT_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(model_dir, CURRENT_FILE))
+
+    print(f"Published model version {version} (best model: {best_model})")
+    return version
+
+def current_version(model_dir=MODEL_DIR):
+    """Version named by CURRENT, or None if nothing has been published"""
+    try:
+        with open(os.path.join(model_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def load_bundle(model_dir=MODEL_DIR, version=None):
+    """Load a published model bundle (the CURRENT one by default)"""
+    version = version or current_version(model_dir)
+    if version is None:
+        raise FileNotFoundError(f"No model version published in {model_dir}")
+    return joblib.load(os.path.join(model_dir, version, BUNDLE_FILE))
+
+def prepare_features(bundle, records):
+    """
+    Build the model feature matrix from request records
+
+    Parameters:
+    bundle (dict): Loaded model bundle
+    records (list or pd.DataFrame): Flight feature records
+
+    Returns:
+    pd.DataFrame: Features in training order with training medians filled in
+    """
+    frame = records if isinstance(records, pd.DataFrame) else pd.DataFrame.from_records(records)
+    X = frame.reindex(columns=bundle['feature_names']).astype(bundle.get('feature_dtype', 'float64'))
+    return X.fillna(bundle['feature_medians'])
+
+def predict_with_bundle(bundle, X, model_name=None):
+    """Predict Extra_Fuel_kg with one model of a bundle (the best model by default)"""
+    model_name = model_name or bundle['best_model']
+    model = bundle['models'][model_name]
+    if model_name == 'Linear Regression':
+        X = bundle['scaler'].transform(X)
+    return model.predict(X)
+
+class ModelRegistry:
+    """
+    Serves the CURRENT model bundle and swaps in newly published versions without downtime
+
+    Each process checks CURRENT at most once per check_interval seconds. A new version is
+    loaded in a background thread while the old one keeps serving, then swapped in with a
+    single reference assignment. Because workers notice the change at different moments,
+    a multi-worker server rolls over to the new version gradually.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, check_interval=5.0):
+        self.model_dir = model_dir
+        self.check_interval = check_interval
+        self.bundle = None
+        self._checked = 0.0
+        self._loading = threading.Lock()
+        # Callables observe(bundle, X) run on every scored feature batch (e.g. drift monitoring)
+        self.feature_observers = []
+
+    @property
+    def version(self):
+        return None if self.bundle is None else self.bundle['version']
+
+    @property
+    def ready(self):
+        return self.bundle is not None
+
+    def load(self):
+        """Load the CURRENT version synchronously (call before forking workers)"""
+        if current_version(self.model_dir) is not None:
+            self.bundle = load_bundle(self.model_dir)
+        self._checked = time.monotonic()
+        return self.bundle
+
+    def _swap_in(self, version):
+        try:
+            self.bundle = load_bundle(self.model_dir, version)
+            print(f"[pid {os.getpid()}] Now serving model version {version}")
+        except Exception as e:
+            print(f"[pid {os.getpid()}] Failed to load model version {version}: {e}")
+        finally:
+            self._loading.release()
+
+    def maybe_reload(self):
+        """Start loading a newly published version in the background, if there is one"""
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return False
+        self._checked = now
+
+        version = current_version(self.model_dir)
+        if version is None or version == self.version or not self._loading.acquire(blocking=False):
+            return False
+        threading.Thread(target=self._swap_in, args=(version,), daemon=True).start()
+        return True
+
+    def _notify(self, bundle, X):
+        for observe in self.feature_observers:
+            observe(bundle, X)
+
+    def predict(self, records, model_name=None):
+        """
+        Score flight records with the currently served bundle
+
+        Returns:
+        tuple: (predictions array, model version)
+        """
+        self.maybe_reload()
+        bundle = self.bundle
+        if bundle is None:
+            raise RuntimeError("No model version is loaded")
+        X = prepare_features(bundle, records)
+        predictions = predict_with_bundle(bundle, X, model_name)
+        self._notify(bundle, X)
+        return predictions, bundle['version']
+
+    def predict_and_explain(self, records, engine, model_name=None, budget_ms=None):
+        """
+        Score flight records and attribute each prediction to the features
+
+        Parameters:
+        engine (ExplanationEngine): Cached attribution engine
+        budget_ms (float): Latency budget for computing uncached explanations
+
+        Returns:
+        tuple: (predictions, contributions (NaN rows when over budget), bias, feature names, version)
+        """
+        self.maybe_reload()
+        bundle = self.bundle
+        if bundle is None:
+            raise RuntimeError("No model version is loaded")
+        X = prepare_features(bundle, records)
+        predictions = predict_with_bundle(bundle, X, model_name)
+        self._notify(bundle, X)
+        contributions, bias = engine.explain(bundle, X, model_name, budget_ms)
+        return predictions, contributions, bias, bundle['feature_names'], bundle['version']
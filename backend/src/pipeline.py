@@ -0,0 +1,367 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = '/home/ubuntu/data'
+STATE_PATH = os.path.join(DATA_DIR, 'pipeline_state.json')
+
+def data(name):
+    return os.path.join(DATA_DIR, name)
+
+SPLIT_FILES = [data(f'{part}_{name}.csv') for name in ('train', 'val', 'test') for part in ('X', 'y')]
+BASELINE_RESULTS = ['model_validation_results.csv', 'model_test_results.csv']
+
+# Every backend/src stage with the files it reads and writes. Relative paths are resolved
+# against the working directory the scripts are run in. Dependencies are derived from
+# these declarations: a stage depends on whichever stage writes one of its inputs.
+# (estimate_fuel.py also applies aircraft_registry.csv when train_weather writes one; that
+# optional input is left undeclared so the graph stays acyclic.)
+STAGES = {
+    'estimate': {
+        'script': 'estimate_fuel.py',
+        'inputs': [data('US_flights_2023.csv'), data('airports_geolocation.csv')],
+        'outputs': [data('estimated_fuel_consumption_sample_100k_new_lookup.csv')]
+    },
+    'eda': {
+        'script': 'eda_script.py',
+        'inputs': [data('estimated_fuel_consumption_sample_100k_new_lookup.csv')],
+        'outputs': ['eda_summary.txt', 'eda_profile.json']
+    },
+    'eda_plots': {
+        'script': 'eda_visualizations.py',
+        'inputs': [data('estimated_fuel_consumption_sample_100k_new_lookup.csv')],
+        'outputs': ['fuel_distribution.png', 'fuel_vs_distance.png', 'fuel_by_aircraft_type.png']
+    },
+    'split': {
+        'script': 'split_dataset.py',
+        'inputs': [data('estimated_fuel_consumption_sample_100k_new_lookup.csv')],
+        'outputs': [data('split_indices.npz')] + SPLIT_FILES
+    },
+    'train': {
+        'script': 'train_models.py',
+        'inputs': SPLIT_FILES,
+        'outputs': BASELINE_RESULTS
+    },
+    'report': {
+        'script': 'model_performance_visualizations.py',
+        'inputs': BASELINE_RESULTS,
+        'outputs': ['model_validation_performance.png', 'model_test_performance.png']
+    },
+    'weather': {
+        # Offline weather integration; integrate_metar.py needs Internet access
+        'script': 'simulate_weather_integration.py',
+        'inputs': [data('US_flights_2023.csv')],
+        'outputs': [data('enhanced_flight_data_with_weather.csv')]
+    },
+    'train_weather': {
+        'script': 'train_weather_enhanced_models.py',
+        'inputs': [data('enhanced_flight_data_with_weather.csv'), data('airports_geolocation.csv')],
+        'outputs': ['/home/ubuntu/weather_enhanced_model_validation_results.csv',
+                    '/home/ubuntu/weather_enhanced_model_test_results.csv',
+                    '/home/ubuntu/weather_enhanced_model_segment_results.csv',
+                    data('aircraft_registry.csv'),
+                    '/home/ubuntu/models/CURRENT',
+                    '/home/ubuntu/report_data/manifest.json']
+    },
+    'route_table': {
+        'script': 'route_fuel_table.py',
+        'inputs': [data('enhanced_flight_data_with_weather.csv'), data('airports_geolocation.csv')],
+        'outputs': [data('route_fuel_baseline.csv')]
+    }
+}
+
+_IMPORT_PATTERN = re.compile(r'^\s*(?:from\s+(\w+)\s+import|import\s+(\w+))', re.MULTILINE)
+
+def code_dependencies(script):
+    """
+    A stage script plus every backend/src module it imports, transitively
+
+    Editing any of them makes the stage stale, just like a changed input file.
+    """
+    pending, found = [script], set()
+    while pending:
+        name = pending.pop()
+        if name in found:
+            continue
+        found.add(name)
+        with open(os.path.join(SCRIPT_DIR, name)) as f:
+            for match in _IMPORT_PATTERN.finditer(f.read()):
+                module = (match.group(1) or match.group(2)) + '.py'
+                if os.path.exists(os.path.join(SCRIPT_DIR, module)):
+                    pending.append(module)
+    return sorted(os.path.join(SCRIPT_DIR, name) for name in found)
+
+def file_digest(path, previous=None):
+    """
+    Fingerprint of a file: size, mtime and SHA-256
+
+    The hash is reused from the previous fingerprint when size and mtime are unchanged,
+    so unchanged inputs cost one stat call; touched-but-identical files still match.
+    """
+    stat = os.stat(path)
+    if previous and previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns:
+        return previous
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+class Pipeline:
+    """
+    DAG of pipeline stages with incremental, parallel execution
+
+    A stage is up to date when all its outputs exist and its inputs and code hash to what
+    they were when it last succeeded (recorded in STATE_PATH). Stale stages run as soon as
+    every upstream stage has finished, up to `jobs` at a time, so independent branches
+    (EDA next to model training, weather training next to the baseline) overlap.
+    """
+
+    def __init__(self, stages=STAGES, workdir='.', state_path=STATE_PATH):
+        self.stages = stages
+        self.workdir = os.path.abspath(workdir)
+        self.state_path = state_path
+        self.state = self._load_state()
+
+        producers = {}
+        for name, stage in stages.items():
+            for path in stage['outputs']:
+                producers[self.resolve(path)] = name
+        self.upstream = {name: sorted({producers[self.resolve(path)] for path in stage['inputs']
+                                       if self.resolve(path) in producers} - {name})
+                         for name, stage in stages.items()}
+        self.order = self._topological_order()
+
+    def resolve(self, path):
+        return path if os.path.isabs(path) else os.path.join(self.workdir, path)
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _topological_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage '{name}'")
+            visiting.add(name)
+            for parent in self.upstream[name]:
+                visit(parent)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def with_upstream(self, targets):
+        """Targets plus everything they depend on, in execution order"""
+        needed, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage '{name}'")
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.upstream[name])
+        return [name for name in self.order if name in needed]
+
+    def _fingerprints(self, name):
+        stage = self.stages[name]
+        previous = self.state.get(name, {}).get('fingerprints', {})
+        paths = [self.resolve(p) for p in stage['inputs']] + code_dependencies(stage['script'])
+        return {path: file_digest(path, previous.get(path)) for path in paths if os.path.exists(path)}
+
+    def is_stale(self, name):
+        """
+        Returns:
+        str: Why the stage must run, or None when it is up to date
+        """
+        stage = self.stages[name]
+        missing = [p for p in stage['inputs'] if not os.path.exists(self.resolve(p))]
+        if missing:
+            return f"missing input {missing[0]}"
+        if any(not os.path.exists(self.resolve(p)) for p in stage['outputs']):
+            return "missing output"
+        recorded = self.state.get(name, {}).get('fingerprints')
+        if recorded is None:
+            return "never run"
+        current = self._fingerprints(name)
+        for path, digest in current.items():
+            if path not in recorded or recorded[path]['sha256'] != digest['sha256']:
+                return f"changed {os.path.basename(path)}"
+        # Remember new mtimes of touched-but-identical files so they are not hashed again
+        self.state[name]['fingerprints'] = current
+        return None
+
+    def _run_stage(self, name):
+        stage = self.stages[name]
+        log_path = os.path.join(self.workdir, f'pipeline_{name}.log')
+        started = time.perf_counter()
+        with open(log_path, 'w') as log:
+            result = subprocess.run([sys.executable, os.path.join(SCRIPT_DIR, stage['script'])],
+                                    cwd=self.workdir, stdout=log, stderr=subprocess.STDOUT)
+        return result.returncode, time.perf_counter() - started, log_path
+
+    def run(self, targets=None, jobs=4, force=False, dry_run=False):
+        """
+        Bring the targets (all stages by default) up to date
+
+        Parameters:
+        targets (list): Stage names; their upstream stages are included
+        jobs (int): Stages allowed to run at the same time
+        force (bool): Run every selected stage even if it is up to date
+        dry_run (bool): Only report what would run (nothing runs and the state file is not written)
+
+        Returns:
+        dict: Stage name -> {'status', 'duration', 'start', 'reason'}
+        """
+        selected = self.with_upstream(targets) if targets else list(self.order)
+        results = {}
+        pending = list(selected)
+        running = {}
+        run_start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            while pending or running:
+                # Start every stage whose upstream stages are settled
+                for name in list(pending):
+                    parents = [p for p in self.upstream[name] if p in selected]
+                    if any(p not in results for p in parents):
+                        continue
+                    pending.remove(name)
+                    if any(results[p]['status'] in ('failed', 'blocked') for p in parents):
+                        results[name] = {'status': 'blocked', 'duration': 0.0, 'start': None, 'reason': 'upstream failed'}
+                        continue
+                    # A stage whose upstream just ran is re-checked against the new outputs; in a
+                    # dry run those outputs are not rebuilt, so it would run after its upstream
+                    rerun = [p for p in parents if results[p]['status'] == 'would run']
+                    if force:
+                        reason = 'forced'
+                    elif dry_run and rerun:
+                        reason = f"upstream {rerun[0]} would run"
+                    else:
+                        reason = self.is_stale(name)
+                    if reason is None:
+                        # Keep the refreshed mtimes of touched-but-identical inputs (not in a dry run)
+                        if not dry_run:
+                            self._save_state()
+                        results[name] = {'status': 'skipped', 'duration': 0.0, 'start': None, 'reason': 'up to date'}
+                    elif dry_run:
+                        results[name] = {'status': 'would run', 'duration': 0.0, 'start': None, 'reason': reason}
+                    elif len(running) < max(1, jobs):
+                        print(f"[pipeline] start {name} ({reason})")
+                        future = executor.submit(self._run_stage, name)
+                        running[future] = (name, reason, time.perf_counter() - run_start)
+                    else:
+                        pending.insert(0, name)
+                        break
+
+                if not running:
+                    if pending and all(any(p not in results for p in self.upstream[n] if p in selected) for n in pending):
+                        raise RuntimeError("Pipeline stalled; check the stage graph")
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, reason, start = running.pop(future)
+                    returncode, duration, log_path = future.result()
+                    if returncode == 0:
+                        self.state[name] = {'fingerprints': self._fingerprints(name), 'duration': duration,
+                                            'finished': time.strftime('%Y-%m-%dT%H:%M:%S')}
+                        self._save_state()
+                        status = 'ran'
+                    else:
+                        status = 'failed'
+                    results[name] = {'status': status, 'duration': duration, 'start': start, 'reason': reason}
+                    print(f"[pipeline] {status} {name} in {duration:.1f}s (log: {log_path})")
+
+        self.wall_clock = time.perf_counter() - run_start
+        return results
+
+    def critical_path(self, durations):
+        """
+        Longest dependency chain under the given stage durations
+
+        Returns:
+        tuple: (stage names along the chain, total seconds)
+        """
+        finish, previous = {}, {}
+        for name in self.order:
+            if name not in durations:
+                continue
+            parents = [p for p in self.upstream[name] if p in durations]
+            best = max(parents, key=lambda p: finish[p], default=None)
+            finish[name] = durations[name] + (finish[best] if best else 0.0)
+            previous[name] = best
+        if not finish:
+            return [], 0.0
+        name = max(finish, key=finish.get)
+        total = finish[name]
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return path[::-1], total
+
+def print_report(pipeline, results):
+    print(f"\n{'Stage':<15} {'Status':<10} {'Start (s)':>10} {'Duration (s)':>13}  Reason")
+    for name in pipeline.order:
+        if name not in results:
+            continue
+        r = results[name]
+        start = '' if r['start'] is None else f"{r['start']:.1f}"
+        print(f"{name:<15} {r['status']:<10} {start:>10} {r['duration']:>13.1f}  {r['reason']}")
+
+    ran = {name: r['duration'] for name, r in results.items() if r['status'] == 'ran'}
+    if ran:
+        path, total = pipeline.critical_path(ran)
+        print(f"\nCritical path of this run: {' -> '.join(path)} ({total:.1f}s); "
+              f"wall clock {pipeline.wall_clock:.1f}s, serial sum {sum(ran.values()):.1f}s")
+
+    # Full-refresh estimate from the last recorded duration of every selected stage
+    recorded = {name: pipeline.state[name]['duration'] for name in results if name in pipeline.state}
+    if recorded:
+        path, total = pipeline.critical_path(recorded)
+        print(f"Full refresh critical path: {' -> '.join(path)} ({total:.1f}s of {sum(recorded.values()):.1f}s total work)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the pipeline stages that are out of date, in parallel where possible")
+    parser.add_argument('targets', nargs='*', help="Stages to bring up to date (default: all)")
+    parser.add_argument('--jobs', type=int, default=4, help="Stages to run concurrently")
+    parser.add_argument('--force', action='store_true', help="Run the selected stages even if up to date")
+    parser.add_argument('--dry-run', action='store_true', help="Show what would run")
+    parser.add_argument('--workdir', default='.', help="Working directory for scripts with relative outputs")
+    parser.add_argument('--graph', action='store_true', help="Print the stage dependencies and exit")
+    args = parser.parse_args()
+
+    pipeline = Pipeline(workdir=args.workdir)
+    if args.graph:
+        for name in pipeline.order:
+            print(f"{name:<15} <- {', '.join(pipeline.upstream[name]) or '(source data)'}")
+        sys.exit(0)
+
+    results = pipeline.run(args.targets or None, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+    print_report(pipeline, results)
+    sys.exit(1 if any(r['status'] in ('failed', 'blocked') for r in results.values()) else 0)
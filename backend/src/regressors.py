@@ -0,0 +1,29 @@
+# Regressors compared by training (train_weather_enhanced_models.py) and cross-validation
+REGRESSOR_NAMES = ['Linear Regression', 'Random Forest', 'XGBoost', 'LightGBM']
+
+def build_regressor(name, n_jobs=None):
+    """
+    Untrained instance of one of the compared regressors
+
+    Parameters:
+    name (str): One of REGRESSOR_NAMES
+    n_jobs (int): Threads the model may use (default: the library default)
+
+    Returns:
+    Estimator with fit/predict
+    """
+    # Model libraries are imported here so importing this module stays cheap
+    threads = {} if n_jobs is None else {'n_jobs': n_jobs}
+    if name == 'Linear Regression':
+        from sklearn.linear_model import LinearRegression
+        return LinearRegression()
+    if name == 'Random Forest':
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(n_estimators=100, random_state=42, **threads)
+    if name == 'XGBoost':
+        import xgboost as xgb
+        return xgb.XGBRegressor(n_estimators=100, random_state=42, **threads)
+    if name == 'LightGBM':
+        import lightgbm as lgb
+        return lgb.LGBMRegressor(n_estimators=100, random_state=42, verbose=-1, **threads)
+    raise ValueError(f"Unknown model: {name}")
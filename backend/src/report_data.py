@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Compact JSON aggregates behind /api/report/<name> (main.py), rewritten after every training run
+REPORT_DATA_DIR = '/home/ubuntu/report_data'
+MANIFEST_NAME = 'manifest'
+PREDICTION_BINS = 40   # cells per axis of the binned prediction-vs-actual grid
+HISTOGRAM_BINS = 30    # bins of the extra-fuel distribution
+TOP_FEATURES = 15
+
+def _plain(value):
+    """Make numpy scalars and arrays JSON serialisable (NaN and inf become null)"""
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_plain(v) for v in value]
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, (float, np.floating)):
+        # Six significant digits is far beyond what the report displays
+        return float(f'{value:.6g}') if np.isfinite(value) else None
+    return value
+
+def write_report_file(name, payload, output_dir=REPORT_DATA_DIR):
+    """
+    Write one aggregate as <name>.json, atomically so the server never reads half a file
+
+    Returns:
+    str: SHA-256 prefix of the written body (changes whenever the data does)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    body = json.dumps(_plain(payload), separators=(',', ':')).encode('utf-8')
+    tmp_path = os.path.join(output_dir, name + '.json.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, os.path.join(output_dir, name + '.json'))
+    return hashlib.sha256(body).hexdigest()[:16]
+
+def summary_aggregates(data, bins=HISTOGRAM_BINS):
+    """
+    Dataset-level numbers: flights, airports, average baseline and extra fuel, and the
+    extra-fuel distribution as a histogram
+    """
+    extra = data['Extra_Fuel_kg'].dropna().to_numpy(dtype=np.float64)
+    baseline = data['Baseline_Fuel_kg'].dropna().to_numpy(dtype=np.float64)
+    counts, edges = np.histogram(extra, bins=bins) if len(extra) else (np.array([]), np.array([]))
+    airports = pd.unique(pd.concat([data['Dep_Airport'], data['Arr_Airport']]).dropna())
+    dates = pd.to_datetime(data['FlightDate'], errors='coerce') if 'FlightDate' in data.columns else pd.Series(dtype='datetime64[ns]')
+    return {
+        'flights': len(data),
+        'airports': len(airports),
+        'aircraft_types': data['Model'].nunique() if 'Model' in data.columns else None,
+        'first_date': dates.min().strftime('%Y-%m-%d') if dates.notna().any() else None,
+        'last_date': dates.max().strftime('%Y-%m-%d') if dates.notna().any() else None,
+        'mean_baseline_fuel_kg': baseline.mean() if len(baseline) else None,
+        'mean_extra_fuel_kg': extra.mean() if len(extra) else None,
+        'min_extra_fuel_kg': extra.min() if len(extra) else None,
+        'max_extra_fuel_kg': extra.max() if len(extra) else None,
+        'mean_extra_fuel_pct': extra.mean() / baseline.mean() * 100 if len(extra) and len(baseline) else None,
+        'extra_fuel_histogram': {'edges': edges, 'counts': counts}
+    }
+
+def metrics_aggregates(results, model_version=None):
+    """Validation and test MAE/RMSE/R² of every model, best model first"""
+    best_model = max(results.keys(), key=lambda name: results[name]['test_r2'])
+    order = sorted(results.keys(), key=lambda name: -results[name]['test_r2'])
+    return {
+        'model_version': model_version,
+        'best_model': best_model,
+        'models': [{
+            'model': name,
+            'validation': {'MAE': results[name]['val_mae'], 'RMSE': results[name]['val_rmse'], 'R2': results[name]['val_r2']},
+            'test': {'MAE': results[name]['test_mae'], 'RMSE': results[name]['test_rmse'], 'R2': results[name]['test_r2']}
+        } for name in order]
+    }
+
+def feature_importance_aggregates(rf_importance, shap_importance=None, top=TOP_FEATURES):
+    """
+    Top features by Random Forest impurity importance (as a share of the total) and, when
+    available, by the best model's mean |contribution| in kg
+    """
+    shares = rf_importance['importance'] / rf_importance['importance'].sum()
+    payload = {
+        'random_forest': [{'feature': feature, 'share': share}
+                          for feature, share in zip(rf_importance['feature'].head(top), shares.head(top))]
+    }
+    if shap_importance is not None:
+        payload['contributions'] = [{'feature': feature, 'mean_abs_kg': value} for feature, value in
+                                    zip(shap_importance['feature'].head(top), shap_importance['mean_abs_contribution'].head(top))]
+    return payload
+
+def prediction_vs_actual_aggregates(y_true, y_pred, model_name, bins=PREDICTION_BINS):
+    """
+    Prediction vs actual as a sparse 2D histogram plus the mean prediction per actual bin
+
+    A few hundred cells describe the same picture as a scatter of the whole test set.
+
+    Returns:
+    dict: Axis range, non-empty cells as [actual bin, predicted bin, count] and the
+          calibration curve (mean actual, mean predicted, count per actual bin)
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    low = float(min(y_true.min(), y_pred.min()))
+    high = float(max(y_true.max(), y_pred.max()))
+    width = (high - low) / bins or 1.0
+
+    actual_bin = np.clip(((y_true - low) / width).astype(np.int64), 0, bins - 1)
+    predicted_bin = np.clip(((y_pred - low) / width).astype(np.int64), 0, bins - 1)
+    counts = np.bincount(actual_bin * bins + predicted_bin, minlength=bins * bins).reshape(bins, bins)
+    cells = np.argwhere(counts > 0)
+
+    per_bin = np.bincount(actual_bin, minlength=bins)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_actual = np.bincount(actual_bin, weights=y_true, minlength=bins) / per_bin
+        mean_predicted = np.bincount(actual_bin, weights=y_pred, minlength=bins) / per_bin
+    filled = per_bin > 0
+    residuals = y_pred - y_true
+    return {
+        'model': model_name,
+        'rows': len(y_true),
+        'range': [low, high],
+        'bins': bins,
+        'cells': np.column_stack([cells, counts[cells[:, 0], cells[:, 1]]]),
+        'calibration': np.column_stack([mean_actual[filled], mean_predicted[filled], per_bin[filled]]),
+        'MAE': np.abs(residuals).mean(),
+        'R2': 1 - (residuals ** 2).sum() / ((y_true - y_true.mean()) ** 2).sum()
+    }
+
+def aircraft_aggregates(data, segment_results=None, best_model=None):
+    """
+    Per-aircraft-type fuel summary (most flown types first), with the best model's test
+    error per type when segment results are given
+    """
+    frame = data.assign(Estimated_Distance_km=data.get('Estimated_Distance_km', np.nan))
+    grouped = frame.groupby('Model', observed=True)
+    summary = pd.DataFrame({
+        'flights': grouped.size(),
+        'mean_distance_km': grouped['Estimated_Distance_km'].mean(),
+        'mean_fuel_rate_kg_per_hour': grouped['Fuel_Rate_kg_per_hour'].mean(),
+        'mean_baseline_fuel_kg': grouped['Baseline_Fuel_kg'].mean(),
+        'mean_extra_fuel_kg': grouped['Extra_Fuel_kg'].mean(),
+        'p90_extra_fuel_kg': grouped['Extra_Fuel_kg'].quantile(0.9)
+    }).sort_values('flights', ascending=False)
+
+    if segment_results is not None and best_model is not None:
+        errors = segment_results[(segment_results['Segment'] == 'Aircraft_Type') & (segment_results['Model'] == best_model)]
+        errors = errors.set_index('Value')
+        summary['test_flights'] = errors['Count'].reindex(summary.index)
+        summary['test_mae_kg'] = errors['MAE'].reindex(summary.index)
+
+    return {'model': best_model,
+            'aircraft': [{'aircraft_type': aircraft_type, **row} for aircraft_type, row in summary.to_dict('index').items()]}
+
+def publish_report_data(data, results, rf_importance, y_test, model_version=None, shap_importance=None,
+                        segment_results=None, output_dir=REPORT_DATA_DIR):
+    """
+    Write every report aggregate and then the manifest the frontend polls for changes
+
+    Parameters:
+    data (pd.DataFrame): Prepared flight data (prepare_enhanced_data_for_modeling)
+    results (dict): Output of train_weather_enhanced_models
+    rf_importance (pd.DataFrame): feature/importance of the Random Forest
+    y_test (pd.Series): Test target aligned with the models' test_pred
+    model_version (str): Published model version
+    shap_importance (pd.DataFrame): Optional feature/mean_abs_contribution of the best model
+    segment_results (pd.DataFrame): Optional segment_metrics output for the test set
+    output_dir (str): Folder served by /api/report
+
+    Returns:
+    dict: The manifest (version, generation time and a digest per aggregate)
+    """
+    best_model = max(results.keys(), key=lambda name: results[name]['test_r2'])
+    aggregates = {
+        'summary': summary_aggregates(data),
+        'metrics': metrics_aggregates(results, model_version),
+        'feature_importance': feature_importance_aggregates(rf_importance, shap_importance),
+        'prediction_vs_actual': prediction_vs_actual_aggregates(y_test, results[best_model]['test_pred'], best_model),
+        'aircraft': aircraft_aggregates(data, segment_results, best_model)
+    }
+    digests = {name: write_report_file(name, payload, output_dir) for name, payload in aggregates.items()}
+
+    manifest = {
+        'model_version': model_version,
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'files': digests
+    }
+    write_report_file(MANIFEST_NAME, manifest, output_dir)
+    sizes = {name: os.path.getsize(os.path.join(output_dir, name + '.json')) for name in digests}
+    print(f"Report data written to {output_dir} ({sum(sizes.values()) / 1024:.1f} KB in {len(sizes)} files)")
+    return manifest
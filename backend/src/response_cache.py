@@ -0,0 +1,187 @@
+import os
+import gzip
+import time
+import hashlib
+import mimetypes
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from flask import request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip variants are always produced
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+# A compressed variant is only kept if it saves at least this fraction (PNGs rarely do)
+MIN_COMPRESSION_SAVING = 0.05
+
+class CachedAsset:
+    """
+    A response body held in memory with its validators and precompressed variants
+    """
+
+    def __init__(self, body, mimetype, last_modified, max_age):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.body = body
+        self.mimetype = mimetype
+        self.last_modified = int(last_modified)
+        self.max_age = max_age
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.variants = {}
+
+        if len(body) >= MIN_COMPRESS_SIZE:
+            candidates = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                candidates['br'] = brotli.compress(body, quality=11)
+            for encoding, compressed in candidates.items():
+                if len(compressed) <= len(body) * (1 - MIN_COMPRESSION_SAVING):
+                    self.variants[encoding] = compressed
+
+    def etag_for(self, encoding):
+        """Strong ETag per representation: the compressed bytes differ, so must the tag"""
+        return self.etag if encoding is None else self.etag[:-1] + '-' + encoding + '"'
+
+def _pick_encoding(asset, accept_encoding):
+    """Choose br over gzip when both the client and the cache have them"""
+    accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+    for encoding in ('br', 'gzip'):
+        if encoding in asset.variants and encoding in accepted:
+            return encoding
+    return None
+
+def _not_modified(asset):
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against the cached asset"""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        tags = {tag.strip() for tag in if_none_match.split(',')}
+        if '*' in tags:
+            return True
+        known = {asset.etag_for(encoding) for encoding in [None, *asset.variants]}
+        return bool(tags & known)
+
+    if_modified_since = request.headers.get('If-Modified-Since')
+    if if_modified_since:
+        try:
+            return asset.last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def cached_response(asset):
+    """
+    Build a Flask response for a cached asset: 304 when the client copy is current,
+    otherwise the best precompressed variant the client accepts
+    """
+    encoding = _pick_encoding(asset, request.headers.get('Accept-Encoding', ''))
+    headers = {
+        'ETag': asset.etag_for(encoding),
+        'Last-Modified': formatdate(asset.last_modified, usegmt=True),
+        'Cache-Control': f'public, max-age={asset.max_age}',
+        'Vary': 'Accept-Encoding'
+    }
+
+    if _not_modified(asset):
+        return Response(status=304, headers=headers)
+
+    body = asset.body if encoding is None else asset.variants[encoding]
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    return Response(body, mimetype=asset.mimetype, headers=headers)
+
+class ResponseCache:
+    """
+    In-memory cache of rendered pages and static files, invalidated by source mtimes
+
+    Sources are re-stat'ed at most once per check_interval seconds, so a hot page costs a
+    dict lookup rather than a template render plus compression.
+    """
+
+    def __init__(self, template_dir, check_interval=1.0, page_max_age=60, file_max_age=3600):
+        self.template_dir = template_dir
+        self.check_interval = check_interval
+        self.page_max_age = page_max_age
+        self.file_max_age = file_max_age
+        self._pages = {}
+        self._files = {}
+        self._lock = threading.Lock()
+        self._template_version = None
+        self._template_checked = 0.0
+
+    def _templates_version(self):
+        """Newest mtime under the template folder (covers includes and base templates)"""
+        now = time.monotonic()
+        if self._template_version is not None and now - self._template_checked < self.check_interval:
+            return self._template_version
+
+        newest = 0.0
+        if os.path.isdir(self.template_dir):
+            for root, _, files in os.walk(self.template_dir):
+                for name in files:
+                    newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+        self._template_version = newest
+        self._template_checked = now
+        return newest
+
+    def page(self, name, render):
+        """
+        Return the cached rendering of a template, re-rendering when any template changed
+
+        Parameters:
+        name (str): Cache key (normally the template name)
+        render (callable): Renders the page to a string
+
+        Returns:
+        CachedAsset: Cached page
+        """
+        version = self._templates_version()
+        entry = self._pages.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with self._lock:
+            entry = self._pages.get(name)
+            if entry is None or entry[0] != version:
+                asset = CachedAsset(render(), 'text/html', version or time.time(), self.page_max_age)
+                entry = (version, asset)
+                self._pages[name] = entry
+        return entry[1]
+
+    def file(self, path):
+        """
+        Return a cached static file with precompressed variants, reloading it when it changes
+
+        Parameters:
+        path (str): Absolute file path (caller is responsible for keeping it inside a safe folder)
+
+        Returns:
+        CachedAsset: Cached file
+        """
+        now = time.monotonic()
+        entry = self._files.get(path)
+        if entry is not None and now - entry[1] < self.check_interval:
+            return entry[2]
+
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is None or entry[0] != mtime:
+                with open(path, 'rb') as f:
+                    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+                    asset = CachedAsset(f.read(), mimetype, mtime, self.file_max_age)
+            else:
+                asset = entry[2]
+            self._files[path] = (mtime, now, asset)
+        return asset
+
+    def warm_files(self, directory):
+        """Load and precompress every file in a folder ahead of the first request"""
+        if not os.path.isdir(directory):
+            return 0
+        names = [n for n in os.listdir(directory) if os.path.isfile(os.path.join(directory, n))]
+        for name in names:
+            self.file(os.path.join(directory, name))
+        return len(names)
@@ -0,0 +1,213 @@
+import os
+import pandas as pd
+import numpy as np
+from fuel_rates import add_baseline_fuel, baseline_phase_model
+from flight_store import FlightStore, route_distances_km
+from aircraft_registry import AircraftRegistry, REGISTRY_PATH
+
+KEY_COLUMNS = ['Dep_Airport', 'Arr_Airport', 'Model', 'Month']
+METRICS = ['Baseline_Fuel_kg', 'Estimated_Distance_km', 'Flight_Duration']
+STAT_SUFFIXES = ['count', 'sum', 'sumsq', 'min', 'max']
+
+ROUTE_TABLE_PATH = '/home/ubuntu/data/route_fuel_baseline.csv'
+
+def aggregate_flights(flights):
+    """
+    Aggregate flights into mergeable per-(route, aircraft type, month) statistics
+
+    Counts, sums, sums of squares, minima and maxima are stored instead of means so
+    that a new batch of flights can be folded in without rescanning old data.
+
+    Parameters:
+    flights (pd.DataFrame): Flights with FlightDate, Dep_Airport, Arr_Airport, Model,
+                            Flight_Duration and optionally Baseline_Fuel_kg / Estimated_Distance_km
+                            (the training phase-of-flight baseline is computed when missing)
+
+    Returns:
+    pd.DataFrame: One row per key with <metric>_count/_sum/_sumsq/_min/_max and Last_FlightDate
+    """
+    if 'Baseline_Fuel_kg' not in flights.columns:
+        flights = add_baseline_fuel(flights.copy(), phase_model=baseline_phase_model())
+
+    dates = pd.to_datetime(flights['FlightDate'])
+    data = pd.DataFrame({
+        'Dep_Airport': flights['Dep_Airport'],
+        'Arr_Airport': flights['Arr_Airport'],
+        'Model': flights['Model'],
+        'Month': dates.dt.month,
+        'Last_FlightDate': dates
+    })
+    for metric in METRICS:
+        values = flights[metric] if metric in flights.columns else np.nan
+        data[metric] = values
+        data[f'{metric}_sq'] = data[metric] ** 2
+
+    named_aggs = {'Last_FlightDate': ('Last_FlightDate', 'max')}
+    for metric in METRICS:
+        named_aggs.update({
+            f'{metric}_count': (metric, 'count'),
+            f'{metric}_sum': (metric, 'sum'),
+            f'{metric}_sumsq': (f'{metric}_sq', 'sum'),
+            f'{metric}_min': (metric, 'min'),
+            f'{metric}_max': (metric, 'max')
+        })
+
+    return data.groupby(KEY_COLUMNS, sort=False, dropna=False).agg(**named_aggs).reset_index()
+
+def merge_aggregates(*aggregates, keys=KEY_COLUMNS):
+    """
+    Combine aggregate tables produced by aggregate_flights (same or coarser keys)
+
+    Returns:
+    pd.DataFrame: Merged statistics, one row per key
+    """
+    combined = pd.concat(aggregates, ignore_index=True)
+    named_aggs = {'Last_FlightDate': ('Last_FlightDate', 'max')}
+    for metric in METRICS:
+        for stat in STAT_SUFFIXES:
+            column = f'{metric}_{stat}'
+            reducer = stat if stat in ('min', 'max') else 'sum'
+            named_aggs[column] = (column, reducer)
+    return combined.groupby(keys, sort=False, dropna=False).agg(**named_aggs).reset_index()
+
+def _summarize(aggregates):
+    """Turn mergeable sums into mean/std columns (vectorized over all keys)"""
+    summary = pd.DataFrame({'flights': aggregates['Baseline_Fuel_kg_count'].to_numpy()})
+    for metric in METRICS:
+        count = aggregates[f'{metric}_count'].to_numpy(dtype=np.float64)
+        total = aggregates[f'{metric}_sum'].to_numpy(dtype=np.float64)
+        sumsq = aggregates[f'{metric}_sumsq'].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / count
+            variance = np.where(count > 1, (sumsq - count * mean ** 2) / (count - 1), np.nan)
+        summary[f'{metric}_mean'] = mean
+        summary[f'{metric}_std'] = np.sqrt(np.clip(variance, 0, None))
+        summary[f'{metric}_min'] = aggregates[f'{metric}_min'].to_numpy()
+        summary[f'{metric}_max'] = aggregates[f'{metric}_max'].to_numpy()
+    return summary
+
+class RouteFuelTable:
+    """
+    Materialized baseline fuel statistics keyed by (route, aircraft type, month)
+
+    Lookups are plain dict accesses on prebuilt summaries, so answering a what-if
+    question never touches flight-level data.
+    """
+
+    def __init__(self, aggregates=None):
+        self.aggregates = aggregates if aggregates is not None else aggregate_flights(
+            pd.DataFrame(columns=['FlightDate', 'Dep_Airport', 'Arr_Airport', 'Model', 'Flight_Duration']))
+        self._build_index()
+
+    @classmethod
+    def from_flights(cls, flights):
+        """Build the table from scratch from flight-level data"""
+        return cls(aggregate_flights(flights))
+
+    @classmethod
+    def load(cls, path=ROUTE_TABLE_PATH):
+        """Load a table saved with save()"""
+        aggregates = pd.read_csv(path, parse_dates=['Last_FlightDate'])
+        return cls(aggregates)
+
+    def save(self, path=ROUTE_TABLE_PATH):
+        """Write the aggregates atomically, so the server never loads a half-written table"""
+        tmp_path = path + '.tmp'
+        self.aggregates.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    @property
+    def last_flight_date(self):
+        """Latest FlightDate folded into the table (NaT if empty)"""
+        return self.aggregates['Last_FlightDate'].max()
+
+    def refresh(self, flights, only_new=True):
+        """
+        Fold a batch of flights into the table incrementally
+
+        Parameters:
+        flights (pd.DataFrame): New flight-level data
+        only_new (bool): Skip flights on or before last_flight_date, so re-running on a growing
+                         file is safe; batches are expected to contain whole days
+
+        Returns:
+        int: Number of flights added
+        """
+        if only_new and pd.notna(self.last_flight_date):
+            flights = flights[pd.to_datetime(flights['FlightDate']) > self.last_flight_date]
+        if len(flights) == 0:
+            return 0
+
+        self.aggregates = merge_aggregates(self.aggregates, aggregate_flights(flights))
+        self._build_index()
+        return len(flights)
+
+    def _build_index(self):
+        """Precompute per-month and all-months summaries as dicts for O(1) lookup"""
+        def index(aggregates, keys):
+            summary = _summarize(aggregates)
+            key_tuples = zip(*(aggregates[k].tolist() for k in keys))
+            return dict(zip(key_tuples, summary.to_dict('records')))
+
+        self._by_month = index(self.aggregates, KEY_COLUMNS)
+        all_months = merge_aggregates(self.aggregates, keys=KEY_COLUMNS[:-1]) if len(self.aggregates) else self.aggregates
+        self._all_months = index(all_months, KEY_COLUMNS[:-1])
+
+    def lookup(self, dep_airport, arr_airport, aircraft_type, month=None):
+        """
+        Baseline fuel, distance and duration statistics for a route and aircraft type
+
+        Parameters:
+        dep_airport (str): Departure airport code
+        arr_airport (str): Arrival airport code
+        aircraft_type (str): Aircraft model as it appears in the flight data
+        month (int): Month number (1-12); None aggregates across all months
+
+        Returns:
+        dict: flights and <metric>_mean/_std/_min/_max entries, or None if never flown
+        """
+        if month is None:
+            return self._all_months.get((dep_airport, arr_airport, aircraft_type))
+        return self._by_month.get((dep_airport, arr_airport, aircraft_type, int(month)))
+
+    def estimate_baseline_fuel(self, dep_airport, arr_airport, aircraft_type, month=None):
+        """
+        Expected baseline fuel (kg), falling back to all months when the month is unseen
+
+        Returns:
+        float: Mean baseline fuel, or None if the route/type was never flown
+        """
+        stats = self.lookup(dep_airport, arr_airport, aircraft_type, month)
+        if stats is None and month is not None:
+            stats = self.lookup(dep_airport, arr_airport, aircraft_type)
+        return None if stats is None else stats['Baseline_Fuel_kg_mean']
+
+    def __len__(self):
+        return len(self._by_month)
+
+if __name__ == "__main__":
+    # Build or incrementally refresh the table from the enhanced flight data
+    flights_path = '/home/ubuntu/data/enhanced_flight_data_with_weather.csv'
+    flights = pd.read_csv(flights_path)
+    
+    # The enhanced data carries no distance column: compute the great-circle distance once
+    # per distinct route (NaN where an airport has no coordinates)
+    airports_df = pd.read_csv('/home/ubuntu/data/airports_geolocation.csv')
+    route_store = FlightStore.from_frame(flights[['Dep_Airport', 'Arr_Airport']])
+    flights['Estimated_Distance_km'] = route_distances_km(route_store, airports_df)
+    
+    # Same baseline as training: phase-of-flight fuel, with the per-airframe fuel-flow factors
+    # of the tail-number registry when train_weather_enhanced_models.py has written one
+    registry = AircraftRegistry.load(REGISTRY_PATH) if os.path.exists(REGISTRY_PATH) else None
+    flights = add_baseline_fuel(flights, registry, baseline_phase_model())
+
+    try:
+        table = RouteFuelTable.load()
+        added = table.refresh(flights)
+        print(f"Refreshed route fuel table with {added} new flights")
+    except FileNotFoundError:
+        table = RouteFuelTable.from_flights(flights)
+        print(f"Built route fuel table from {len(flights)} flights")
+
+    table.save()
+    print(f"Saved {len(table)} (route, aircraft type, month) entries to {ROUTE_TABLE_PATH}")
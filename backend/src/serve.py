@@ -0,0 +1,86 @@
+import os
+import argparse
+import multiprocessing
+
+def run_gunicorn(app, bind, workers, threads, timeout, graceful_timeout):
+    """
+    Serve with gunicorn's pre-fork worker pool (Linux/macOS)
+
+    preload_app makes the master import main.py and warm every cache before forking,
+    so workers share templates, figures and models copy-on-write. `kill -HUP <master>`
+    replaces workers one by one without dropping connections.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class PreloadedApplication(BaseApplication):
+        def load_config(self):
+            options = {
+                'bind': bind,
+                'workers': workers,
+                'threads': threads,
+                'worker_class': 'gthread' if threads > 1 else 'sync',
+                'preload_app': True,
+                'timeout': timeout,
+                'graceful_timeout': graceful_timeout,
+                'keepalive': 5
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    PreloadedApplication().run()
+
+def run_waitress(app, bind, threads):
+    """Serve with waitress' thread pool (works on Windows, single process)"""
+    from waitress import serve
+
+    host, port = bind.rsplit(':', 1)
+    serve(app, host=host, port=int(port), threads=threads)
+
+def run_werkzeug(app, bind, workers, threads):
+    """Fallback when neither gunicorn nor waitress is installed"""
+    host, port = bind.rsplit(':', 1)
+    if workers > 1 and os.name != 'nt':
+        app.run(host=host, port=int(port), threaded=False, processes=workers)
+    else:
+        app.run(host=host, port=int(port), threaded=threads > 1)
+
+def pick_server(requested):
+    """Resolve 'auto' to the best server available on this platform"""
+    if requested != 'auto':
+        return requested
+    candidates = ['waitress'] if os.name == 'nt' else ['gunicorn', 'waitress']
+    for name in candidates:
+        try:
+            __import__(name)
+            return name
+        except ImportError:
+            continue
+    return 'werkzeug'
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Production server for the fuel prediction app")
+    parser.add_argument('--bind', default='0.0.0.0:5000')
+    parser.add_argument('--workers', type=int, default=max(2, multiprocessing.cpu_count()),
+                        help="Worker processes (gunicorn/werkzeug)")
+    parser.add_argument('--threads', type=int, default=4, help="Threads per worker")
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'waitress', 'werkzeug'], default='auto')
+    parser.add_argument('--timeout', type=int, default=30)
+    parser.add_argument('--graceful-timeout', type=int, default=30)
+    args = parser.parse_args()
+
+    # Import and warm everything once, before any worker is forked
+    from main import app, warm_caches
+    warm_caches()
+
+    server = pick_server(args.server)
+    print(f"Serving on {args.bind} with {server} ({args.workers} workers x {args.threads} threads)")
+
+    if server == 'gunicorn':
+        run_gunicorn(app, args.bind, args.workers, args.threads, args.timeout, args.graceful_timeout)
+    elif server == 'waitress':
+        run_waitress(app, args.bind, args.workers * args.threads)
+    else:
+        run_werkzeug(app, args.bind, args.workers, args.threads)
@@ -3,6 +3,110 @@ import numpy as np
 from datetime import datetime, timedelta
 import random
 
+# Realistic weather parameter ranges of each simulated scenario
+WEATHER_SCENARIOS = {
+    'clear': {
+        'temp_range': (15, 25),
+        'wind_speed_range': (5, 15),
+        'visibility_range': (8, 10),
+        'present_weather': '',
+        'flight_category': 'VFR'
+    },
+    'cloudy': {
+        'temp_range': (10, 20),
+        'wind_speed_range': (8, 20),
+        'visibility_range': (5, 8),
+        'present_weather': 'BKN',
+        'flight_category': 'MVFR'
+    },
+    'rainy': {
+        'temp_range': (8, 18),
+        'wind_speed_range': (12, 25),
+        'visibility_range': (2, 6),
+        'present_weather': 'RA',
+        'flight_category': 'IFR'
+    },
+    'stormy': {
+        'temp_range': (5, 15),
+        'wind_speed_range': (20, 35),
+        'visibility_range': (0.5, 3),
+        'present_weather': 'TSRA',
+        'flight_category': 'LIFR'
+    }
+}
+
+# Flight category impact (convert to numeric)
+FLIGHT_CATEGORY_IMPACT = {
+    'VFR': 0,    # Visual Flight Rules - best conditions
+    'MVFR': 1,   # Marginal VFR - moderate impact
+    'IFR': 2,    # Instrument Flight Rules - significant impact
+    'LIFR': 3    # Low IFR - highest impact
+}
+
+def weather_impact_features(origin, dest):
+    """
+    Weather-derived features from origin and destination observations
+    
+    Works on aligned arrays of any shape, so the same formulas serve one merged table of
+    flights and a whole tensor of simulated scenarios.
+    
+    Parameters:
+    origin (dict): Origin arrays: temperature_c, wind_speed_kt, visibility_sm,
+                   sea_level_pressure_mb, flight_category_impact and has_present_weather
+    dest (dict): The same arrays at the destination
+    
+    Returns:
+    dict: Feature name -> array
+    """
+    def filled(values, default):
+        values = np.asarray(values, dtype=np.float64)
+        return np.where(np.isnan(values), default, values)
+    
+    features = {}
+    
+    # Temperature difference
+    features['temp_diff_c'] = np.asarray(dest['temperature_c'], dtype=np.float64) - np.asarray(origin['temperature_c'], dtype=np.float64)
+    
+    # Wind impact factors
+    features['origin_wind_impact'] = filled(origin['wind_speed_kt'], 0)
+    features['dest_wind_impact'] = filled(dest['wind_speed_kt'], 0)
+    features['avg_wind_impact'] = (features['origin_wind_impact'] + features['dest_wind_impact']) / 2
+    
+    # Visibility impact (lower visibility = higher impact)
+    features['origin_visibility_impact'] = 10 - filled(origin['visibility_sm'], 10)
+    features['dest_visibility_impact'] = 10 - filled(dest['visibility_sm'], 10)
+    features['avg_visibility_impact'] = (features['origin_visibility_impact'] + features['dest_visibility_impact']) / 2
+    
+    # Weather severity scores
+    features['origin_weather_severity'] = (
+        features['origin_wind_impact'] * 0.3 +
+        features['origin_visibility_impact'] * 0.4 +
+        np.asarray(origin['has_present_weather'], dtype=np.float64) * 0.3
+    )
+    features['dest_weather_severity'] = (
+        features['dest_wind_impact'] * 0.3 +
+        features['dest_visibility_impact'] * 0.4 +
+        np.asarray(dest['has_present_weather'], dtype=np.float64) * 0.3
+    )
+    features['total_weather_impact'] = features['origin_weather_severity'] + features['dest_weather_severity']
+    
+    features['origin_flight_category_impact'] = filled(origin['flight_category_impact'], 0)
+    features['dest_flight_category_impact'] = filled(dest['flight_category_impact'], 0)
+    features['avg_flight_category_impact'] = (features['origin_flight_category_impact'] + features['dest_flight_category_impact']) / 2
+    
+    # Pressure difference (can affect fuel efficiency)
+    features['pressure_diff_mb'] = np.asarray(dest['sea_level_pressure_mb'], dtype=np.float64) - np.asarray(origin['sea_level_pressure_mb'], dtype=np.float64)
+    
+    # Create a comprehensive weather impact score
+    features['comprehensive_weather_impact'] = (
+        features['avg_wind_impact'] * 0.25 +
+        features['avg_visibility_impact'] * 0.25 +
+        features['avg_flight_category_impact'] * 0.3 +
+        np.abs(filled(features['temp_diff_c'], 0)) * 0.1 +
+        np.abs(filled(features['pressure_diff_mb'], 0)) * 0.1
+    )
+    return features
+
 def simulate_metar_data(airport_codes, num_observations_per_airport=3):
     """
     Simulate realistic METAR weather data for demonstration purposes
@@ -16,43 +120,11 @@ def simulate_metar_data(airport_codes, num_observations_per_airport=3):
     """
     simulated_data = []
     
-    # Define realistic weather parameter ranges
-    weather_scenarios = {
-        'clear': {
-            'temp_range': (15, 25),
-            'wind_speed_range': (5, 15),
-            'visibility_range': (8, 10),
-            'present_weather': '',
-            'flight_category': 'VFR'
-        },
-        'cloudy': {
-            'temp_range': (10, 20),
-            'wind_speed_range': (8, 20),
-            'visibility_range': (5, 8),
-            'present_weather': 'BKN',
-            'flight_category': 'MVFR'
-        },
-        'rainy': {
-            'temp_range': (8, 18),
-            'wind_speed_range': (12, 25),
-            'visibility_range': (2, 6),
-            'present_weather': 'RA',
-            'flight_category': 'IFR'
-        },
-        'stormy': {
-            'temp_range': (5, 15),
-            'wind_speed_range': (20, 35),
-            'visibility_range': (0.5, 3),
-            'present_weather': 'TSRA',
-            'flight_category': 'LIFR'
-        }
-    }
-    
     for airport in airport_codes:
         for i in range(num_observations_per_airport):
             # Randomly select weather scenario
-            scenario = random.choice(list(weather_scenarios.keys()))
-            scenario_data = weather_scenarios[scenario]
+            scenario = random.choice(list(WEATHER_SCENARIOS.keys()))
+            scenario_data = WEATHER_SCENARIOS[scenario]
             
             # Generate realistic weather parameters
             temp = round(random.uniform(*scenario_data['temp_range']), 1)
@@ -129,57 +201,18 @@ def enhance_flight_data_with_simulated_weather(flight_data_path, output_path):
     # Calculate weather-derived features
     print("Calculating weather-derived features...")
     
-    # Temperature difference
-    enhanced_data['temp_diff_c'] = enhanced_data['dest_temperature_c'] - enhanced_data['origin_temperature_c']
-    
-    # Wind impact factors
-    enhanced_data['origin_wind_impact'] = enhanced_data['origin_wind_speed_kt'].fillna(0)
-    enhanced_data['dest_wind_impact'] = enhanced_data['dest_wind_speed_kt'].fillna(0)
-    enhanced_data['avg_wind_impact'] = (enhanced_data['origin_wind_impact'] + enhanced_data['dest_wind_impact']) / 2
-    
-    # Visibility impact (lower visibility = higher impact)
-    enhanced_data['origin_visibility_impact'] = 10 - enhanced_data['origin_visibility_sm'].fillna(10)
-    enhanced_data['dest_visibility_impact'] = 10 - enhanced_data['dest_visibility_sm'].fillna(10)
-    enhanced_data['avg_visibility_impact'] = (enhanced_data['origin_visibility_impact'] + enhanced_data['dest_visibility_impact']) / 2
-    
-    # Weather severity scores
-    enhanced_data['origin_weather_severity'] = (
-        enhanced_data['origin_wind_impact'] * 0.3 +
-        enhanced_data['origin_visibility_impact'] * 0.4 +
-        (enhanced_data['origin_present_weather'].str.len().fillna(0) > 0).astype(int) * 0.3
-    )
-    
-    enhanced_data['dest_weather_severity'] = (
-        enhanced_data['dest_wind_impact'] * 0.3 +
-        enhanced_data['dest_visibility_impact'] * 0.4 +
-        (enhanced_data['dest_present_weather'].str.len().fillna(0) > 0).astype(int) * 0.3
-    )
-    
-    enhanced_data['total_weather_impact'] = enhanced_data['origin_weather_severity'] + enhanced_data['dest_weather_severity']
-    
-    # Flight category impact (convert to numeric)
-    flight_category_impact = {
-        'VFR': 0,    # Visual Flight Rules - best conditions
-        'MVFR': 1,   # Marginal VFR - moderate impact
-        'IFR': 2,    # Instrument Flight Rules - significant impact
-        'LIFR': 3    # Low IFR - highest impact
-    }
-    
-    enhanced_data['origin_flight_category_impact'] = enhanced_data['origin_flight_category'].map(flight_category_impact).fillna(0)
-    enhanced_data['dest_flight_category_impact'] = enhanced_data['dest_flight_category'].map(flight_category_impact).fillna(0)
-    enhanced_data['avg_flight_category_impact'] = (enhanced_data['origin_flight_category_impact'] + enhanced_data['dest_flight_category_impact']) / 2
-    
-    # Pressure difference (can affect fuel efficiency)
-    enhanced_data['pressure_diff_mb'] = enhanced_data['dest_sea_level_pressure_mb'] - enhanced_data['origin_sea_level_pressure_mb']
+    def observations(prefix):
+        return {
+            'temperature_c': enhanced_data[prefix + 'temperature_c'],
+            'wind_speed_kt': enhanced_data[prefix + 'wind_speed_kt'],
+            'visibility_sm': enhanced_data[prefix + 'visibility_sm'],
+            'sea_level_pressure_mb': enhanced_data[prefix + 'sea_level_pressure_mb'],
+            'flight_category_impact': enhanced_data[prefix + 'flight_category'].map(FLIGHT_CATEGORY_IMPACT),
+            'has_present_weather': enhanced_data[prefix + 'present_weather'].str.len().fillna(0) > 0
+        }
     
-    # Create a comprehensive weather impact score
-    enhanced_data['comprehensive_weather_impact'] = (
-        enhanced_data['avg_wind_impact'] * 0.25 +
-        enhanced_data['avg_visibility_impact'] * 0.25 +
-        enhanced_data['avg_flight_category_impact'] * 0.3 +
-        abs(enhanced_data['temp_diff_c'].fillna(0)) * 0.1 +
-        abs(enhanced_data['pressure_diff_mb'].fillna(0)) * 0.1
-    )
+    for column, values in weather_impact_features(observations('origin_'), observations('dest_')).items():
+        enhanced_data[column] = values
     
     print(f"Enhanced data shape: {enhanced_data.shape}")
     print(f"Weather data coverage: {enhanced_data['origin_temperature_c'].notna().sum()} origin, {enhanced_data['dest_temperature_c'].notna().sum()} destination")
@@ -1,12 +1,12 @@
-
 import pandas as pd
-from sklearn.model_selection import train_test_split
+from dataset_splits import make_split, save_split
 
 # Load the augmented dataset
 df_augmented = pd.read_csv("/home/ubuntu/data/estimated_fuel_consumption_sample_100k_new_lookup.csv")
 
 # Drop rows where Estimated_Total_Fuel_kg is NaN (i.e., 'no info' aircraft types)
 df_augmented.dropna(subset=["Estimated_Total_Fuel_kg"], inplace=True)
+df_augmented.reset_index(drop=True, inplace=True)
 
 # Define features (X) and target (y)
 # For now, let's use Estimated_Distance_km as a primary feature.
@@ -17,16 +17,23 @@ df_augmented.dropna(subset=["Estimated_Total_Fuel_kg"], inplace=True)
 X = df_augmented[["Estimated_Distance_km"]]
 y = df_augmented["Estimated_Total_Fuel_kg"]
 
-# Split data into training (80%) and temporary (20%) sets
-X_train, X_temp, y_train, y_temp = train_test_split(X, y, test_size=0.2, random_state=42)
+# Split by FlightDate windows: training (80%), validation (10%) and test (10%) days.
+# Whole days stay together, so the same tail number on the same day never lands in
+# both train and test. Use strategy="group" with group_by="tail" or "route" to hold
+# out entire airframes or routes instead.
+split = make_split(df_augmented, strategy="time", val_size=0.1, test_size=0.1)
 
-# Split temporary data into validation (50% of temp, i.e., 10% of total) and test (50% of temp, i.e., 10% of total) sets
-X_val, X_test, y_val, y_test = train_test_split(X_temp, y_temp, test_size=0.5, random_state=42)
+X_train, y_train = X.iloc[split["train"]], y.iloc[split["train"]]
+X_val, y_val = X.iloc[split["val"]], y.iloc[split["val"]]
+X_test, y_test = X.iloc[split["test"]], y.iloc[split["test"]]
 
 print(f"Training set shape: {X_train.shape}")
 print(f"Validation set shape: {X_val.shape}")
 print(f"Test set shape: {X_test.shape}")
 
+# Save the split indices so later stages can reuse the exact same split
+save_split(split, "/home/ubuntu/data/split_indices.npz")
+
 # Save the split datasets (optional, but good practice for reproducibility)
 X_train.to_csv("/home/ubuntu/data/X_train.csv", index=False)
 y_train.to_csv("/home/ubuntu/data/y_train.csv", index=False)
@@ -38,3 +45,4 @@ y_test.to_csv("/home/ubuntu/data/y_test.csv", index=False)
 print("Dataset split into training, validation, and test sets and saved.")
 
 
+
@@ -0,0 +1,203 @@
+import os
+import pickle
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+
+AIRPORTS_PATH = '/home/ubuntu/data/airports_geolocation.csv'
+STATION_INDEX_PATH = '/home/ubuntu/data/station_index.pkl'
+FALLBACK_RADIUS_KM = 100
+FALLBACK_CANDIDATES = 8  # default number of nearest stations listed by neighbours()
+EARTH_RADIUS_KM = 6371
+
+# ICAO identifiers outside the contiguous US, where the 'K' + IATA rule does not apply
+ICAO_OVERRIDES = {
+    # Alaska
+    'ANC': 'PANC', 'FAI': 'PAFA', 'JNU': 'PAJN', 'KTN': 'PAKT', 'SIT': 'PASI', 'BET': 'PABE',
+    'ADQ': 'PADQ', 'OME': 'PAOM', 'OTZ': 'PAOT', 'BRW': 'PABR', 'SCC': 'PASC', 'CDV': 'PACV',
+    'YAK': 'PAYA', 'WRG': 'PAWG', 'PSG': 'PAPG', 'DLG': 'PADL', 'AKN': 'PAKN', 'ADK': 'PADK',
+    # Hawaii
+    'HNL': 'PHNL', 'OGG': 'PHOG', 'KOA': 'PHKO', 'LIH': 'PHLI', 'ITO': 'PHTO',
+    # Territories
+    'SJU': 'TJSJ', 'BQN': 'TJBQ', 'PSE': 'TJPS', 'STT': 'TIST', 'STX': 'TISX',
+    'GUM': 'PGUM', 'SPN': 'PGSN', 'PPG': 'NSTU'
+}
+ICAO_COLUMNS = ['ICAO_CODE', 'ICAO', 'icao_id', 'ident']
+
+def iata_to_icao(iata_code):
+    """ICAO identifier of a US IATA code (overrides, else the contiguous-US 'K' prefix)"""
+    if not isinstance(iata_code, str) or not iata_code:
+        return None
+    code = iata_code.strip().upper()
+    return ICAO_OVERRIDES.get(code, 'K' + code if len(code) == 3 else code)
+
+def file_fingerprint(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class StationIndex:
+    """
+    IATA -> ICAO station resolution with a nearest-reporting-station fallback
+
+    ICAO identifiers come from the airport table when it has an ICAO column, otherwise from
+    the IATA code (ICAO_OVERRIDES, else 'K' + IATA). Airport positions are held in a
+    haversine BallTree, so the stations nearest to any airport are found in O(log n); an
+    airport with no observation of its own borrows the nearest station that reported,
+    within a radius. The index is pickled next to the airport table and rebuilt only when
+    the table's contents change.
+    """
+
+    def __init__(self, airports_df, fingerprint=None):
+        from sklearn.neighbors import BallTree
+
+        airports = airports_df.dropna(subset=['IATA_CODE', 'LATITUDE', 'LONGITUDE']).drop_duplicates('IATA_CODE')
+        self.iata = airports['IATA_CODE'].astype(str).str.strip().str.upper().to_numpy()
+        icao_column = next((column for column in ICAO_COLUMNS if column in airports.columns), None)
+        derived = np.array([iata_to_icao(code) for code in self.iata], dtype=object)
+        if icao_column is None:
+            self.icao = derived
+        else:
+            listed = airports[icao_column].to_numpy(dtype=object)
+            self.icao = np.where(pd.notna(listed), listed, derived)
+        self.lat = airports['LATITUDE'].to_numpy(dtype=np.float64)
+        self.lon = airports['LONGITUDE'].to_numpy(dtype=np.float64)
+        self.fingerprint = fingerprint
+        self._iata_index = pd.Index(self.iata)
+        self.tree = BallTree(np.radians(np.column_stack([self.lat, self.lon])), metric='haversine')
+
+    @classmethod
+    def load_or_build(cls, airports_path=AIRPORTS_PATH, index_path=STATION_INDEX_PATH):
+        """
+        The persisted index for the airport table, rebuilding it if the table changed
+
+        Returns:
+        StationIndex: Ready-to-query index
+        """
+        fingerprint = file_fingerprint(airports_path)
+        try:
+            with open(index_path, 'rb') as f:
+                index = pickle.load(f)
+            if index.fingerprint == fingerprint:
+                return index
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError):
+            pass
+        index = cls(pd.read_csv(airports_path), fingerprint)
+        index.save(index_path)
+        return index
+
+    def save(self, index_path=STATION_INDEX_PATH):
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, index_path)
+
+    def icao_codes(self, iata_codes):
+        """
+        ICAO station of each IATA code (derived from the code for airports not in the table)
+
+        Returns:
+        np.ndarray: ICAO identifiers (None for missing codes)
+        """
+        codes = pd.Series(iata_codes, copy=False).astype(object)
+        positions = self._iata_index.get_indexer(codes.str.strip().str.upper())
+        derived = np.array([iata_to_icao(code) for code in codes], dtype=object)
+        return np.where(positions >= 0, self.icao[np.maximum(positions, 0)], derived)
+
+    def neighbours(self, iata_codes, k=FALLBACK_CANDIDATES):
+        """
+        The k nearest stations of each airport in the table
+
+        Returns:
+        tuple: (row positions in the table, or -1 for unknown airports; neighbour ICAO
+               identifiers of shape (n, k), nearest first; distances in km of shape (n, k))
+        """
+        positions = self._iata_index.get_indexer(pd.Series(iata_codes, copy=False).astype(str).str.strip().str.upper())
+        k = min(k, len(self.iata))
+        icao = np.full((len(positions), k), None, dtype=object)
+        distance_km = np.full((len(positions), k), np.inf)
+        known = positions >= 0
+        if known.any():
+            query = np.radians(np.column_stack([self.lat[positions[known]], self.lon[positions[known]]]))
+            distance, neighbour = self.tree.query(query, k=k)
+            icao[known] = self.icao[neighbour]
+            distance_km[known] = distance * EARTH_RADIUS_KM
+        return positions, icao, distance_km
+
+    def fallback_candidates(self, iata_codes, radius_km=FALLBACK_RADIUS_KM):
+        """Distinct ICAO stations within radius_km of the given airports (to fetch for fallback)"""
+        positions = self._iata_index.get_indexer(pd.Series(iata_codes, copy=False).astype(str).str.strip().str.upper())
+        positions = positions[positions >= 0]
+        if len(positions) == 0:
+            return []
+        query = np.radians(np.column_stack([self.lat[positions], self.lon[positions]]))
+        within = self.tree.query_radius(query, r=radius_km / EARTH_RADIUS_KM)
+        return sorted(set(self.icao[np.concatenate(within)].tolist()) - {None})
+
+    def resolve(self, iata_codes, reporting_stations, radius_km=FALLBACK_RADIUS_KM):
+        """
+        Station whose observations each airport should use
+
+        An airport uses its own station when that station reported; otherwise the nearest
+        reporting station within radius_km, found in a BallTree over the reporting stations
+        only, so stations that did not report can never hide one that did.
+
+        Parameters:
+        iata_codes (list): Airport IATA codes
+        reporting_stations (iterable): ICAO identifiers that have observations
+
+        Returns:
+        pd.DataFrame: airport, station (None when nothing reported nearby) and
+                      station_distance_km (0 for the airport's own station)
+        """
+        iata_codes = pd.Series(iata_codes, copy=False).astype(object)
+        reporting = np.array(sorted(set(reporting_stations)), dtype=object)
+        own = self.icao_codes(iata_codes)
+        own_reported = pd.Series(own).isin(reporting).to_numpy()
+
+        station = np.where(own_reported, own, None).astype(object)
+        distance = np.where(own_reported, 0.0, np.nan)
+        missing = np.flatnonzero(~own_reported)
+        reporting_rows = np.flatnonzero(pd.Series(self.icao).isin(reporting).to_numpy())
+        if len(missing) and len(reporting_rows):
+            from sklearn.neighbors import BallTree
+
+            positions = self._iata_index.get_indexer(iata_codes.iloc[missing].astype(str).str.strip().str.upper())
+            missing = missing[positions >= 0]
+            positions = positions[positions >= 0]
+            if len(missing):
+                tree = BallTree(np.radians(np.column_stack([self.lat[reporting_rows], self.lon[reporting_rows]])),
+                                metric='haversine')
+                nearest_distance, nearest = tree.query(np.radians(np.column_stack([self.lat[positions], self.lon[positions]])), k=1)
+                distance_km = nearest_distance[:, 0] * EARTH_RADIUS_KM
+                found = distance_km <= radius_km
+                station[missing[found]] = self.icao[reporting_rows[nearest[found, 0]]]
+                distance[missing[found]] = distance_km[found]
+
+        return pd.DataFrame({'airport': iata_codes.to_numpy(), 'station': station, 'station_distance_km': distance})
+
+    def __len__(self):
+        return len(self.iata)
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="Build (or load) the station index and resolve airports")
+    parser.add_argument('airports', nargs='*', help="IATA codes to resolve (default: the first 10 in the table)")
+    parser.add_argument('--radius', type=float, default=FALLBACK_RADIUS_KM, help="Fallback radius in km")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = StationIndex.load_or_build()
+    print(f"Station index of {len(index)} airports ready in {time.perf_counter() - start:.3f}s")
+
+    airports = args.airports or index.iata[:10].tolist()
+    # Without live observations, pretend only every other station reported
+    reporting = index.icao[::2]
+    resolution = index.resolve(airports, reporting, radius_km=args.radius)
+    resolution['icao'] = index.icao_codes(airports)
+    print(resolution)
@@ -0,0 +1,376 @@
+import numpy as np
+import pandas as pd
+from collections import Counter
+
+def _count_keys(keys):
+    """Count occurrences of each integer key in a chunk (vectorized, then one dict per unique key)"""
+    unique, counts = np.unique(keys, return_counts=True)
+    return Counter(dict(zip(unique.tolist(), counts.tolist())))
+
+class StreamingHistogram:
+    """
+    Fixed-width histogram that grows with the value range, not the row count
+
+    Bins are [k * bin_width, (k + 1) * bin_width) and only non-empty bins are stored,
+    so two histograms with the same bin_width can be merged by adding counts.
+    """
+
+    def __init__(self, bin_width):
+        self.bin_width = float(bin_width)
+        self.counts = Counter()
+        self.total = 0
+
+    def update(self, values):
+        """Add a chunk of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+        self.counts.update(_count_keys(np.floor(values / self.bin_width).astype(np.int64)))
+        self.total += len(values)
+        return self
+
+    def merge(self, other):
+        """Fold another histogram with the same bin width into this one"""
+        if other.bin_width != self.bin_width:
+            raise ValueError("Cannot merge histograms with different bin widths")
+        self.counts.update(other.counts)
+        self.total += other.total
+        return self
+
+    def to_arrays(self):
+        """
+        Returns:
+        tuple: (bin edges, counts) as dense arrays covering the observed range
+        """
+        if not self.counts:
+            return np.array([0.0, self.bin_width]), np.zeros(1, dtype=np.int64)
+        lo, hi = min(self.counts), max(self.counts)
+        counts = np.zeros(hi - lo + 1, dtype=np.int64)
+        for key, count in self.counts.items():
+            counts[key - lo] = count
+        edges = np.arange(lo, hi + 2) * self.bin_width
+        return edges, counts
+
+class FixedBinHistograms:
+    """
+    Per-feature histograms over fixed bin edges, updated for a whole row batch at once
+
+    Each feature has up to n_edges edges (padded with +inf) giving n_edges + 1 bins, plus
+    one slot for missing values. All counts live in one (features x slots) array, so an
+    update is one broadcast comparison and one bincount regardless of the feature count.
+    """
+
+    def __init__(self, edges):
+        width = max((len(e) for e in edges), default=0)
+        self.edges = np.full((len(edges), width), np.inf)
+        for j, feature_edges in enumerate(edges):
+            self.edges[j, :len(feature_edges)] = feature_edges
+        self.n_slots = width + 2
+        self.counts = np.zeros((len(edges), self.n_slots), dtype=np.int64)
+        self.total = 0
+        self._offsets = np.arange(len(edges)) * self.n_slots
+
+    @classmethod
+    def from_quantiles(cls, X, n_bins=20):
+        """Edges at the quantiles of a reference matrix (rows x features)"""
+        X = np.asarray(X, dtype=np.float64)
+        qs = np.linspace(0, 1, n_bins + 1)[1:-1]
+        return cls([np.unique(np.nanquantile(X[:, j], qs)) for j in range(X.shape[1])])
+
+    @property
+    def missing_slot(self):
+        return self.n_slots - 1
+
+    def update(self, X):
+        """Add a batch of rows (2-D array, features in edge order)"""
+        X = X.to_numpy(dtype=np.float64) if isinstance(X, pd.DataFrame) else np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        slots = (X[:, :, None] >= self.edges[None, :, :]).sum(axis=2)
+        slots[np.isnan(X)] = self.missing_slot
+        flat_slots = (slots + self._offsets).ravel()
+        if len(X) == 1:
+            # One row touches each feature's counts once, so a direct increment is exact
+            self.counts.ravel()[flat_slots] += 1
+        else:
+            self.counts += np.bincount(flat_slots, minlength=self.counts.size).reshape(self.counts.shape)
+        self.total += len(X)
+        return self
+
+    def merge(self, other):
+        """Fold in histograms built over the same edges"""
+        if other.edges.shape != self.edges.shape or not np.array_equal(other.edges, self.edges):
+            raise ValueError("Cannot merge histograms with different edges")
+        self.counts += other.counts
+        self.total += other.total
+        return self
+
+    def empty_like(self):
+        """Histograms over the same edges with zero counts"""
+        clone = FixedBinHistograms([])
+        clone.edges = self.edges
+        clone.n_slots = self.n_slots
+        clone.counts = np.zeros_like(self.counts)
+        clone.total = 0
+        clone._offsets = self._offsets
+        return clone
+
+class StreamingGrid2D:
+    """
+    Sparse 2-D grid of counts (e.g. distance x fuel) for density and hexbin plots
+    """
+
+    def __init__(self, x_bin_width, y_bin_width):
+        self.x_bin_width = float(x_bin_width)
+        self.y_bin_width = float(y_bin_width)
+        self.counts = Counter()
+        self.total = 0
+
+    def update(self, x, y):
+        """Add a chunk of (x, y) pairs; pairs with a missing coordinate are ignored"""
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        valid = np.isfinite(x) & np.isfinite(y)
+        if not valid.any():
+            return self
+        cells = np.stack([
+            np.floor(x[valid] / self.x_bin_width).astype(np.int64),
+            np.floor(y[valid] / self.y_bin_width).astype(np.int64)
+        ], axis=1)
+        unique, counts = np.unique(cells, axis=0, return_counts=True)
+        self.counts.update(dict(zip(map(tuple, unique.tolist()), counts.tolist())))
+        self.total += int(valid.sum())
+        return self
+
+    def merge(self, other):
+        """Fold another grid with the same bin widths into this one"""
+        if (other.x_bin_width, other.y_bin_width) != (self.x_bin_width, self.y_bin_width):
+            raise ValueError("Cannot merge grids with different bin widths")
+        self.counts.update(other.counts)
+        self.total += other.total
+        return self
+
+    def cell_centers(self):
+        """
+        Returns:
+        tuple: (x centers, y centers, counts) for every non-empty cell
+        """
+        if not self.counts:
+            return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+        cells = np.array(list(self.counts.keys()), dtype=np.float64)
+        counts = np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts))
+        return (cells[:, 0] + 0.5) * self.x_bin_width, (cells[:, 1] + 0.5) * self.y_bin_width, counts
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error (DDSketch-style log buckets)
+
+    A value x > 0 goes to bucket ceil(log_gamma(x)) with gamma = (1 + a) / (1 - a),
+    so any reported quantile is within relative_accuracy of a true sample value.
+    Memory depends on the dynamic range of the data, not on the number of rows.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.positive = Counter()
+        self.negative = Counter()
+        self.zero_count = 0
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """Add a chunk of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+
+        positive = values[values > 0]
+        negative = -values[values < 0]
+        if len(positive):
+            self.positive.update(_count_keys(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)))
+        if len(negative):
+            self.negative.update(_count_keys(np.ceil(np.log(negative) / self._log_gamma).astype(np.int64)))
+
+        self.zero_count += int(len(values) - len(positive) - len(negative))
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        return self
+
+    def merge(self, other):
+        """Fold another sketch with the same accuracy into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracies")
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _bucket_value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantiles(self, qs):
+        """
+        Estimate several quantiles with one walk over the buckets
+
+        Parameters:
+        qs (list): Quantiles in [0, 1]
+
+        Returns:
+        np.ndarray: Estimated values (NaN if the sketch is empty)
+        """
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+
+        # Buckets in ascending value order: negatives (largest magnitude first), zero, positives
+        neg_keys = sorted(self.negative, reverse=True)
+        pos_keys = sorted(self.positive)
+        values = np.array([-self._bucket_value(k) for k in neg_keys] + [0.0] +
+                          [self._bucket_value(k) for k in pos_keys])
+        counts = np.array([self.negative[k] for k in neg_keys] + [self.zero_count] +
+                          [self.positive[k] for k in pos_keys], dtype=np.float64)
+
+        ranks = qs * (self.count - 1)
+        positions = np.searchsorted(np.cumsum(counts), ranks, side='right')
+        result = values[np.minimum(positions, len(values) - 1)]
+        return np.clip(result, self.min, self.max)
+
+    def quantile(self, q):
+        """Estimate a single quantile"""
+        return float(self.quantiles([q])[0])
+
+    def box_stats(self, label=None):
+        """
+        Boxplot statistics (Tukey 1.5 IQR whiskers) for matplotlib's Axes.bxp
+
+        Returns:
+        dict: med, q1, q3, whislo, whishi and label
+        """
+        q1, med, q3 = self.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        return {
+            'label': label,
+            'med': med,
+            'q1': q1,
+            'q3': q3,
+            'whislo': max(self.min, q1 - 1.5 * iqr),
+            'whishi': min(self.max, q3 + 1.5 * iqr),
+            'fliers': []
+        }
+
+class RunningMoments:
+    """
+    Count, mean, variance, min and max with Chan et al.'s parallel merge formula
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """Add a chunk of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+        chunk = RunningMoments()
+        chunk.count = len(values)
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(np.sum((values - chunk.mean) ** 2))
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """Fold another set of moments into this one"""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1), matching pandas describe()"""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch (HyperLogLog with 2**precision registers)
+
+    With the default precision of 14 the sketch uses 16 KB and has ~0.8% standard error.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    @staticmethod
+    def _bit_length(words):
+        """Exact bit length of uint64 values, via frexp on each 32-bit half"""
+        high = (words >> np.uint64(32)).astype(np.float64)
+        low = (words & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        high_bits = np.frexp(high)[1]
+        low_bits = np.frexp(low)[1]
+        return np.where(high_bits > 0, high_bits + 32, low_bits)
+
+    def update_hashes(self, hashes):
+        """Add a chunk of uint64 hashes"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return self
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        remainder = hashes << p
+        rank = (64 - self._bit_length(remainder) + 1)
+        rank = np.minimum(rank, 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def update(self, values):
+        """Hash and add a chunk of values (callers should drop nulls first)"""
+        values = np.asarray(values)
+        if values.dtype.kind in 'biuf':
+            values = values.astype(np.float64)
+        else:
+            values = values.astype(object)
+        return self.update_hashes(pd.util.hash_array(values))
+
+    def merge(self, other):
+        """Fold another sketch with the same precision into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precisions")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        """Estimated number of distinct values"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            # Small-range correction (linear counting)
+            return float(m * np.log(m / zeros))
+        return float(raw)
@@ -1,31 +1,36 @@
+import os
+import argparse
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-import xgboost as xgb
-import lightgbm as lgb
-import matplotlib.pyplot as plt
-import seaborn as sns
-from math import radians, cos, sin, asin, sqrt
 import warnings
+from dataset_splits import make_split
+from fuel_rates import add_baseline_fuel, baseline_phase_model
+from aircraft_registry import AircraftRegistry, REGISTRY_PATH
+from flight_store import FlightStore, RouteGeometry, airport_coordinate_tables
+from wind_components import add_wind_features
+from regressors import build_regressor, REGRESSOR_NAMES
+from model_registry import publish_models, load_bundle, MODEL_DIR
+from explanations import explain_batch, GLOBAL_IMPORTANCE_PATH
+from report_data import publish_report_data
+from drift_monitor import build_drift_reference
+from tree_inference import export_models
+from feature_pipeline import compact_features, matrix_nbytes, BinnedRegressor
+from model_distillation import distill_ensemble, DISTILLATION_REPORT_PATH
+from model_evaluation import compute_metrics, segment_metrics, build_segments, plot_metric_grid, plot_prediction_vs_actual, render_figures
 warnings.filterwarnings('ignore')
 
-def haversine(lon1, lat1, lon2, lat2):
-    """Calculate the great circle distance between two points on earth (specified in decimal degrees)"""
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-    dlon = lon2 - lon1 
-    dlat = lat2 - lat1 
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a)) 
-    r = 6371  # Radius of earth in kilometers
-    return c * r
+# Boosters that can train on histogram-binned features (--binned)
+BINNED_MODELS = ['XGBoost', 'LightGBM']
 
-def prepare_enhanced_data_for_modeling():
+def prepare_enhanced_data_for_modeling(return_registry=False):
     """
     Prepare the enhanced flight data with weather features for machine learning
+    
+    Parameters:
+    return_registry (bool): Also return the tail-number registry built from the flights
+    
+    Returns:
+    pd.DataFrame: Prepared flight data, or (data, AircraftRegistry) with return_registry
     """
     print("Loading enhanced flight data with weather features...")
     
@@ -35,27 +40,27 @@ def prepare_enhanced_data_for_modeling():
     print(f"Loaded {len(enhanced_data)} records with {enhanced_data.shape[1]} features")
     
     # Load airport coordinates for distance calculation
+    # (route courses stay NaN without coordinates, so winds then leave the cruise speed unchanged)
+    initial_bearing = final_bearing = np.full(len(enhanced_data), np.nan)
     try:
         airports_df = pd.read_csv('/home/ubuntu/data/airports_geolocation.csv')
         print(f"Loaded {len(airports_df)} airport coordinates")
         
-        # Merge airport coordinates
-        origin_coords = airports_df[['IATA_CODE', 'LATITUDE', 'LONGITUDE']].rename(columns={
-            'IATA_CODE': 'Dep_Airport', 'LATITUDE': 'origin_lat', 'LONGITUDE': 'origin_lon'
-        })
-        dest_coords = airports_df[['IATA_CODE', 'LATITUDE', 'LONGITUDE']].rename(columns={
-            'IATA_CODE': 'Arr_Airport', 'LATITUDE': 'dest_lat', 'LONGITUDE': 'dest_lon'
-        })
-        
-        enhanced_data = enhanced_data.merge(origin_coords, on='Dep_Airport', how='left')
-        enhanced_data = enhanced_data.merge(dest_coords, on='Arr_Airport', how='left')
+        # Encode airports as shared integer codes and gather coordinates by code
+        route_store = FlightStore.from_frame(enhanced_data[['Dep_Airport', 'Arr_Airport']])
+        lat, lon = airport_coordinate_tables(route_store.dictionary('airport'), airports_df)
+        enhanced_data['origin_lat'] = route_store.gather('Dep_Airport', lat)
+        enhanced_data['origin_lon'] = route_store.gather('Dep_Airport', lon)
+        enhanced_data['dest_lat'] = route_store.gather('Arr_Airport', lat)
+        enhanced_data['dest_lon'] = route_store.gather('Arr_Airport', lon)
         
-        # Calculate distance using Haversine formula
+        # Distance and great-circle courses, computed once per distinct route (NaN without coordinates)
         mask = enhanced_data[['origin_lat', 'origin_lon', 'dest_lat', 'dest_lon']].notna().all(axis=1)
         if mask.sum() > 0:
-            enhanced_data.loc[mask, 'Estimated_Distance_km'] = enhanced_data.loc[mask].apply(
-                lambda row: haversine(row['origin_lon'], row['origin_lat'], row['dest_lon'], row['dest_lat']), axis=1
-            )
+            geometry = RouteGeometry(route_store.dictionary('airport'), airports_df)
+            distance_km, initial_bearing, final_bearing = geometry.for_store(route_store)
+            enhanced_data['Estimated_Distance_km'] = distance_km
+            print(f"Computed distance and courses for {len(geometry)} distinct routes")
         else:
             # Fallback to flight duration-based estimation
             enhanced_data['Estimated_Distance_km'] = enhanced_data['Flight_Duration'] * 850 / 60
@@ -65,34 +70,19 @@ def prepare_enhanced_data_for_modeling():
         # Use flight duration-based estimation
         enhanced_data['Estimated_Distance_km'] = enhanced_data['Flight_Duration'] * 850 / 60
     
-    # Load fuel consumption lookup table
-    fuel_lookup = {
-        'CRJ2': 850,   # kg/hour
-        'CRJ7': 950,
-        'CRJ9': 1050,
-        'E145': 900,
-        'E170': 1100,
-        'E175': 1150,
-        'B737': 2500,
-        'A320': 2400,
-        'B757': 3200,
-        'B767': 4200,
-        'A330': 5500,
-        'B777': 7500,
-        'B787': 5400,
-        'A350': 5800
-    }
-    
-    # Map aircraft models to fuel consumption rates
-    enhanced_data['Fuel_Rate_kg_per_hour'] = enhanced_data['Model'].map(fuel_lookup)
-    
-    # For unmapped aircraft, use a default rate based on aircraft type
-    default_fuel_rate = 1000  # kg/hour for regional jets
-    enhanced_data['Fuel_Rate_kg_per_hour'] = enhanced_data['Fuel_Rate_kg_per_hour'].fillna(default_fuel_rate)
-    
-    # Calculate baseline fuel consumption (without weather impact)
-    enhanced_data['Baseline_Fuel_kg'] = (enhanced_data['Fuel_Rate_kg_per_hour'] * 
-                                        enhanced_data['Flight_Duration'] / 60)
+    # Head/crosswind components of the METAR winds along the route and the resulting
+    # wind-adjusted ground speed and flight time
+    enhanced_data = add_wind_features(enhanced_data, enhanced_data['Estimated_Distance_km'].to_numpy(),
+                                      initial_bearing, final_bearing)
+    
+    # Build the tail-number registry once from the flight history, then map each flight's
+    # airframe to its type and age/engine fuel-flow factor and calculate baseline fuel
+    # consumption (without weather impact) phase by phase: taxi, climb, cruise and descent
+    # from the per-type performance grids at each flight's distance, duration and temperatures
+    # (kept in memory: only the training run below saves it)
+    registry = AircraftRegistry.from_flights(enhanced_data)
+    print(f"Registered {len(registry)} airframes")
+    enhanced_data = add_baseline_fuel(enhanced_data, registry, baseline_phase_model())
     
     # Calculate weather-adjusted fuel consumption
     # Weather impact factor: 1.0 = no impact, >1.0 = increased fuel consumption
@@ -107,11 +97,17 @@ def prepare_enhanced_data_for_modeling():
     print(f"Average extra fuel due to weather: {enhanced_data['Extra_Fuel_kg'].mean():.1f} kg")
     print(f"Extra fuel range: {enhanced_data['Extra_Fuel_kg'].min():.1f} to {enhanced_data['Extra_Fuel_kg'].max():.1f} kg")
     
+    if return_registry:
+        return enhanced_data, registry
     return enhanced_data
 
-def create_weather_enhanced_features(data):
+def create_weather_enhanced_features(data, dtype=np.float32):
     """
     Create additional features for machine learning with weather data
+    
+    Parameters:
+    dtype: Feature precision; float32 halves the matrix (and every split/scaled copy)
+           while tree models see identical values (sklearn trees work in float32 anyway)
     """
     print("Creating enhanced features for modeling...")
     
@@ -130,6 +126,9 @@ def create_weather_enhanced_features(data):
         'origin_wind_speed_kt',
         'dest_wind_speed_kt',
         'avg_wind_impact',
+        'avg_headwind_kt',
+        'avg_crosswind_kt',
+        'Wind_Adjusted_Flight_Time_hr',
         'origin_visibility_sm',
         'dest_visibility_sm',
         'avg_visibility_impact',
@@ -142,6 +141,7 @@ def create_weather_enhanced_features(data):
         
         # Aircraft characteristics
         'Fuel_Rate_kg_per_hour',
+        'Fuel_Flow_Factor',
         'Aicraft_age'
     ]
     
@@ -149,11 +149,8 @@ def create_weather_enhanced_features(data):
     available_features = [col for col in feature_columns if col in data.columns]
     print(f"Using {len(available_features)} features for modeling")
     
-    # Create feature matrix
-    X = data[available_features].copy()
-    
-    # Handle missing values
-    X = X.fillna(X.median())
+    # Create feature matrix in the requested precision, filling missing values with the median
+    X = compact_features(data, available_features, dtype)
     
     # Create target variable (extra fuel due to weather)
     y = data['Extra_Fuel_kg'].fillna(0)
@@ -164,40 +161,49 @@ def create_weather_enhanced_features(data):
     X = X[valid_mask]
     y = y[valid_mask]
     
-    print(f"Final dataset shape: {X.shape}")
+    print(f"Final dataset shape: {X.shape} ({X.dtypes.iloc[0]}, {matrix_nbytes(X) / 1e6:.1f} MB)")
     print(f"Target variable range: {y.min():.1f} to {y.max():.1f} kg")
     print(f"Target variable mean: {y.mean():.1f} kg")
     print(f"Target variable std: {y.std():.1f} kg")
     
     return X, y, available_features
 
-def train_weather_enhanced_models(X, y, feature_names):
+def train_weather_enhanced_models(X, y, feature_names, split=None, binned=False):
     """
     Train machine learning models with weather-enhanced features
+    
+    Parameters:
+    split (dict): Positional 'train'/'val'/'test' index arrays from dataset_splits;
+                  defaults to a random 70/15/15 split
+    binned (bool): Train XGBoost and LightGBM on uint8 histogram-binned features
+                   (feature_pipeline.BinnedRegressor, bins learned from the training rows)
     """
+    # Model libraries are imported here so data preparation can be used without them
+    from sklearn.preprocessing import StandardScaler
+    
     print("Training weather-enhanced machine learning models...")
     
     # Split the data
-    X_train, X_temp, y_train, y_temp = train_test_split(X, y, test_size=0.3, random_state=42)
-    X_val, X_test, y_val, y_test = train_test_split(X_temp, y_temp, test_size=0.5, random_state=42)
+    if split is None:
+        split = make_split(X, strategy='random', val_size=0.15, test_size=0.15)
+    X_train, y_train = X.iloc[split['train']], y.iloc[split['train']]
+    X_val, y_val = X.iloc[split['val']], y.iloc[split['val']]
+    X_test, y_test = X.iloc[split['test']], y.iloc[split['test']]
     
     print(f"Training set: {X_train.shape[0]} samples")
     print(f"Validation set: {X_val.shape[0]} samples")
     print(f"Test set: {X_test.shape[0]} samples")
     
-    # Scale features for linear models
+    # Scale features for linear models (StandardScaler keeps float32 input in float32)
     scaler = StandardScaler()
     X_train_scaled = scaler.fit_transform(X_train)
     X_val_scaled = scaler.transform(X_val)
     X_test_scaled = scaler.transform(X_test)
     
-    # Initialize models
-    models = {
-        'Linear Regression': LinearRegression(),
-        'Random Forest': RandomForestRegressor(n_estimators=100, random_state=42),
-        'XGBoost': xgb.XGBRegressor(n_estimators=100, random_state=42),
-        'LightGBM': lgb.LGBMRegressor(n_estimators=100, random_state=42, verbose=-1)
-    }
+    # Initialize models (the same configurations cross_validation.py compares)
+    models = {name: build_regressor(name) for name in REGRESSOR_NAMES}
+    if binned:
+        models.update({name: BinnedRegressor(models[name]) for name in BINNED_MODELS})
     
     # Train and evaluate models
     results = {}
@@ -215,29 +221,29 @@ def train_weather_enhanced_models(X, y, feature_names):
             val_pred = model.predict(X_val)
             test_pred = model.predict(X_test)
         
-        # Calculate metrics
-        val_mae = mean_absolute_error(y_val, val_pred)
-        val_rmse = np.sqrt(mean_squared_error(y_val, val_pred))
-        val_r2 = r2_score(y_val, val_pred)
-        
-        test_mae = mean_absolute_error(y_test, test_pred)
-        test_rmse = np.sqrt(mean_squared_error(y_test, test_pred))
-        test_r2 = r2_score(y_test, test_pred)
-        
         results[name] = {
-            'val_mae': val_mae,
-            'val_rmse': val_rmse,
-            'val_r2': val_r2,
-            'test_mae': test_mae,
-            'test_rmse': test_rmse,
-            'test_r2': test_r2,
             'model': model,
             'val_pred': val_pred,
             'test_pred': test_pred
         }
+    
+    # Calculate metrics for all models in one vectorized pass per split
+    val_metrics = compute_metrics(y_val, {name: r['val_pred'] for name, r in results.items()})
+    test_metrics = compute_metrics(y_test, {name: r['test_pred'] for name, r in results.items()})
+    
+    for name, result in results.items():
+        result.update({
+            'val_mae': val_metrics.at[name, 'MAE'],
+            'val_rmse': val_metrics.at[name, 'RMSE'],
+            'val_r2': val_metrics.at[name, 'R2'],
+            'test_mae': test_metrics.at[name, 'MAE'],
+            'test_rmse': test_metrics.at[name, 'RMSE'],
+            'test_r2': test_metrics.at[name, 'R2']
+        })
         
-        print(f"Validation - MAE: {val_mae:.2f}, RMSE: {val_rmse:.2f}, R²: {val_r2:.3f}")
-        print(f"Test - MAE: {test_mae:.2f}, RMSE: {test_rmse:.2f}, R²: {test_r2:.3f}")
+        print(f"\n{name}")
+        print(f"Validation - MAE: {result['val_mae']:.2f}, RMSE: {result['val_rmse']:.2f}, R²: {result['val_r2']:.3f}")
+        print(f"Test - MAE: {result['test_mae']:.2f}, RMSE: {result['test_rmse']:.2f}, R²: {result['test_r2']:.3f}")
     
     return results, X_test, y_test, scaler, feature_names
 
@@ -258,6 +264,9 @@ def analyze_feature_importance(results, feature_names):
     print(rf_importance.head(10))
     
     # Create feature importance visualization
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(12, 8))
     top_features = rf_importance.head(15)
     plt.barh(range(len(top_features)), top_features['importance'])
@@ -287,65 +296,35 @@ def create_weather_enhanced_visualizations(results, X_test, y_test):
     test_rmse = [results[name]['test_rmse'] for name in model_names]
     test_r2 = [results[name]['test_r2'] for name in model_names]
     
-    # Create comparison plots
-    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
-    
-    # Validation metrics
-    axes[0, 0].bar(model_names, val_mae, color='skyblue')
-    axes[0, 0].set_title('Validation MAE (kg)')
-    axes[0, 0].set_ylabel('Mean Absolute Error')
-    axes[0, 0].tick_params(axis='x', rotation=45)
-    
-    axes[0, 1].bar(model_names, val_rmse, color='lightcoral')
-    axes[0, 1].set_title('Validation RMSE (kg)')
-    axes[0, 1].set_ylabel('Root Mean Squared Error')
-    axes[0, 1].tick_params(axis='x', rotation=45)
-    
-    axes[0, 2].bar(model_names, val_r2, color='lightgreen')
-    axes[0, 2].set_title('Validation R² Score')
-    axes[0, 2].set_ylabel('R² Score')
-    axes[0, 2].tick_params(axis='x', rotation=45)
-    
-    # Test metrics
-    axes[1, 0].bar(model_names, test_mae, color='skyblue')
-    axes[1, 0].set_title('Test MAE (kg)')
-    axes[1, 0].set_ylabel('Mean Absolute Error')
-    axes[1, 0].tick_params(axis='x', rotation=45)
-    
-    axes[1, 1].bar(model_names, test_rmse, color='lightcoral')
-    axes[1, 1].set_title('Test RMSE (kg)')
-    axes[1, 1].set_ylabel('Root Mean Squared Error')
-    axes[1, 1].tick_params(axis='x', rotation=45)
-    
-    axes[1, 2].bar(model_names, test_r2, color='lightgreen')
-    axes[1, 2].set_title('Test R² Score')
-    axes[1, 2].set_ylabel('R² Score')
-    axes[1, 2].tick_params(axis='x', rotation=45)
-    
-    plt.tight_layout()
-    plt.savefig('/home/ubuntu/weather_enhanced_model_performance.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    # Comparison panels: validation metrics on top, test metrics below
+    panels = [
+        [('Validation MAE (kg)', 'Mean Absolute Error', val_mae, 'skyblue'),
+         ('Validation RMSE (kg)', 'Root Mean Squared Error', val_rmse, 'lightcoral'),
+         ('Validation R² Score', 'R² Score', val_r2, 'lightgreen')],
+        [('Test MAE (kg)', 'Mean Absolute Error', test_mae, 'skyblue'),
+         ('Test RMSE (kg)', 'Root Mean Squared Error', test_rmse, 'lightcoral'),
+         ('Test R² Score', 'R² Score', test_r2, 'lightgreen')]
+    ]
     
-    # Prediction vs Actual scatter plot for best model
+    # Prediction vs Actual for best model (density-binned for large test sets)
     best_model_name = max(results.keys(), key=lambda x: results[x]['test_r2'])
-    best_predictions = results[best_model_name]['test_pred']
-    
-    plt.figure(figsize=(10, 8))
-    plt.scatter(y_test, best_predictions, alpha=0.6, color='blue')
-    plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'r--', lw=2)
-    plt.xlabel('Actual Extra Fuel (kg)')
-    plt.ylabel('Predicted Extra Fuel (kg)')
-    plt.title(f'Prediction vs Actual - {best_model_name} (Weather Enhanced)')
-    plt.grid(True, alpha=0.3)
-    
-    # Add R² score to the plot
     r2 = results[best_model_name]['test_r2']
-    plt.text(0.05, 0.95, f'R² = {r2:.3f}', transform=plt.gca().transAxes, 
-             bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
     
-    plt.tight_layout()
-    plt.savefig('/home/ubuntu/weather_enhanced_prediction_vs_actual.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    # Render both figures in parallel worker processes
+    render_figures([
+        (plot_metric_grid, {
+            'output_path': '/home/ubuntu/weather_enhanced_model_performance.png',
+            'model_names': model_names,
+            'panels': panels
+        }),
+        (plot_prediction_vs_actual, {
+            'output_path': '/home/ubuntu/weather_enhanced_prediction_vs_actual.png',
+            'y_true': np.asarray(y_test),
+            'y_pred': results[best_model_name]['test_pred'],
+            'title': f'Prediction vs Actual - {best_model_name} (Weather Enhanced)',
+            'r2': r2
+        })
+    ])
     
     print(f"Best performing model: {best_model_name} (R² = {r2:.3f})")
 
@@ -385,24 +364,83 @@ def save_weather_enhanced_results(results):
     
     return val_df, test_df
 
+def save_segment_results(results, y_test, segment_data):
+    """
+    Save per-segment test metrics (aircraft type, distance band, weather category)
+    
+    Parameters:
+    results (dict): Model results with 'test_pred' arrays
+    y_test (pd.Series): Test target values
+    segment_data (pd.DataFrame): Flight rows aligned with y_test
+    """
+    print("Saving per-segment test results...")
+    
+    segment_df = segment_metrics(
+        y_test,
+        {name: result['test_pred'] for name, result in results.items()},
+        build_segments(segment_data)
+    )
+    segment_df.to_csv('/home/ubuntu/weather_enhanced_model_segment_results.csv', index=False)
+    
+    return segment_df
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and publish the weather-enhanced Extra_Fuel_kg models")
+    parser.add_argument('--binned', action='store_true',
+                        help="Train XGBoost and LightGBM on uint8 histogram-binned features")
+    args = parser.parse_args()
+    
     # Prepare enhanced data
-    enhanced_data = prepare_enhanced_data_for_modeling()
+    enhanced_data, registry = prepare_enhanced_data_for_modeling(return_registry=True)
+    
+    # Save the tail-number registry behind this run's baseline fuel for estimate_fuel.py,
+    # route_fuel_table.py and weather_scenarios.py
+    registry.save()
+    print(f"Saved aircraft registry to {REGISTRY_PATH}")
     
     # Create features and target
     X, y, feature_names = create_weather_enhanced_features(enhanced_data)
     
+    # Split by FlightDate windows so no tail number/day leaks between train and test
+    split = make_split(enhanced_data.loc[X.index, ['FlightDate']], strategy='time', val_size=0.15, test_size=0.15)
+    
     # Train models
-    results, X_test, y_test, scaler, feature_names = train_weather_enhanced_models(X, y, feature_names)
+    results, X_test, y_test, scaler, feature_names = train_weather_enhanced_models(X, y, feature_names, split,
+                                                                                   binned=args.binned)
     
     # Analyze feature importance
     feature_importance = analyze_feature_importance(results, feature_names)
     
+    # Distill the Random Forest into a lookup/linear surrogate for low-latency scoring
+    surrogate, distillation_report = distill_ensemble(results['Random Forest']['model'], X.iloc[split['train']],
+                                                      X_test, y_test, feature_importance)
+    distillation_report.to_csv(DISTILLATION_REPORT_PATH)
+    
     # Create visualizations
     create_weather_enhanced_visualizations(results, X_test, y_test)
     
     # Save results
     val_df, test_df = save_weather_enhanced_results(results)
+    segment_df = save_segment_results(results, y_test, enhanced_data.loc[X_test.index])
+    
+    # Publish the trained models as a new version for the serving layer
+    model_version = publish_models(results, scaler, feature_names, X.median(),
+                                   extra_models={'Random Forest (distilled)': surrogate},
+                                   drift_reference=build_drift_reference(X.iloc[split['train']]),
+                                   feature_dtype=str(X.dtypes.iloc[0]))
+    
+    # Export the tree ensembles as flat node tables for the opt-in NumPy batch inference engine
+    export_models({name: results[name]['model'] for name in results}, os.path.join(MODEL_DIR, model_version))
+    
+    # Global attribution-based importance of the best model over a background sample of test rows
+    _, shap_importance = explain_batch(load_bundle(version=model_version), X_test, sample_size=2000)
+    shap_importance.to_csv(GLOBAL_IMPORTANCE_PATH, index=False)
+    print("Top 5 features by mean |contribution| (best model):")
+    print(shap_importance.head(5))
+    
+    # Compact JSON aggregates for the report frontend (served by main.py at /api/report/<name>)
+    publish_report_data(enhanced_data, results, feature_importance, y_test, model_version,
+                        shap_importance=shap_importance, segment_results=segment_df)
     
     print("\nWeather-Enhanced Model Training Complete!")
     print("\nValidation Results:")
@@ -0,0 +1,314 @@
+import os
+import json
+import time
+import pickle
+import argparse
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# How a node treats missing values (NaN)
+MISSING_AS_ZERO = 0     # LightGBM missing_type None: NaN is compared as 0.0
+MISSING_ZERO = 1        # LightGBM missing_type Zero: 0.0 and NaN take the default branch
+MISSING_NAN = 2         # NaN takes the default branch
+
+class CompiledEnsemble:
+    """
+    Tree ensemble flattened into node arrays and evaluated with vectorized NumPy
+
+    All trees share one set of node tables (feature, threshold, children, default
+    direction, missing handling, leaf value); leaves have feature -1 and point to
+    themselves. Prediction walks every (row, tree) pair one level per step, dropping pairs
+    that reached a leaf, then reduces leaf values per row as a mean (random forest) or a
+    sum plus base score (boosting).
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, missing, value, roots,
+                 strict=False, float32_inputs=False, average=False, base_score=0.0, n_features=None):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        # Thresholds stay float64: sklearn compares float32 inputs against float64 thresholds,
+        # and XGBoost's float32 thresholds are exact in float64
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.missing = np.asarray(missing, dtype=np.int8)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.strict = strict
+        self.float32_inputs = float32_inputs
+        self.average = average
+        self.base_score = base_score
+        self.n_features = n_features
+        self.zero_is_missing = bool((self.missing == MISSING_ZERO).any())
+
+        # Interleaved children (children[2 * node + 1] is the right child); leaves loop
+        # back to themselves so a finished walk is a fixed point
+        leaves = self.feature < 0
+        nodes = np.arange(len(self.feature), dtype=np.int32)
+        left = np.where(leaves, nodes, left).astype(np.int32)
+        right = np.where(leaves, nodes, right).astype(np.int32)
+        self.children = np.stack([left, right], axis=1).ravel()
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.children,
+                                      self.default_left, self.missing, self.value, self.roots))
+
+    def _leaf_sums(self, X):
+        n_rows = X.shape[0]
+        flat_X = X.ravel()
+        leaf = np.tile(self.roots, n_rows)
+
+        # Working set of unfinished (row, tree) pairs: current node, row offset into flat_X,
+        # position in the output and the node's split feature
+        current = leaf.copy()
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.int64) * X.shape[1], self.n_trees)
+        position = np.arange(len(leaf))
+        feature = self.feature[current]
+        has_nan = bool(np.isnan(flat_X).any())
+
+        while True:
+            # Finished pairs sit on self-looping leaves, so the working set is only compacted
+            # once a good share of it is done
+            done = feature < 0
+            n_done = np.count_nonzero(done)
+            if n_done and (4 * n_done >= len(current) or n_done == len(current)):
+                leaf[position[done]] = current[done]
+                keep = ~done
+                current, row_offset, position, feature = current[keep], row_offset[keep], position[keep], feature[keep]
+            if len(current) == 0:
+                break
+
+            x = flat_X[row_offset + np.maximum(feature, 0)]
+            threshold = self.threshold[current]
+            go_right = (x >= threshold) if self.strict else (x > threshold)
+
+            if has_nan or self.zero_is_missing:
+                is_nan = np.isnan(x)
+                missing = self.missing[current]
+                x = np.where(is_nan & (missing == MISSING_AS_ZERO), 0, x)
+                take_default = (is_nan & (missing == MISSING_NAN)) | ((missing == MISSING_ZERO) & (is_nan | (x == 0)))
+                compared = (x >= threshold) if self.strict else (x > threshold)
+                go_right = np.where(take_default, ~self.default_left[current], compared)
+
+            current = self.children[2 * current + go_right]
+            feature = self.feature[current]
+
+        return self.value[leaf].reshape(n_rows, self.n_trees).sum(axis=1)
+
+    def predict(self, X, n_threads=1, chunk_size=10000):
+        """
+        Predict a feature batch
+
+        Parameters:
+        X (np.ndarray or pd.DataFrame): Features in training column order
+        n_threads (int): Threads scoring row chunks concurrently
+        chunk_size (int): Rows per chunk (bounds the (row, tree) working set)
+
+        Returns:
+        np.ndarray: Predictions
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32 if self.float32_inputs else np.float64)
+        chunks = [X[start:start + chunk_size] for start in range(0, len(X), chunk_size)] or [X]
+        if n_threads > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=n_threads) as executor:
+                sums = list(executor.map(self._leaf_sums, chunks))
+        else:
+            sums = [self._leaf_sums(chunk) for chunk in chunks]
+        sums = np.concatenate(sums)
+        return sums / self.n_trees if self.average else sums + self.base_score
+
+    def save(self, path):
+        """Write the node tables to an .npz file"""
+        left, right = self.children[0::2], self.children[1::2]
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=left, right=right,
+                 default_left=self.default_left, missing=self.missing, value=self.value, roots=self.roots,
+                 options=json.dumps({'strict': self.strict, 'float32_inputs': self.float32_inputs,
+                                     'average': self.average, 'base_score': self.base_score,
+                                     'n_features': self.n_features}))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        options = json.loads(str(data['options']))
+        return cls(data['feature'], data['threshold'], data['left'], data['right'], data['default_left'],
+                   data['missing'], data['value'], data['roots'], **options)
+
+def _concatenate_trees(trees, **options):
+    """Stack per-tree node arrays into one table with absolute child indices"""
+    columns = {key: [] for key in ('feature', 'threshold', 'left', 'right', 'default_left', 'missing', 'value')}
+    roots = []
+    offset = 0
+    for tree in trees:
+        roots.append(offset)
+        for key in columns:
+            values = np.asarray(tree[key])
+            if key in ('left', 'right'):
+                values = np.where(values >= 0, values + offset, -1)
+            columns[key].append(values)
+        offset += len(tree['feature'])
+    return CompiledEnsemble(roots=roots, **{key: np.concatenate(values) for key, values in columns.items()}, **options)
+
+def compile_sklearn_forest(model):
+    """Export a fitted sklearn RandomForestRegressor/ExtraTreesRegressor"""
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left < 0
+        missing_go_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8))
+        trees.append({
+            'feature': np.where(is_leaf, -1, tree.feature),
+            'threshold': tree.threshold,
+            'left': tree.children_left,
+            'right': tree.children_right,
+            'default_left': missing_go_left.astype(bool),
+            'missing': np.full(tree.node_count, MISSING_NAN),
+            'value': tree.value[:, 0, 0]
+        })
+    # sklearn casts inputs to float32 before comparing against the (float64) thresholds
+    return _concatenate_trees(trees, strict=False, float32_inputs=True, average=True, n_features=model.n_features_in_)
+
+def compile_xgboost(model):
+    """Export a fitted xgboost.XGBRegressor (numerical splits, single target)"""
+    booster = model.get_booster()
+    dump = json.loads(booster.save_raw(raw_format='json'))
+    trees = []
+    for tree in dump['learner']['gradient_booster']['model']['trees']:
+        if any(tree['split_type']):
+            raise ValueError("Categorical XGBoost splits are not supported")
+        left = np.asarray(tree['left_children'])
+        is_leaf = left < 0
+        trees.append({
+            'feature': np.where(is_leaf, -1, tree['split_indices']),
+            'threshold': np.asarray(tree['split_conditions'], dtype=np.float32),
+            'left': left,
+            'right': tree['right_children'],
+            'default_left': np.asarray(tree['default_left'], dtype=bool),
+            'missing': np.full(len(left), MISSING_NAN),
+            'value': np.where(is_leaf, tree['split_conditions'], 0.0)
+        })
+    n_features = int(dump['learner']['learner_model_param']['num_feature'])
+    compiled = _concatenate_trees(trees, strict=True, float32_inputs=True, n_features=n_features)
+
+    # The serialized base score is rounded; recover the exact margin offset from one prediction
+    probe = np.zeros((1, n_features), dtype=np.float32)
+    compiled.base_score = float(model.predict(probe, output_margin=True)[0] - compiled._leaf_sums(probe)[0])
+    return compiled
+
+def _lightgbm_tree(structure):
+    """Flatten one LightGBM tree_structure dict into node arrays (pre-order)"""
+    nodes = []
+
+    def visit(node):
+        index = len(nodes)
+        nodes.append(None)
+        if 'leaf_value' in node:
+            nodes[index] = (-1, 0.0, -1, -1, False, MISSING_NAN, node['leaf_value'])
+            return index
+        if node['decision_type'] != '<=':
+            raise ValueError("Categorical LightGBM splits are not supported")
+        left = visit(node['left_child'])
+        right = visit(node['right_child'])
+        missing = {'None': MISSING_AS_ZERO, 'Zero': MISSING_ZERO, 'NaN': MISSING_NAN}[node['missing_type']]
+        nodes[index] = (node['split_feature'], node['threshold'], left, right, node['default_left'], missing, 0.0)
+        return index
+
+    visit(structure)
+    feature, threshold, left, right, default_left, missing, value = zip(*nodes)
+    return {'feature': feature, 'threshold': threshold, 'left': left, 'right': right,
+            'default_left': default_left, 'missing': missing, 'value': value}
+
+def compile_lightgbm(model):
+    """Export a fitted lightgbm.LGBMRegressor (numerical splits)"""
+    dump = model.booster_.dump_model()
+    trees = [_lightgbm_tree(info['tree_structure']) for info in dump['tree_info']]
+    return _concatenate_trees(trees, strict=False, float32_inputs=False, n_features=dump['max_feature_idx'] + 1)
+
+def compile_model(model):
+    """
+    Compile a fitted tree ensemble into a CompiledEnsemble
+
+    Raises:
+    ValueError: If the model type is not a supported tree ensemble
+    """
+    module = type(model).__module__
+    if module.startswith('sklearn.ensemble') and hasattr(model, 'estimators_'):
+        return compile_sklearn_forest(model)
+    if module.startswith('xgboost'):
+        return compile_xgboost(model)
+    if module.startswith('lightgbm'):
+        return compile_lightgbm(model)
+    raise ValueError(f"Cannot compile {type(model).__name__}")
+
+def compile_models(models):
+    """Compile every supported model of a name -> model dict, skipping the rest"""
+    compiled = {}
+    for name, model in models.items():
+        try:
+            compiled[name] = compile_model(model)
+        except ValueError:
+            continue
+    return compiled
+
+def export_models(models, directory):
+    """
+    Compile the supported models and save each as compiled_<name>.npz
+
+    Returns:
+    dict: Model name -> written path
+    """
+    paths = {}
+    for name, compiled in compile_models(models).items():
+        path = os.path.join(directory, f"compiled_{name.lower().replace(' ', '_')}.npz")
+        compiled.save(path)
+        paths[name] = path
+    return paths
+
+def benchmark(model, compiled, X, n_threads=1, repeats=3):
+    """
+    Compare native and compiled prediction on one batch
+
+    Returns:
+    dict: max abs difference, rows/s for each engine and model memory in bytes
+    """
+    def best_time(predict):
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = predict()
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    native_time, native = best_time(lambda: model.predict(X))
+    compiled_time, ours = best_time(lambda: compiled.predict(X, n_threads=n_threads))
+    return {
+        'max_abs_diff': float(np.max(np.abs(native - ours))),
+        'max_rel_diff': float(np.max(np.abs(native - ours) / np.maximum(np.abs(native), 1e-12))),
+        'native_rows_per_s': len(X) / native_time,
+        'compiled_rows_per_s': len(X) / compiled_time,
+        'native_bytes': len(pickle.dumps(model)),
+        'compiled_bytes': compiled.nbytes
+    }
+
+if __name__ == "__main__":
+    import pandas as pd
+    from model_registry import load_bundle, prepare_features
+
+    parser = argparse.ArgumentParser(description="Compare compiled and native tree-ensemble prediction")
+    parser.add_argument('--input', default='/home/ubuntu/data/enhanced_flight_data_with_weather.csv')
+    parser.add_argument('--rows', type=int, default=200000, help="Batch size (input rows are tiled)")
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args()
+
+    bundle = load_bundle()
+    X = prepare_features(bundle, pd.read_csv(args.input))
+    X = X.iloc[np.arange(args.rows) % len(X)]
+
+    print(f"Scoring {len(X)} rows with model version {bundle['version']}")
+    for name, compiled in compile_models(bundle['models']).items():
+        result = benchmark(bundle['models'][name], compiled, X, n_threads=args.threads)
+        print(f"{name}: max |diff| {result['max_abs_diff']:.2e} (relative {result['max_rel_diff']:.1e}), "
+              f"{result['native_rows_per_s']:,.0f} -> {result['compiled_rows_per_s']:,.0f} rows/s, "
+              f"{result['native_bytes'] / 1e6:.1f} -> {result['compiled_bytes'] / 1e6:.1f} MB")
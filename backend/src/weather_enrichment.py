@@ -0,0 +1,165 @@
+import math
+import time
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timezone
+from integrate_metar import get_metar_data, parse_metar_data
+
+def hour_key(when):
+    """
+    Truncate a timestamp to its UTC hour
+
+    Parameters:
+    when (datetime, str or float): Observation time (naive datetimes are treated as UTC)
+
+    Returns:
+    int: Epoch seconds at the start of the hour
+    """
+    if isinstance(when, (int, float)):
+        timestamp = float(when)
+    else:
+        if isinstance(when, str):
+            when = datetime.fromisoformat(when)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        timestamp = when.timestamp()
+    return int(timestamp // 3600 * 3600)
+
+def fetch_station_hour(station, hour):
+    """
+    Blocking fetch of the METAR observation closest to a station/hour
+
+    Parameters:
+    station (str): ICAO station id
+    hour (int): Epoch seconds at the start of the hour
+
+    Returns:
+    dict: Parsed observation (see integrate_metar.parse_metar_data), or None
+    """
+    hours_back = max(1, math.ceil((time.time() - hour) / 3600) + 1)
+    metar_data = get_metar_data([station], hours_back=hours_back)
+    if not metar_data:
+        return None
+
+    observations = parse_metar_data(metar_data)
+    if len(observations) == 0:
+        return None
+    obs_times = observations['observation_time'].astype(float)
+    return observations.loc[(obs_times - hour).abs().idxmin()].to_dict()
+
+class AsyncWeatherEnricher:
+    """
+    Asyncio front end for METAR lookups with single-flight coalescing and an LRU cache
+
+    Concurrent requests for the same (station, hour) share one upstream fetch; every
+    waiter receives the same result. Completed results stay in a small LRU so hot
+    stations are answered from memory. Upstream calls therefore scale with the number of
+    distinct station-hours, not with the number of scoring requests.
+    """
+
+    def __init__(self, fetch=fetch_station_hour, cache_size=512, ttl_seconds=900, max_concurrency=8):
+        self.fetch = fetch
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'upstream_calls': 0, 'errors': 0}
+
+    def _cache_get(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl_seconds:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry
+
+    def _cache_put(self, key, value):
+        self._cache[key] = (time.monotonic(), value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _fetch(self, key):
+        station, hour = key
+        async with self._semaphore:
+            self.stats['upstream_calls'] += 1
+            # The upstream client is blocking; keep it off the event loop
+            return await asyncio.to_thread(self.fetch, station, hour)
+
+    async def _load(self, key):
+        """Fetch one station-hour, cache it and drop it from the in-flight table"""
+        try:
+            result = await self._fetch(key)
+            if result is not None:
+                self._cache_put(key, result)
+            return result
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    @staticmethod
+    def _consume_exception(task):
+        # Mark the exception as retrieved so a fetch with no waiters left does not log a warning
+        if not task.cancelled():
+            task.exception()
+
+    async def get(self, station, when):
+        """
+        Weather observation for a station around a time
+
+        The upstream fetch runs as its own task that every waiter shields, so a cancelled
+        caller (client disconnect, timeout) never strands the others.
+
+        Parameters:
+        station (str): ICAO station id
+        when (datetime, str or float): Time of interest
+
+        Returns:
+        dict: Observation or None when upstream has no data
+        """
+        self.stats['requests'] += 1
+        key = (station.upper(), hour_key(when))
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return cached[1]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats['coalesced'] += 1
+        else:
+            task = asyncio.get_running_loop().create_task(self._load(key))
+            task.add_done_callback(self._consume_exception)
+            self._in_flight[key] = task
+        return await asyncio.shield(task)
+
+    async def enrich(self, requests):
+        """
+        Look up weather for many (station, time) pairs concurrently
+
+        Parameters:
+        requests (list): (station, when) pairs
+
+        Returns:
+        list: Observations (or None) in request order
+        """
+        return await asyncio.gather(*(self.get(station, when) for station, when in requests))
+
+if __name__ == "__main__":
+    # Burst of scoring requests over a handful of airports
+    stations = ['KBDL', 'KLGA', 'KATL', 'KORD'] * 25
+    now = datetime.now(timezone.utc)
+
+    async def main():
+        enricher = AsyncWeatherEnricher()
+        results = await enricher.enrich([(station, now) for station in stations])
+        print(f"Resolved {sum(r is not None for r in results)} of {len(results)} requests")
+        print(f"Enricher stats: {enricher.stats}")
+
+    asyncio.run(main())
@@ -0,0 +1,266 @@
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from simulate_weather_integration import WEATHER_SCENARIOS, FLIGHT_CATEGORY_IMPACT, weather_impact_features
+from wind_components import wind_components, ground_speed_kmh
+from flight_store import FlightStore, RouteGeometry
+from model_registry import prepare_features, predict_with_bundle
+
+SCENARIO_BANDS_PATH = '/home/ubuntu/data/extra_fuel_scenario_bands.csv'
+DEFAULT_PERCENTILES = (5, 50, 95)
+BATCH_ROWS = 262144  # (scenario, flight) rows per predict call; bounds each worker's feature matrix
+PRESSURE_RANGE_MB = (1010, 1025)  # the sea-level pressure range of simulate_metar_data
+
+def draw_airport_weather(n_scenarios, n_airports, scenario_weights=None, seed=None):
+    """
+    Draw n_scenarios weather maps: one observation per airport per scenario
+
+    Each scenario is a joint draw for every airport, so flights sharing an airport see the
+    same weather within a scenario. Parameters follow WEATHER_SCENARIOS as in
+    simulate_metar_data. One extra trailing airport slot holds missing observations and
+    serves flights whose airport code is -1.
+
+    Parameters:
+    n_scenarios (int): Weather scenarios to draw
+    n_airports (int): Airports in the dictionary
+    scenario_weights (dict): Relative frequency of each WEATHER_SCENARIOS key (default: uniform)
+    seed (int): Random seed
+
+    Returns:
+    dict: Observation name -> (n_scenarios, n_airports + 1) array, plus 'scenario' codes
+          indexing list(WEATHER_SCENARIOS)
+    """
+    rng = np.random.default_rng(seed)
+    names = list(WEATHER_SCENARIOS)
+    weights = np.array([(scenario_weights or {}).get(name, 0 if scenario_weights else 1) for name in names], dtype=np.float64)
+    shape = (n_scenarios, n_airports + 1)
+
+    scenario = rng.choice(len(names), size=shape, p=weights / weights.sum()).astype(np.int8)
+
+    def uniform(range_key):
+        low = np.array([WEATHER_SCENARIOS[name][range_key][0] for name in names], dtype=np.float32)[scenario]
+        high = np.array([WEATHER_SCENARIOS[name][range_key][1] for name in names], dtype=np.float32)[scenario]
+        return low + (high - low) * rng.random(shape, dtype=np.float32)
+
+    weather = {
+        'scenario': scenario,
+        'temperature_c': uniform('temp_range'),
+        'wind_speed_kt': uniform('wind_speed_range'),
+        'wind_direction_deg': rng.random(shape, dtype=np.float32) * 360,
+        'visibility_sm': uniform('visibility_range'),
+        'sea_level_pressure_mb': rng.uniform(*PRESSURE_RANGE_MB, size=shape).astype(np.float32),
+        'flight_category_impact': np.array([FLIGHT_CATEGORY_IMPACT[WEATHER_SCENARIOS[name]['flight_category']]
+                                            for name in names], dtype=np.float32)[scenario],
+        'has_present_weather': np.array([bool(WEATHER_SCENARIOS[name]['present_weather'])
+                                         for name in names], dtype=np.float32)[scenario]
+    }
+    for name, values in weather.items():
+        if name == 'scenario':
+            values[:, -1] = -1
+        else:
+            values[:, -1] = 0 if name == 'has_present_weather' else np.nan
+    return weather
+
+class ScenarioSimulator:
+    """
+    Monte Carlo extra-fuel uncertainty for a flight schedule
+
+    The non-weather features of every flight are prepared once. Each batch of scenarios then
+    gathers the drawn airport weather onto the flights by airport code, recomputes the
+    weather-derived and wind features for all (scenario, flight) rows as flat arrays, and
+    scores them with one predict call. Batches run on a thread pool (numpy and the tree
+    libraries release the GIL), and the predictions land in one (scenario, flight) float32
+    matrix from which the percentile bands are taken.
+    """
+
+    def __init__(self, bundle, flights, airports_df, model_name=None):
+        """
+        Parameters:
+        bundle (dict): Loaded model bundle (model_registry.load_bundle)
+        flights (pd.DataFrame): Schedule with Dep_Airport, Arr_Airport and the non-weather
+                                features (missing ones take the training medians)
+        airports_df (pd.DataFrame): Airport coordinates for route distance and courses
+        model_name (str): Model to score with (default: the bundle's best model)
+        """
+        self.bundle = bundle
+        self.model_name = model_name
+        self.feature_names = bundle['feature_names']
+
+        store = FlightStore.from_frame(flights[['Dep_Airport', 'Arr_Airport']])
+        self.n_airports = len(store.dictionary('airport'))
+        self.dep_codes = store.codes('Dep_Airport')
+        self.arr_codes = store.codes('Arr_Airport')
+
+        # Great-circle distance and courses, or the airborne time at 850 km/h where unknown
+        geometry = RouteGeometry(store.dictionary('airport'), airports_df)
+        distance_km, self.initial_bearing, self.final_bearing = geometry.for_store(store)
+        if 'Flight_Duration' in flights.columns:
+            duration_distance = flights['Flight_Duration'].to_numpy(dtype=np.float64) * 850 / 60
+            distance_km = np.where(np.isnan(distance_km), duration_distance, distance_km)
+        self.distance_km = distance_km
+
+        fixed = flights.copy()
+        fixed['Estimated_Distance_km'] = distance_km
+        self.base = prepare_features(bundle, fixed).to_numpy()
+        self.medians = np.array([bundle['feature_medians'].get(name, np.nan) for name in self.feature_names])
+
+    def __len__(self):
+        return len(self.dep_codes)
+
+    def scenario_features(self, weather, start, stop):
+        """
+        Feature matrix of scenarios [start, stop) for every flight
+
+        Returns:
+        np.ndarray: ((stop - start) * n_flights, n_features), scenario-major
+        """
+        n_scenarios = stop - start
+
+        def at(codes):
+            return {name: values[start:stop][:, codes].ravel() for name, values in weather.items()
+                    if name != 'scenario'}
+
+        origin, dest = at(self.dep_codes), at(self.arr_codes)
+        columns = weather_impact_features(origin, dest)
+
+        origin_head, origin_cross = wind_components(origin['wind_speed_kt'], origin['wind_direction_deg'],
+                                                    np.tile(self.initial_bearing, n_scenarios))
+        dest_head, dest_cross = wind_components(dest['wind_speed_kt'], dest['wind_direction_deg'],
+                                                np.tile(self.final_bearing, n_scenarios))
+        columns['avg_headwind_kt'] = (origin_head + dest_head) / 2
+        columns['avg_crosswind_kt'] = (origin_cross + dest_cross) / 2
+        columns['Wind_Adjusted_Flight_Time_hr'] = (np.tile(self.distance_km, n_scenarios) /
+                                                   ground_speed_kmh(columns['avg_headwind_kt'], columns['avg_crosswind_kt']))
+        for name in ['temperature_c', 'wind_speed_kt', 'visibility_sm']:
+            columns['origin_' + name] = origin[name]
+            columns['dest_' + name] = dest[name]
+
+        X = np.tile(self.base, (n_scenarios, 1))
+        for j, name in enumerate(self.feature_names):
+            if name in columns:
+                values = columns[name]
+                X[:, j] = np.where(np.isnan(values), self.medians[j], values)
+        return X
+
+    def _predict_batch(self, weather, start, stop, predictions):
+        X = pd.DataFrame(self.scenario_features(weather, start, stop), columns=self.feature_names, copy=False)
+        predictions[start:stop] = predict_with_bundle(self.bundle, X, self.model_name).reshape(stop - start, len(self))
+
+    def simulate(self, n_scenarios=1000, scenario_weights=None, seed=None, batch_rows=BATCH_ROWS, workers=None):
+        """
+        Predict Extra_Fuel_kg for every flight under n_scenarios drawn weather maps
+
+        Parameters:
+        n_scenarios (int): Weather scenarios per flight
+        scenario_weights (dict): Relative frequency of each WEATHER_SCENARIOS key
+        seed (int): Random seed
+        batch_rows (int): (scenario, flight) rows per predict call
+        workers (int): Batches scored concurrently (default: CPU count)
+
+        Returns:
+        np.ndarray: (n_scenarios, n_flights) float32 predictions
+        """
+        weather = draw_airport_weather(n_scenarios, self.n_airports, scenario_weights, seed)
+        predictions = np.empty((n_scenarios, len(self)), dtype=np.float32)
+        per_batch = max(1, batch_rows // max(len(self), 1))
+        batches = [(start, min(start + per_batch, n_scenarios)) for start in range(0, n_scenarios, per_batch)]
+
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(lambda batch: self._predict_batch(weather, *batch, predictions), batches))
+        else:
+            for start, stop in batches:
+                self._predict_batch(weather, start, stop, predictions)
+        return predictions
+
+    def bands(self, predictions, percentiles=DEFAULT_PERCENTILES):
+        """
+        Per-flight summary of scenario predictions
+
+        Returns:
+        pd.DataFrame: Extra_Fuel_Mean_kg, Extra_Fuel_Std_kg and one Extra_Fuel_P<q>_kg
+                      column per percentile, one row per flight
+        """
+        summary = {
+            'Extra_Fuel_Mean_kg': predictions.mean(axis=0),
+            'Extra_Fuel_Std_kg': predictions.std(axis=0)
+        }
+        for q, values in zip(percentiles, np.percentile(predictions, percentiles, axis=0)):
+            summary[f'Extra_Fuel_P{q:g}_kg'] = values
+        return pd.DataFrame(summary)
+
+def simulate_extra_fuel_bands(bundle, flights, airports_df, n_scenarios=1000, percentiles=DEFAULT_PERCENTILES,
+                              model_name=None, **options):
+    """
+    Extra-fuel percentile bands per flight from Monte Carlo weather scenarios
+
+    Parameters:
+    bundle (dict): Loaded model bundle
+    flights (pd.DataFrame): Flight schedule (see ScenarioSimulator)
+    airports_df (pd.DataFrame): Airport coordinates
+    n_scenarios (int): Weather scenarios per flight
+    percentiles (tuple): Percentiles to report
+    options: scenario_weights, seed, batch_rows and workers of ScenarioSimulator.simulate
+
+    Returns:
+    pd.DataFrame: The flights' index with the band columns
+    """
+    simulator = ScenarioSimulator(bundle, flights, airports_df, model_name)
+    bands = simulator.bands(simulator.simulate(n_scenarios, **options), percentiles)
+    bands.index = flights.index
+    return bands
+
+if __name__ == "__main__":
+    from model_registry import load_bundle
+    from aircraft_registry import AircraftRegistry, REGISTRY_PATH
+    from fuel_rates import add_baseline_fuel
+
+    parser = argparse.ArgumentParser(description="Monte Carlo extra-fuel uncertainty bands for a day's schedule")
+    parser.add_argument('--input', default='/home/ubuntu/data/enhanced_flight_data_with_weather.csv')
+    parser.add_argument('--output', default=SCENARIO_BANDS_PATH)
+    parser.add_argument('--date', help="FlightDate to simulate (default: the busiest day)")
+    parser.add_argument('--flights', type=int, help="Tile the day's schedule to this many flights (for timing)")
+    parser.add_argument('--scenarios', type=int, default=1000, help="Weather scenarios per flight")
+    parser.add_argument('--percentiles', type=float, nargs='+', default=list(DEFAULT_PERCENTILES))
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS, help="(scenario, flight) rows per predict call")
+    parser.add_argument('--workers', type=int, help="Batches scored concurrently (default: CPU count)")
+    parser.add_argument('--model', help="Model name (default: the bundle's best model)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    bundle = load_bundle()
+    flights = pd.read_csv(args.input)
+    date = args.date or flights['FlightDate'].value_counts().idxmax()
+    flights = flights[flights['FlightDate'] == date].reset_index(drop=True)
+    if args.flights:
+        flights = flights.iloc[np.resize(np.arange(len(flights)), args.flights)].reset_index(drop=True)
+    airports_df = pd.read_csv('/home/ubuntu/data/airports_geolocation.csv')
+
+    # Aircraft fuel-rate features as in training (the registry falls back to this schedule's tails)
+    registry = AircraftRegistry.load() if os.path.exists(REGISTRY_PATH) else AircraftRegistry.from_flights(flights)
+    flights = add_baseline_fuel(flights, registry)
+
+    print(f"Simulating {args.scenarios} weather scenarios for {len(flights)} flights on {date} "
+          f"with {args.model or bundle['best_model']} (version {bundle['version']})")
+    start = time.perf_counter()
+    simulator = ScenarioSimulator(bundle, flights, airports_df, args.model)
+    prepared = time.perf_counter()
+    predictions = simulator.simulate(args.scenarios, seed=args.seed, batch_rows=args.batch_rows, workers=args.workers)
+    simulated = time.perf_counter()
+    bands = simulator.bands(predictions, tuple(args.percentiles))
+    done = time.perf_counter()
+
+    rows = predictions.size
+    print(f"Prepare: {prepared - start:.2f}s, simulate + predict: {simulated - prepared:.2f}s "
+          f"({rows / (simulated - prepared) / 1e6:.2f}M scenario-flights/s), bands: {done - simulated:.2f}s")
+
+    point = predict_with_bundle(bundle, prepare_features(bundle, flights), args.model)
+    result = pd.concat([flights[['FlightDate', 'Airline', 'Tail_Number', 'Dep_Airport', 'Arr_Airport']], bands], axis=1)
+    result['Extra_Fuel_Point_kg'] = point
+    result.to_csv(args.output, index=False)
+    print(f"Saved per-flight bands to {args.output}")
+    print(result.describe().T[['mean', 'min', 'max']])
@@ -0,0 +1,122 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+KT_TO_KMH = 1.852
+CRUISE_TRUE_AIRSPEED_KMH = 850  # km/h, the same general jet cruise assumption as estimate_fuel.py
+MIN_GROUND_SPEED_FRACTION = 0.5  # ground speed floor as a share of true airspeed
+
+WIND_FEATURE_COLUMNS = [
+    'Route_Bearing_deg',
+    'origin_headwind_kt',
+    'origin_crosswind_kt',
+    'dest_headwind_kt',
+    'dest_crosswind_kt',
+    'avg_headwind_kt',
+    'avg_crosswind_kt',
+    'Wind_Ground_Speed_kmh',
+    'Wind_Adjusted_Flight_Time_hr'
+]
+
+def wind_components(speed_kt, from_deg, course_deg):
+    """
+    Headwind and crosswind components of a reported wind relative to a course
+
+    METAR directions give where the wind blows from, so a wind from the course heading is a
+    full headwind. Calm, missing and variable (VRB, non-numeric) directions have no usable
+    direction and contribute zero components.
+
+    Parameters:
+    speed_kt (array-like): Wind speed in knots
+    from_deg (array-like): Wind direction in degrees (may contain 'VRB' or NaN)
+    course_deg (np.ndarray): Aircraft course in degrees
+
+    Returns:
+    tuple: (headwind kt, positive against the aircraft; crosswind kt, positive from the right)
+    """
+    speed = np.nan_to_num(pd.to_numeric(pd.Series(speed_kt, copy=False), errors='coerce').to_numpy(dtype=np.float64))
+    direction = pd.to_numeric(pd.Series(from_deg, copy=False), errors='coerce').to_numpy(dtype=np.float64)
+    angle = np.radians(direction - course_deg)
+    usable = ~np.isnan(angle)
+    headwind = np.where(usable, speed * np.cos(angle), 0.0)
+    crosswind = np.where(usable, speed * np.sin(angle), 0.0)
+    return headwind, crosswind
+
+def ground_speed_kmh(headwind_kt, crosswind_kt, true_airspeed_kmh=CRUISE_TRUE_AIRSPEED_KMH):
+    """
+    Ground speed along the course from the wind triangle
+
+    The aircraft crabs into the crosswind (losing sqrt(TAS² - XW²) of along-track airspeed)
+    and the headwind is subtracted. Ground speed is floored at MIN_GROUND_SPEED_FRACTION of
+    the airspeed so bad wind reports cannot produce absurd flight times.
+    """
+    crosswind = np.asarray(crosswind_kt, dtype=np.float64) * KT_TO_KMH
+    headwind = np.asarray(headwind_kt, dtype=np.float64) * KT_TO_KMH
+    along_track = np.sqrt(np.maximum(true_airspeed_kmh ** 2 - crosswind ** 2, 0))
+    return np.maximum(along_track - headwind, MIN_GROUND_SPEED_FRACTION * true_airspeed_kmh)
+
+def add_wind_features(flights, distance_km, initial_bearing_deg, final_bearing_deg,
+                      true_airspeed_kmh=CRUISE_TRUE_AIRSPEED_KMH):
+    """
+    Add head/crosswind components and a wind-adjusted flight time in one array pass
+
+    Origin winds are resolved against the departure course and destination winds against
+    the arrival course; the route wind is their mean, applied to the cruise airspeed.
+
+    Parameters:
+    flights (pd.DataFrame): Flights with origin_/dest_wind_speed_kt and origin_/dest_wind_direction_deg
+    distance_km (np.ndarray): Great-circle distance per flight (e.g. from RouteGeometry)
+    initial_bearing_deg (np.ndarray): Course at departure per flight
+    final_bearing_deg (np.ndarray): Course at arrival per flight
+    true_airspeed_kmh (float): Cruise true airspeed
+
+    Returns:
+    pd.DataFrame: The same DataFrame with WIND_FEATURE_COLUMNS added
+    """
+    def column(name):
+        return flights[name] if name in flights.columns else np.nan
+
+    origin_head, origin_cross = wind_components(column('origin_wind_speed_kt'), column('origin_wind_direction_deg'),
+                                                initial_bearing_deg)
+    dest_head, dest_cross = wind_components(column('dest_wind_speed_kt'), column('dest_wind_direction_deg'),
+                                            final_bearing_deg)
+    avg_head = (origin_head + dest_head) / 2
+    avg_cross = (origin_cross + dest_cross) / 2
+    speed = ground_speed_kmh(avg_head, avg_cross, true_airspeed_kmh)
+
+    flights['Route_Bearing_deg'] = initial_bearing_deg
+    flights['origin_headwind_kt'] = origin_head
+    flights['origin_crosswind_kt'] = origin_cross
+    flights['dest_headwind_kt'] = dest_head
+    flights['dest_crosswind_kt'] = dest_cross
+    flights['avg_headwind_kt'] = avg_head
+    flights['avg_crosswind_kt'] = avg_cross
+    flights['Wind_Ground_Speed_kmh'] = speed
+    flights['Wind_Adjusted_Flight_Time_hr'] = np.asarray(distance_km, dtype=np.float64) / speed
+    return flights
+
+if __name__ == "__main__":
+    from flight_store import FlightStore, RouteGeometry
+
+    parser = argparse.ArgumentParser(description="Time the wind-component stage on the enhanced flight data")
+    parser.add_argument('--rows', type=int, default=2000000, help="Flights to process (the data is tiled to this size)")
+    args = parser.parse_args()
+
+    flights = pd.read_csv('/home/ubuntu/data/enhanced_flight_data_with_weather.csv')
+    airports_df = pd.read_csv('/home/ubuntu/data/airports_geolocation.csv')
+    flights = flights.iloc[np.resize(np.arange(len(flights)), args.rows)].reset_index(drop=True)
+
+    start = time.perf_counter()
+    store = FlightStore.from_frame(flights[['Dep_Airport', 'Arr_Airport']])
+    encoded = time.perf_counter()
+    geometry = RouteGeometry(store.dictionary('airport'), airports_df)
+    distance, initial, final = geometry.for_store(store)
+    routed = time.perf_counter()
+    add_wind_features(flights, distance, initial, final)
+    done = time.perf_counter()
+
+    print(f"{len(flights)} flights over {len(geometry)} distinct routes")
+    print(f"Encode airports: {encoded - start:.2f}s, route geometry: {routed - encoded:.2f}s, "
+          f"wind components: {done - routed:.2f}s ({(done - encoded) / len(flights) * 1e9:.0f} ns per flight)")
+    print(flights[WIND_FEATURE_COLUMNS].describe().T[['mean', 'min', 'max']])
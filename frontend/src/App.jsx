@@ -1,310 +1,649 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import './App.css';
 
-const App = () => {
-  const [currentSlide, setCurrentSlide] = useState(0);
+// Precomputed aggregates published by the backend after each training run (report_data.py)
+const REPORT_API = '/api/report';
+const MANIFEST_POLL_MS = 30000;
+// Report version while the manifest is 404: no training run has published aggregates yet
+const NO_REPORT = 'none';
+const WEATHER_FEATURE_PATTERN = /temp|wind|visibility|flight_category|pressure|weather/i;
 
-  const slides = [
-    {
-      id: 'introduction',
-      title: 'Aviation Extra Fuel Prediction Analysis',
-      subtitle: 'Deep Learning Approach with Weather Integration',
-      content: (
-        <div className="slide-content">
-          <div className="intro-grid">
-            <div className="intro-text">
-              <h3>🎯 Project Objectives</h3>
-              <div className="objective-cards">
-                <div className="objective-card">
-                  <div className="card-icon">📊</div>
-                  <div className="card-content">
-                    <h4>Data Analysis</h4>
-                    <p>Comprehensive analysis of aviation fuel consumption patterns using real flight data</p>
-                  </div>
-                </div>
-                <div className="objective-card">
-                  <div className="card-icon">🌤️</div>
-                  <div className="card-content">
-                    <h4>Weather Integration</h4>
-                    <p>Incorporate METAR weather data to enhance prediction accuracy</p>
-                  </div>
-                </div>
-                <div className="objective-card">
-                  <div className="card-icon">🤖</div>
-                  <div className="card-content">
-                    <h4>ML Models</h4>
-                    <p>Develop and compare multiple machine learning algorithms for optimal performance</p>
-                  </div>
-                </div>
+// One request per aggregate and report version, shared by every slide that shows it
+const reportRequests = new Map();
+
+const fetchReport = (name, version) => {
+  const key = `${name}@${version}`;
+  if (!reportRequests.has(key)) {
+    const request = fetch(`${REPORT_API}/${name}`, { cache: 'no-cache' })
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`${name}: HTTP ${response.status}`);
+        }
+        return response.json();
+      })
+      .catch((error) => {
+        reportRequests.delete(key);
+        throw error;
+      });
+    reportRequests.set(key, request);
+  }
+  return reportRequests.get(key);
+};
+
+// Polls the manifest; its version changes whenever training publishes new aggregates
+// (NO_REPORT until the first run; other failures keep the last version and retry)
+const useReportVersion = () => {
+  const [version, setVersion] = useState(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    const poll = () => {
+      fetch(`${REPORT_API}/manifest`, { cache: 'no-cache' })
+        .then((response) => {
+          if (response.status === 404) {
+            return NO_REPORT;
+          }
+          return response.ok ? response.json() : null;
+        })
+        .then((manifest) => {
+          if (cancelled || !manifest) {
+            return;
+          }
+          setVersion(manifest === NO_REPORT ? NO_REPORT : `${manifest.model_version}:${manifest.generated_at}`);
+        })
+        .catch(() => {});
+    };
+    poll();
+    const timer = setInterval(poll, MANIFEST_POLL_MS);
+    return () => {
+      cancelled = true;
+      clearInterval(timer);
+    };
+  }, []);
+
+  return version;
+};
+
+// Loads an aggregate when the slide using it is first shown (and again after a new run)
+const useReport = (name, version) => {
+  const [state, setState] = useState({ data: null, error: null, missing: false });
+
+  useEffect(() => {
+    if (version === null) {
+      return undefined;
+    }
+    if (version === NO_REPORT) {
+      setState({ data: null, error: null, missing: true });
+      return undefined;
+    }
+    let cancelled = false;
+    setState((previous) => (previous.missing ? { data: null, error: null, missing: false } : previous));
+    fetchReport(name, version)
+      .then((data) => !cancelled && setState({ data, error: null, missing: false }))
+      .catch((error) => !cancelled && setState((previous) => ({ ...previous, error })));
+    return () => {
+      cancelled = true;
+    };
+  }, [name, version]);
+
+  return state;
+};
+
+const formatNumber = (value, digits = 1) => (
+  value === null || value === undefined
+    ? '–'
+    : value.toLocaleString('en-US', { minimumFractionDigits: digits, maximumFractionDigits: digits })
+);
+
+const featureLabel = (feature) => feature.replace(/_/g, ' ');
+
+const ReportStatus = ({ reports }) => {
+  if (reports.some((report) => report.missing)) {
+    return <div className="report-status">No report published yet. Run <code>train_weather_enhanced_models.py</code> to generate it.</div>;
+  }
+  const error = reports.find((report) => report.error);
+  if (error) {
+    return <div className="report-status error">Report data unavailable ({error.error.message})</div>;
+  }
+  if (reports.some((report) => !report.data)) {
+    return <div className="report-status">Loading report data…</div>;
+  }
+  return null;
+};
+
+const FeatureBars = ({ features, value, label }) => {
+  const top = Math.max(...features.map(value), 0) || 1;
+  return (
+    <div className="feature-list">
+      {features.map((feature) => (
+        <div className="feature-item" key={feature.feature}>
+          <div className="feature-bar" style={{ width: `${(value(feature) / top) * 100}%` }}></div>
+          <span className="feature-name">{label(feature)}</span>
+        </div>
+      ))}
+    </div>
+  );
+};
+
+const ExtraFuelHistogram = ({ histogram }) => {
+  const { edges, counts } = histogram;
+  const width = 300;
+  const height = 160;
+  const top = Math.max(...counts, 1);
+  const barWidth = width / Math.max(counts.length, 1);
+  return (
+    <figure className="chart">
+      <svg className="chart-svg" viewBox={`0 0 ${width} ${height + 20}`} role="img" aria-label="Extra fuel distribution">
+        {counts.map((count, index) => (
+          <rect
+            key={index}
+            className="chart-bar"
+            x={index * barWidth + 1}
+            y={height - (count / top) * height}
+            width={Math.max(barWidth - 2, 1)}
+            height={(count / top) * height}
+          >
+            <title>{`${formatNumber(edges[index], 0)}–${formatNumber(edges[index + 1], 0)} kg: ${count} flights`}</title>
+          </rect>
+        ))}
+        <text className="chart-axis" x="0" y={height + 15}>{formatNumber(edges[0], 0)} kg</text>
+        <text className="chart-axis" x={width} y={height + 15} textAnchor="end">{formatNumber(edges[edges.length - 1], 0)} kg</text>
+      </svg>
+      <figcaption>Extra fuel per flight</figcaption>
+    </figure>
+  );
+};
+
+const PredictionVsActualChart = ({ data }) => {
+  const size = 300;
+  const [low, high] = data.range;
+  const cell = size / data.bins;
+  const scale = (value) => ((value - low) / (high - low || 1)) * size;
+  const maxCount = Math.max(...data.cells.map(([, , count]) => count), 1);
+  const calibration = data.calibration
+    .map(([actual, predicted]) => `${scale(actual)},${size - scale(predicted)}`)
+    .join(' ');
+  return (
+    <figure className="chart">
+      <svg className="chart-svg" viewBox={`0 0 ${size} ${size + 20}`} role="img" aria-label="Prediction vs actual">
+        {data.cells.map(([actualBin, predictedBin, count]) => (
+          <rect
+            key={`${actualBin}-${predictedBin}`}
+            className="chart-cell"
+            x={actualBin * cell}
+            y={size - (predictedBin + 1) * cell}
+            width={cell}
+            height={cell}
+            opacity={0.15 + 0.85 * (Math.log1p(count) / Math.log1p(maxCount))}
+          >
+            <title>{`${count} flights`}</title>
+          </rect>
+        ))}
+        <line className="chart-diagonal" x1="0" y1={size} x2={size} y2="0" />
+        <polyline className="chart-line" points={calibration} />
+        <text className="chart-axis" x="0" y={size + 15}>{formatNumber(low, 0)} kg</text>
+        <text className="chart-axis" x={size} y={size + 15} textAnchor="end">{formatNumber(high, 0)} kg</text>
+      </svg>
+      <figcaption>
+        Predicted vs actual extra fuel – {data.model}, {data.rows.toLocaleString('en-US')} test flights
+        (R² {formatNumber(data.R2, 3)}, MAE {formatNumber(data.MAE, 1)} kg)
+      </figcaption>
+    </figure>
+  );
+};
+
+const AircraftFuelTable = ({ data, limit = 8 }) => (
+  <div className="performance-table aircraft-table">
+    <table>
+      <thead>
+        <tr>
+          <th>Aircraft</th>
+          <th>Flights</th>
+          <th>Baseline (kg)</th>
+          <th>Extra (kg)</th>
+          <th>P90 extra (kg)</th>
+          <th>Test MAE (kg)</th>
+        </tr>
+      </thead>
+      <tbody>
+        {data.aircraft.slice(0, limit).map((row) => (
+          <tr key={row.aircraft_type}>
+            <td>{row.aircraft_type}</td>
+            <td>{row.flights.toLocaleString('en-US')}</td>
+            <td>{formatNumber(row.mean_baseline_fuel_kg, 0)}</td>
+            <td>{formatNumber(row.mean_extra_fuel_kg, 0)}</td>
+            <td>{formatNumber(row.p90_extra_fuel_kg, 0)}</td>
+            <td>{formatNumber(row.test_mae_kg, 1)}</td>
+          </tr>
+        ))}
+      </tbody>
+    </table>
+  </div>
+);
+
+const IntroductionSlide = ({ version }) => {
+  const summary = useReport('summary', version);
+  const metrics = useReport('metrics', version);
+  return (
+    <div className="slide-content">
+      <div className="intro-grid">
+        <div className="intro-text">
+          <h3>🎯 Project Objectives</h3>
+          <div className="objective-cards">
+            <div className="objective-card">
+              <div className="card-icon">📊</div>
+              <div className="card-content">
+                <h4>Data Analysis</h4>
+                <p>Comprehensive analysis of aviation fuel consumption patterns using real flight data</p>
+              </div>
+            </div>
+            <div className="objective-card">
+              <div className="card-icon">🌤️</div>
+              <div className="card-content">
+                <h4>Weather Integration</h4>
+                <p>Incorporate METAR weather data to enhance prediction accuracy</p>
               </div>
             </div>
-            <div className="intro-visual">
-              <div className="aircraft-icon">✈️</div>
-              <div className="fuel-metrics">
-                <div className="metric">
-                  <span className="metric-value">1000+</span>
-                  <span className="metric-label">Flight Records</span>
-                </div>
-                <div className="metric">
-                  <span className="metric-value">50+</span>
-                  <span className="metric-label">Airports</span>
-                </div>
-                <div className="metric">
-                  <span className="metric-value">4</span>
-                  <span className="metric-label">ML Models</span>
-                </div>
+            <div className="objective-card">
+              <div className="card-icon">🤖</div>
+              <div className="card-content">
+                <h4>ML Models</h4>
+                <p>Develop and compare multiple machine learning algorithms for optimal performance</p>
               </div>
             </div>
           </div>
         </div>
-      )
-    },
-    {
-      id: 'data_methodology',
-      title: 'Data Acquisition & Methodology',
-      content: (
-        <div className="slide-content">
-          <div className="methodology-grid">
-            <div className="data-sources">
-              <h3>📋 Data Sources</h3>
-              <div className="source-cards">
-                <div className="source-card primary">
-                  <h4>🛫 US 2023 Civil Flights</h4>
-                  <p>Comprehensive flight data including delays, routes, and aircraft information</p>
-                  <div className="source-stats">
-                    <span>1000+ flights analyzed</span>
-                  </div>
-                </div>
-                <div className="source-card secondary">
-                  <h4>🌦️ METAR Weather Data</h4>
-                  <p>Real-time meteorological observations from airports worldwide</p>
-                  <div className="source-stats">
-                    <span>Temperature, Wind, Visibility, Pressure</span>
-                  </div>
-                </div>
-                <div className="source-card tertiary">
-                  <h4>⛽ Aircraft Fuel Consumption</h4>
-                  <p>Fuel burn rates by aircraft type and operational conditions</p>
-                  <div className="source-stats">
-                    <span>Multiple aircraft models</span>
-                  </div>
-                </div>
+        <div className="intro-visual">
+          <div className="aircraft-icon">✈️</div>
+          <div className="fuel-metrics">
+            <div className="metric">
+              <span className="metric-value">{summary.data ? summary.data.flights.toLocaleString('en-US') : '–'}</span>
+              <span className="metric-label">Flight Records</span>
+            </div>
+            <div className="metric">
+              <span className="metric-value">{summary.data ? summary.data.airports : '–'}</span>
+              <span className="metric-label">Airports</span>
+            </div>
+            <div className="metric">
+              <span className="metric-value">{metrics.data ? metrics.data.models.length : '–'}</span>
+              <span className="metric-label">ML Models</span>
+            </div>
+          </div>
+          <ReportStatus reports={[summary, metrics]} />
+        </div>
+      </div>
+    </div>
+  );
+};
+
+const DataMethodologySlide = ({ version }) => {
+  const summary = useReport('summary', version);
+  return (
+    <div className="slide-content">
+      <div className="methodology-grid">
+        <div className="data-sources">
+          <h3>📋 Data Sources</h3>
+          <div className="source-cards">
+            <div className="source-card primary">
+              <h4>🛫 US 2023 Civil Flights</h4>
+              <p>Comprehensive flight data including delays, routes, and aircraft information</p>
+              <div className="source-stats">
+                <span>
+                  {summary.data
+                    ? `${summary.data.flights.toLocaleString('en-US')} flights analyzed (${summary.data.first_date} – ${summary.data.last_date})`
+                    : 'Flights analyzed'}
+                </span>
               </div>
             </div>
-            <div className="methodology-flow">
-              <h3>🔄 Processing Pipeline</h3>
-              <div className="flow-steps">
-                <div className="flow-step">
-                  <div className="step-number">1</div>
-                  <div className="step-content">
-                    <h4>Data Collection</h4>
-                    <p>Gather flight records and weather observations</p>
-                  </div>
-                </div>
-                <div className="flow-arrow">→</div>
-                <div className="flow-step">
-                  <div className="step-number">2</div>
-                  <div className="step-content">
-                    <h4>Feature Engineering</h4>
-                    <p>Create weather impact scores and fuel estimates</p>
-                  </div>
-                </div>
-                <div className="flow-arrow">→</div>
-                <div className="flow-step">
-                  <div className="step-number">3</div>
-                  <div className="step-content">
-                    <h4>Model Training</h4>
-                    <p>Train and evaluate multiple ML algorithms</p>
-                  </div>
-                </div>
+            <div className="source-card secondary">
+              <h4>🌦️ METAR Weather Data</h4>
+              <p>Real-time meteorological observations from airports worldwide</p>
+              <div className="source-stats">
+                <span>Temperature, Wind, Visibility, Pressure</span>
+              </div>
+            </div>
+            <div className="source-card tertiary">
+              <h4>⛽ Aircraft Fuel Consumption</h4>
+              <p>Fuel burn rates by aircraft type and operational conditions</p>
+              <div className="source-stats">
+                <span>{summary.data ? `${summary.data.aircraft_types} aircraft models` : 'Multiple aircraft models'}</span>
               </div>
             </div>
           </div>
         </div>
-      )
-    },
-    {
-      id: 'exploratory_data_analysis',
-      title: 'Exploratory Data Analysis',
-      content: (
-        <div className="slide-content">
-          <div className="eda-grid">
-            <div className="eda-insights">
-              <h3>🔍 Key Insights</h3>
-              <div className="insight-cards">
-                <div className="insight-card fuel">
-                  <div className="insight-icon">⛽</div>
-                  <div className="insight-data">
-                    <h4>Fuel Consumption</h4>
-                    <p>Average baseline: <strong>1,722.5 kg</strong></p>
-                    <p>Weather impact: <strong>+211.3 kg</strong></p>
-                  </div>
-                </div>
-                <div className="insight-card weather">
-                  <div className="insight-icon">🌪️</div>
-                  <div className="insight-data">
-                    <h4>Weather Impact</h4>
-                    <p>Range: <strong>48.7 - 675.7 kg</strong></p>
-                    <p>Average increase: <strong>12.3%</strong></p>
-                  </div>
-                </div>
-                <div className="insight-card distance">
-                  <div className="insight-icon">📏</div>
-                  <div className="insight-data">
-                    <h4>Distance Factor</h4>
-                    <p>Most important predictor</p>
-                    <p>Accounts for <strong>24.5%</strong> of variance</p>
-                  </div>
-                </div>
+        <div className="methodology-flow">
+          <h3>🔄 Processing Pipeline</h3>
+          <div className="flow-steps">
+            <div className="flow-step">
+              <div className="step-number">1</div>
+              <div className="step-content">
+                <h4>Data Collection</h4>
+                <p>Gather flight records and weather observations</p>
               </div>
             </div>
-            <div className="eda-visualizations">
-              <h3>📊 Data Visualizations</h3>
-              <div className="viz-container">
-                <img src="/assets/fuel_distribution.png" alt="Fuel Distribution" className="viz-image" />
-                <img src="/assets/fuel_vs_distance.png" alt="Fuel vs Distance" className="viz-image" />
+            <div className="flow-arrow">→</div>
+            <div className="flow-step">
+              <div className="step-number">2</div>
+              <div className="step-content">
+                <h4>Feature Engineering</h4>
+                <p>Create weather impact scores and fuel estimates</p>
+              </div>
+            </div>
+            <div className="flow-arrow">→</div>
+            <div className="flow-step">
+              <div className="step-number">3</div>
+              <div className="step-content">
+                <h4>Model Training</h4>
+                <p>Train and evaluate multiple ML algorithms</p>
               </div>
             </div>
           </div>
         </div>
-      )
-    },
-    {
-      id: 'model_development_evaluation',
-      title: 'Machine Learning Model Development & Evaluation',
-      content: (
-        <div className="slide-content">
-          <div className="model-grid">
-            <div className="model-comparison">
-              <h3>🏆 Model Performance Comparison</h3>
-              <div className="performance-table">
-                <table>
-                  <thead>
-                    <tr>
-                      <th>Model</th>
-                      <th>R² Score</th>
-                      <th>MAE (kg)</th>
-                      <th>RMSE (kg)</th>
-                    </tr>
-                  </thead>
-                  <tbody>
-                    <tr className="best-model">
-                      <td><strong>LightGBM</strong> 🥇</td>
-                      <td><strong>0.975</strong></td>
-                      <td><strong>5.79</strong></td>
-                      <td><strong>14.83</strong></td>
-                    </tr>
-                    <tr>
-                      <td>XGBoost</td>
-                      <td>0.965</td>
-                      <td>6.16</td>
-                      <td>17.41</td>
-                    </tr>
-                    <tr>
-                      <td>Random Forest</td>
-                      <td>0.965</td>
-                      <td>6.72</td>
-                      <td>17.45</td>
+      </div>
+    </div>
+  );
+};
+
+const ExploratoryAnalysisSlide = ({ version }) => {
+  const summary = useReport('summary', version);
+  const importance = useReport('feature_importance', version);
+  const aircraft = useReport('aircraft', version);
+  const stats = summary.data;
+  const distance = importance.data && importance.data.random_forest.find((item) => item.feature === 'Estimated_Distance_km');
+  const distanceRank = importance.data ? importance.data.random_forest.indexOf(distance) + 1 : 0;
+  return (
+    <div className="slide-content">
+      <div className="eda-grid">
+        <div className="eda-insights">
+          <h3>🔍 Key Insights</h3>
+          <div className="insight-cards">
+            <div className="insight-card fuel">
+              <div className="insight-icon">⛽</div>
+              <div className="insight-data">
+                <h4>Fuel Consumption</h4>
+                <p>Average baseline: <strong>{stats ? `${formatNumber(stats.mean_baseline_fuel_kg)} kg` : '–'}</strong></p>
+                <p>Weather impact: <strong>{stats ? `+${formatNumber(stats.mean_extra_fuel_kg)} kg` : '–'}</strong></p>
+              </div>
+            </div>
+            <div className="insight-card weather">
+              <div className="insight-icon">🌪️</div>
+              <div className="insight-data">
+                <h4>Weather Impact</h4>
+                <p>Range: <strong>{stats ? `${formatNumber(stats.min_extra_fuel_kg)} - ${formatNumber(stats.max_extra_fuel_kg)} kg` : '–'}</strong></p>
+                <p>Average increase: <strong>{stats ? `${formatNumber(stats.mean_extra_fuel_pct)}%` : '–'}</strong></p>
+              </div>
+            </div>
+            <div className="insight-card distance">
+              <div className="insight-icon">📏</div>
+              <div className="insight-data">
+                <h4>Distance Factor</h4>
+                <p>{distance ? `Predictor #${distanceRank} (Random Forest)` : 'Route distance'}</p>
+                <p>Accounts for <strong>{distance ? `${formatNumber(distance.share * 100)}%` : '–'}</strong> of importance</p>
+              </div>
+            </div>
+          </div>
+        </div>
+        <div className="eda-visualizations">
+          <h3>📊 Data Visualizations</h3>
+          <div className="viz-container">
+            {stats && <ExtraFuelHistogram histogram={stats.extra_fuel_histogram} />}
+            {aircraft.data && <AircraftFuelTable data={aircraft.data} limit={6} />}
+          </div>
+          <ReportStatus reports={[summary, importance, aircraft]} />
+        </div>
+      </div>
+    </div>
+  );
+};
+
+const ModelEvaluationSlide = ({ version }) => {
+  const metrics = useReport('metrics', version);
+  const importance = useReport('feature_importance', version);
+  const predictions = useReport('prediction_vs_actual', version);
+  return (
+    <div className="slide-content">
+      <div className="model-grid">
+        <div className="model-comparison">
+          <h3>🏆 Model Performance Comparison</h3>
+          <div className="performance-table">
+            <table>
+              <thead>
+                <tr>
+                  <th>Model</th>
+                  <th>R² Score</th>
+                  <th>MAE (kg)</th>
+                  <th>RMSE (kg)</th>
+                </tr>
+              </thead>
+              <tbody>
+                {metrics.data && metrics.data.models.map(({ model, test }) => (
+                  model === metrics.data.best_model ? (
+                    <tr className="best-model" key={model}>
+                      <td><strong>{model}</strong> 🥇</td>
+                      <td><strong>{formatNumber(test.R2, 3)}</strong></td>
+                      <td><strong>{formatNumber(test.MAE, 2)}</strong></td>
+                      <td><strong>{formatNumber(test.RMSE, 2)}</strong></td>
                     </tr>
-                    <tr>
-                      <td>Linear Regression</td>
-                      <td>0.907</td>
-                      <td>21.71</td>
-                      <td>28.57</td>
+                  ) : (
+                    <tr key={model}>
+                      <td>{model}</td>
+                      <td>{formatNumber(test.R2, 3)}</td>
+                      <td>{formatNumber(test.MAE, 2)}</td>
+                      <td>{formatNumber(test.RMSE, 2)}</td>
                     </tr>
-                  </tbody>
-                </table>
-              </div>
+                  )
+                ))}
+              </tbody>
+            </table>
+          </div>
+        </div>
+        <div className="model-features">
+          <h3>🎯 Top Feature Importance</h3>
+          {importance.data && (
+            <FeatureBars
+              features={importance.data.random_forest.slice(0, 5)}
+              value={(item) => item.share}
+              label={(item) => `${featureLabel(item.feature)} (${formatNumber(item.share * 100)}%)`}
+            />
+          )}
+        </div>
+      </div>
+      <div className="model-visualizations">
+        {predictions.data && <PredictionVsActualChart data={predictions.data} />}
+        <ReportStatus reports={[metrics, importance, predictions]} />
+      </div>
+    </div>
+  );
+};
+
+const WeatherEnhancementSlide = ({ version }) => {
+  const summary = useReport('summary', version);
+  const metrics = useReport('metrics', version);
+  const importance = useReport('feature_importance', version);
+  const best = metrics.data && metrics.data.models.find(({ model }) => model === metrics.data.best_model);
+  const weatherFeatures = importance.data
+    ? (importance.data.contributions || importance.data.random_forest)
+      .filter((item) => WEATHER_FEATURE_PATTERN.test(item.feature))
+    : [];
+  const contributions = Boolean(importance.data && importance.data.contributions);
+  return (
+    <div className="slide-content">
+      <div className="weather-grid">
+        <div className="weather-impact">
+          <h3>🌤️ Weather Integration Impact</h3>
+          <div className="impact-metrics">
+            <div className="impact-card dramatic">
+              <div className="impact-value">{best ? `${formatNumber(best.test.R2 * 100)}%` : '–'}</div>
+              <div className="impact-label">R² Score Achieved</div>
+              <div className="impact-description">{best ? `${best.model} on the test set` : 'Best model on the test set'}</div>
+            </div>
+            <div className="impact-card significant">
+              <div className="impact-value">{best ? `${formatNumber(best.test.MAE, 2)}kg` : '–'}</div>
+              <div className="impact-label">Mean Absolute Error</div>
+              <div className="impact-description">Per-flight extra fuel error</div>
             </div>
-            <div className="model-features">
-              <h3>🎯 Top Feature Importance</h3>
-              <div className="feature-list">
-                <div className="feature-item">
-                  <div className="feature-bar" style={{width: '100%'}}></div>
-                  <span className="feature-name">Distance (24.5%)</span>
-                </div>
-                <div className="feature-item">
-                  <div className="feature-bar" style={{width: '87%'}}></div>
-                  <span className="feature-name">Dest Wind Speed (21.3%)</span>
-                </div>
-                <div className="feature-item">
-                  <div className="feature-bar" style={{width: '74%'}}></div>
-                  <span className="feature-name">Flight Duration (18.1%)</span>
-                </div>
-                <div className="feature-item">
-                  <div className="feature-bar" style={{width: '41%'}}></div>
-                  <span className="feature-name">Weather Impact (10.1%)</span>
-                </div>
-                <div className="feature-item">
-                  <div className="feature-bar" style={{width: '39%'}}></div>
-                  <span className="feature-name">Total Weather (9.5%)</span>
-                </div>
+            <div className="impact-card important">
+              <div className="impact-value">{summary.data ? `${formatNumber(summary.data.mean_extra_fuel_kg, 0)}kg` : '–'}</div>
+              <div className="impact-label">Avg Weather Impact</div>
+              <div className="impact-description">
+                {summary.data ? `${formatNumber(summary.data.mean_extra_fuel_pct)}% fuel increase` : 'Fuel increase'}
               </div>
             </div>
           </div>
-          <div className="model-visualizations">
-            <img src="/assets/weather_enhanced_model_performance.png" alt="Weather Enhanced Model Performance" className="full-width-viz" />
+        </div>
+        <div className="weather-features">
+          <h3>🎯 Weather Feature Contributions</h3>
+          <div className="weather-feature-grid">
+            <div className="weather-feature-card">
+              <div className="feature-icon">💨</div>
+              <h4>Wind Conditions</h4>
+              <p>Head- and crosswinds along the route change ground speed and flight time</p>
+            </div>
+            <div className="weather-feature-card">
+              <div className="feature-icon">👁️</div>
+              <h4>Visibility</h4>
+              <p>Low visibility increases operational complexity and fuel burn</p>
+            </div>
+            <div className="weather-feature-card">
+              <div className="feature-icon">🌡️</div>
+              <h4>Temperature</h4>
+              <p>Temperature differentials affect engine efficiency</p>
+            </div>
+            <div className="weather-feature-card">
+              <div className="feature-icon">🛩️</div>
+              <h4>Flight Category</h4>
+              <p>VFR/IFR conditions determine operational procedures</p>
+            </div>
           </div>
         </div>
-      )
-    },
-    {
-      id: 'weather_enhancement',
-      title: 'Weather Enhancement Results',
-      content: (
-        <div className="slide-content">
-          <div className="weather-grid">
-            <div className="weather-impact">
-              <h3>🌤️ Weather Integration Impact</h3>
-              <div className="impact-metrics">
-                <div className="impact-card dramatic">
-                  <div className="impact-value">97.5%</div>
-                  <div className="impact-label">R² Score Achieved</div>
-                  <div className="impact-description">Best-in-class prediction accuracy</div>
-                </div>
-                <div className="impact-card significant">
-                  <div className="impact-value">5.79kg</div>
-                  <div className="impact-label">Mean Absolute Error</div>
-                  <div className="impact-description">Exceptional precision</div>
-                </div>
-                <div className="impact-card important">
-                  <div className="impact-value">211kg</div>
-                  <div className="impact-label">Avg Weather Impact</div>
-                  <div className="impact-description">12.3% fuel increase</div>
-                </div>
+      </div>
+      <div className="weather-visualizations">
+        {weatherFeatures.length > 0 && (
+          <FeatureBars
+            features={weatherFeatures}
+            value={(item) => (contributions ? item.mean_abs_kg : item.share)}
+            label={(item) => (contributions
+              ? `${featureLabel(item.feature)} (±${formatNumber(item.mean_abs_kg)} kg per flight)`
+              : `${featureLabel(item.feature)} (${formatNumber(item.share * 100)}%)`)}
+          />
+        )}
+        <ReportStatus reports={[summary, metrics, importance]} />
+      </div>
+    </div>
+  );
+};
+
+const ConclusionSlide = ({ version }) => {
+  const summary = useReport('summary', version);
+  const metrics = useReport('metrics', version);
+  const best = metrics.data && metrics.data.models.find(({ model }) => model === metrics.data.best_model);
+  return (
+    <div className="slide-content">
+      <div className="conclusion-grid">
+        <div className="achievements">
+          <h3>🎉 Key Achievements</h3>
+          <div className="achievement-cards">
+            <div className="achievement-card">
+              <div className="achievement-icon">🎯</div>
+              <h4>Exceptional Accuracy</h4>
+              <p>
+                Achieved {best ? `${formatNumber(best.test.R2 * 100)}% R² score with ${best.model} model` : 'a high R² score'},
+                demonstrating superior predictive capability for aviation fuel consumption
+              </p>
+            </div>
+            <div className="achievement-card">
+              <div className="achievement-icon">🌦️</div>
+              <h4>Weather Integration</h4>
+              <p>
+                Successfully incorporated METAR weather data, revealing weather accounts
+                for {summary.data ? `${formatNumber(summary.data.mean_extra_fuel_pct)}%` : 'significant'} additional fuel consumption
+              </p>
+            </div>
+            <div className="achievement-card">
+              <div className="achievement-icon">📊</div>
+              <h4>Comprehensive Analysis</h4>
+              <p>
+                Analyzed {summary.data ? `${summary.data.flights.toLocaleString('en-US')} flights across ${summary.data.airports} airports` : 'flights across many airports'} with
+                multiple ML algorithms for robust model comparison
+              </p>
+            </div>
+          </div>
+        </div>
+        <div className="future-work">
+          <h3>🚀 Future Enhancements</h3>
+          <div className="future-items">
+            <div className="future-item">
+              <div className="future-icon">🛰️</div>
+              <div className="future-content">
+                <h4>Real-time METAR Integration</h4>
+                <p>Connect to live weather APIs for real-time fuel prediction updates</p>
               </div>
             </div>
-            <div className="weather-features">
-              <h3>🎯 Weather Feature Contributions</h3>
-              <div className="weather-feature-grid">
-                <div className="weather-feature-card">
-                  <div className="feature-icon">💨</div>
-                  <h4>Wind Conditions</h4>
-                  <p>Destination wind speed is the 2nd most important predictor</p>
-                </div>
-                <div className="weather-feature-card">
-                  <div className="feature-icon">👁️</div>
-                  <h4>Visibility</h4>
-                  <p>Low visibility increases operational complexity and fuel burn</p>
-                </div>
-                <div className="weather-feature-card">
-                  <div className="feature-icon">🌡️</div>
-                  <h4>Temperature</h4>
-                  <p>Temperature differentials affect engine efficiency</p>
-                </div>
-                <div className="weather-feature-card">
-                  <div className="feature-icon">🛩️</div>
-                  <h4>Flight Category</h4>
-                  <p>VFR/IFR conditions determine operational procedures</p>
-                </div>
+            <div className="future-item">
+              <div className="future-icon">🗺️</div>
+              <div className="future-content">
+                <h4>Route-specific Weather</h4>
+                <p>Incorporate en-route weather conditions along flight paths</p>
+              </div>
+            </div>
+            <div className="future-item">
+              <div className="future-icon">🧠</div>
+              <div className="future-content">
+                <h4>Deep Learning Models</h4>
+                <p>Explore neural networks for capturing complex weather-fuel relationships</p>
+              </div>
+            </div>
+            <div className="future-item">
+              <div className="future-icon">📱</div>
+              <div className="future-content">
+                <h4>Operational Deployment</h4>
+                <p>Develop production-ready system for airline fuel planning operations</p>
               </div>
             </div>
-          </div>
-          <div className="weather-visualizations">
-            <img src="/assets/weather_enhanced_feature_importance.png" alt="Weather Enhanced Feature Importance" className="full-width-viz" />
           </div>
         </div>
-      )
+      </div>
+      <div className="conclusion-summary">
+        <div className="summary-box">
+          <h3>💡 Impact & Value</h3>
+          <p>This research demonstrates the critical importance of weather data in aviation fuel prediction, achieving unprecedented accuracy levels that can significantly improve airline operational efficiency, reduce costs, and minimize environmental impact through optimized fuel planning.</p>
+        </div>
+      </div>
+    </div>
+  );
+};
+
+const App = () => {
+  const [currentSlide, setCurrentSlide] = useState(0);
+  const reportVersion = useReportVersion();
+
+  // Only the current slide is mounted, so each slide fetches its report data when first shown
+  const slides = [
+    {
+      id: 'introduction',
+      title: 'Aviation Extra Fuel Prediction Analysis',
+      subtitle: 'Deep Learning Approach with Weather Integration',
+      content: <IntroductionSlide version={reportVersion} />
+    },
+    {
+      id: 'data_methodology',
+      title: 'Data Acquisition & Methodology',
+      content: <DataMethodologySlide version={reportVersion} />
+    },
+    {
+      id: 'exploratory_data_analysis',
+      title: 'Exploratory Data Analysis',
+      content: <ExploratoryAnalysisSlide version={reportVersion} />
+    },
+    {
+      id: 'model_development_evaluation',
+      title: 'Machine Learning Model Development & Evaluation',
+      content: <ModelEvaluationSlide version={reportVersion} />
+    },
+    {
+      id: 'weather_enhancement',
+      title: 'Weather Enhancement Results',
+      content: <WeatherEnhancementSlide version={reportVersion} />
     },
     {
       id: 'documentation',
@@ -325,7 +664,7 @@ const App = () => {
               </ul>
               <p>Additional data was incorporated:</p>
               <ul>
-                <li><strong>Aircraft Fuel Consumption Rates:</strong> A custom lookup table was created based on publicly available data for various aircraft models (e.g., CRJ, B737, A320).</li>
+                <li><strong>Aircraft Fuel Consumption Rates:</strong> A custom lookup table was created based on publicly available data for various aircraft models (e.g., CRJ, B737, A320), with per-type performance grids for each phase of flight derived from it.</li>
                 <li><strong>Airport Geolocation:</strong> Latitude and longitude for airports to calculate flight distances.</li>
               </ul>
             </div>
@@ -334,7 +673,7 @@ const App = () => {
               <ol>
                 <li><strong>Data Loading & Sampling:</strong> Due to the large size of the original dataset, a representative sample of 100,000 rows was used for analysis.</li>
                 <li><strong>Aircraft Type Mapping:</strong> <code>Tail_Number</code> was used to infer aircraft <code>Model</code>. For models not directly available, a default or 'no info' was assigned.</li>
-                <li><strong>Baseline Fuel Estimation:</strong> Estimated total fuel burned for the route (<code>Baseline_Fuel_kg</code>) was calculated using the aircraft's estimated cruise fuel flow rate (kg/hour) and <code>Flight_Duration</code>.</li>
+                <li><strong>Baseline Fuel Estimation:</strong> Estimated total fuel burned for the route (<code>Baseline_Fuel_kg</code>) is the sum of taxi, climb, cruise and descent fuel, interpolated from the aircraft type's performance grids at the flight's distance, airborne time (<code>Flight_Duration</code>) and origin/destination temperatures, and scaled by the airframe's fuel-flow factor (age and engine variant) from the tail-number registry.</li>
                 <li><strong>Weather Data Integration:</strong> Simulated METAR-like weather features were generated and merged with flight data based on airport codes and timeframes.</li>
                 <li><strong>Feature Engineering:</strong> New features were created, such as <code>Estimated_Distance_km</code> (Haversine formula), <code>temp_diff_c</code>, <code>avg_wind_impact</code>, <code>avg_visibility_impact</code>, and a <code>comprehensive_weather_impact</code> score.</li>
                 <li><strong>Target Variable Definition:</strong> <code>Extra_Fuel_kg</code> was defined as <code>Weather_Adjusted_Fuel_kg - Baseline_Fuel_kg</code>.</li>
@@ -355,7 +694,7 @@ const App = () => {
               <h4>Method to Determine Weather Impact</h4>
               <p>The weather impact on fuel consumption was determined through a multi-step process:</p>
               <ol>
-                <li><strong>Baseline Fuel:</strong> Calculated as the ideal fuel burn under standard conditions (<code>Fuel_Rate_kg_per_hour * Flight_Duration / 60</code>).</li>
+                <li><strong>Baseline Fuel:</strong> Calculated as the ideal fuel burn without weather impact, phase by phase: the sum of <code>Taxi_Fuel_kg</code>, <code>Climb_Fuel_kg</code>, <code>Cruise_Fuel_kg</code> and <code>Descent_Fuel_kg</code>, each interpolated from the type's performance grids and scaled by the airframe's <code>Fuel_Flow_Factor</code>.</li>
                 <li><strong>Weather Impact Factor:</strong> A <code>Weather_Impact_Factor</code> was introduced, derived from a <code>comprehensive_weather_impact</code> score. This score is a composite of various weather conditions (e.g., higher for strong winds, low visibility, precipitation). The factor scales this score to represent an increase in fuel consumption (e.g., <code>1.0 + (comprehensive_weather_impact / 50)</code>).</li>
                 <li><strong>Weather-Adjusted Fuel:</strong> Calculated by multiplying <code>Baseline_Fuel_kg</code> by the <code>Weather_Impact_Factor</code>.</li>
                 <li><strong>Extra Fuel:</strong> The target variable, <code>Extra_Fuel_kg</code>, was then derived as the difference between <code>Weather_Adjusted_Fuel_kg</code> and <code>Baseline_Fuel_kg</code>. This quantifies the additional fuel needed specifically due to adverse weather conditions.</li>
@@ -369,71 +708,7 @@ const App = () => {
     {
       id: 'conclusion_future_work',
       title: 'Conclusion & Future Work',
-      content: (
-        <div className="slide-content">
-          <div className="conclusion-grid">
-            <div className="achievements">
-              <h3>🎉 Key Achievements</h3>
-              <div className="achievement-cards">
-                <div className="achievement-card">
-                  <div className="achievement-icon">🎯</div>
-                  <h4>Exceptional Accuracy</h4>
-                  <p>Achieved 97.5% R² score with LightGBM model, demonstrating superior predictive capability for aviation fuel consumption</p>
-                </div>
-                <div className="achievement-card">
-                  <div className="achievement-icon">🌦️</div>
-                  <h4>Weather Integration</h4>
-                  <p>Successfully incorporated METAR weather data, revealing weather accounts for 12.3% additional fuel consumption</p>
-                </div>
-                <div className="achievement-card">
-                  <div className="achievement-icon">📊</div>
-                  <h4>Comprehensive Analysis</h4>
-                  <p>Analyzed 1000+ flights across 50+ airports with multiple ML algorithms for robust model comparison</p>
-                </div>
-              </div>
-            </div>
-            <div className="future-work">
-              <h3>🚀 Future Enhancements</h3>
-              <div className="future-items">
-                <div className="future-item">
-                  <div className="future-icon">🛰️</div>
-                  <div className="future-content">
-                    <h4>Real-time METAR Integration</h4>
-                    <p>Connect to live weather APIs for real-time fuel prediction updates</p>
-                  </div>
-                </div>
-                <div className="future-item">
-                  <div className="future-icon">🗺️</div>
-                  <div className="future-content">
-                    <h4>Route-specific Weather</h4>
-                    <p>Incorporate en-route weather conditions along flight paths</p>
-                  </div>
-                </div>
-                <div className="future-item">
-                  <div className="future-icon">🧠</div>
-                  <div className="future-content">
-                    <h4>Deep Learning Models</h4>
-                    <p>Explore neural networks for capturing complex weather-fuel relationships</p>
-                  </div>
-                </div>
-                <div className="future-item">
-                  <div className="future-icon">📱</div>
-                  <div className="future-content">
-                    <h4>Operational Deployment</h4>
-                    <p>Develop production-ready system for airline fuel planning operations</p>
-                  </div>
-                </div>
-              </div>
-            </div>
-          </div>
-          <div className="conclusion-summary">
-            <div className="summary-box">
-              <h3>💡 Impact & Value</h3>
-              <p>This research demonstrates the critical importance of weather data in aviation fuel prediction, achieving unprecedented accuracy levels that can significantly improve airline operational efficiency, reduce costs, and minimize environmental impact through optimized fuel planning.</p>
-            </div>
-          </div>
-        </div>
-      )
+      content: <ConclusionSlide version={reportVersion} />
     }
   ];
 